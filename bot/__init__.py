@@ -9,7 +9,7 @@ from asyncio import Lock
 from dotenv import load_dotenv, dotenv_values
 from threading import Thread
 from time import sleep, time
-from subprocess import Popen, run as srun
+from subprocess import run as srun
 from os import remove as osremove, path as ospath, environ, getcwd
 from aria2p import API as ariaAPI, Client as ariaClient
 from qbittorrentapi import Client as qbClient
@@ -18,6 +18,8 @@ from socket import setdefaulttimeout
 from logging import getLogger, Formatter, FileHandler, StreamHandler, INFO, basicConfig, error as log_error, info as log_info, warning as log_warning
 from uvloop import install
 
+from bot.helper.ext_utils.task_registry import TaskRegistry
+
 faulthandler_enable()
 install()
 setdefaulttimeout(600)
@@ -63,7 +65,7 @@ status_reply_dict_lock = Lock()
 queue_dict_lock = Lock()
 qb_listener_lock = Lock()
 status_reply_dict = {}
-download_dict = {}
+download_dict = TaskRegistry()
 rss_dict = {}
 
 BOT_TOKEN = environ.get('BOT_TOKEN', '')
@@ -339,6 +341,9 @@ QUEUE_ALL = '' if len(QUEUE_ALL) == 0 else int(QUEUE_ALL)
 QUEUE_DOWNLOAD = environ.get('QUEUE_DOWNLOAD', '')
 QUEUE_DOWNLOAD = '' if len(QUEUE_DOWNLOAD) == 0 else int(QUEUE_DOWNLOAD)
 
+QUEUE_DOWNLOAD_BURST = environ.get('QUEUE_DOWNLOAD_BURST', '')
+QUEUE_DOWNLOAD_BURST = QUEUE_DOWNLOAD_BURST.lower() == 'true'
+
 QUEUE_UPLOAD = environ.get('QUEUE_UPLOAD', '')
 QUEUE_UPLOAD = '' if len(QUEUE_UPLOAD) == 0 else int(QUEUE_UPLOAD)
 
@@ -659,6 +664,7 @@ config_dict = {'ANIME_TEMPLATE': ANIME_TEMPLATE,
                'OWNER_ID': OWNER_ID,
                'QUEUE_ALL': QUEUE_ALL,
                'QUEUE_DOWNLOAD': QUEUE_DOWNLOAD,
+               'QUEUE_DOWNLOAD_BURST': QUEUE_DOWNLOAD_BURST,
                'QUEUE_UPLOAD': QUEUE_UPLOAD,
                'RCLONE_FLAGS': RCLONE_FLAGS,
                'RCLONE_PATH': RCLONE_PATH,
@@ -736,9 +742,6 @@ if ospath.exists('shorteners.txt'):
             if len(temp) == 2:
                 shorteners_list.append({'domain': temp[0],'api_key': temp[1]})
 
-if BASE_URL:
-    Popen(f"gunicorn web.wserver:app --bind 0.0.0.0:{BASE_URL_PORT} --worker-class gevent", shell=True)
-
 srun(["qbittorrent-nox", "-d", f"--profile={getcwd()}"])
 if not ospath.exists('.netrc'):
     with open('.netrc', 'w'):
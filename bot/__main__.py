@@ -7,6 +7,7 @@ from os import execl as osexecl
 from asyncio import create_subprocess_exec, gather, run as asyrun
 from uuid import uuid4
 from base64 import b64decode
+from html import escape
 from importlib import import_module, reload
 
 from requests import get as rget
@@ -24,14 +25,17 @@ from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from bot import bot, user, bot_name, config_dict, user_data, botStartTime, LOGGER, Interval, DATABASE_URL, QbInterval, INCOMPLETE_TASK_NOTIFIER, scheduler
 from bot.version import get_version
 from .helper.ext_utils.fs_utils import start_cleanup, clean_all, exit_clean_up
-from .helper.ext_utils.bot_utils import get_readable_time, cmd_exec, sync_to_async, new_task, set_commands, update_user_ldata, get_stats
+from .helper.ext_utils.bot_utils import get_readable_time, cmd_exec, sync_to_async, new_task, set_commands, update_user_ldata, get_stats, get_all_versions
+from .helper.ext_utils.sys_stats import sys_stats
 from .helper.ext_utils.db_handler import DbManger
+from .helper.ext_utils.upload_checkpoint import get_resumable_uploads
 from .helper.telegram_helper.bot_commands import BotCommands
 from .helper.telegram_helper.message_utils import sendMessage, editMessage, editReplyMarkup, sendFile, deleteMessage, delete_all_messages
 from .helper.telegram_helper.filters import CustomFilters
 from .helper.telegram_helper.button_build import ButtonMaker
 from .helper.listeners.aria2_listener import start_aria2_listener
 from .helper.themes import BotTheme
+from web.wserver import app as web_app, start_site, serve_selector, HEALTH_PORT
 from .modules import authorize, clone, gd_count, gd_delete, gd_list, cancel_mirror, mirror_leech, status, torrent_search, torrent_select, ytdlp, \
                      rss, shell, eval, users_settings, bot_settings, speedtest, save_msg, images, imdb, anilist, mediainfo, mydramalist, gen_pyro_sess, \
                      gd_clean, broadcast, category_select
@@ -112,7 +116,7 @@ async def restart(client, message):
         if interval:
             interval[0].cancel()
     await sync_to_async(clean_all)
-    proc1 = await create_subprocess_exec('pkill', '-9', '-f', 'gunicorn|aria2c|qbittorrent-nox|ffmpeg|rclone')
+    proc1 = await create_subprocess_exec('pkill', '-9', '-f', 'aria2c|qbittorrent-nox|ffmpeg|rclone')
     proc2 = await create_subprocess_exec('python3', 'update.py')
     await gather(proc1.wait(), proc2.wait())
     async with aiopen(".restartmsg", "w") as f:
@@ -134,7 +138,7 @@ async def log(_, message):
 
 # Continue with other async functions...
 
-async def restart_notification():
+async def restart_notification(resumable=()):
     now = datetime.now(timezone(config_dict['TIMEZONE']))
     if await aiopath.isfile(".restartmsg"):
         with open(".restartmsg") as f:
@@ -153,7 +157,7 @@ async def restart_notification():
             LOGGER.error(e)
 
     if INCOMPLETE_TASK_NOTIFIER and DATABASE_URL:
-        if notifier_dict := await DbManager().get_incomplete_tasks():
+        if notifier_dict := await DbManger().get_incomplete_tasks():
             for cid, data in notifier_dict.items():
                 msg = (BotTheme('RESTART_SUCCESS', time=now.strftime('%I:%M:%S %p'), date=now.strftime('%d/%m/%y'), timz=config_dict['TIMEZONE'], version=get_version())
                        if cid == chat_id else BotTheme('RESTARTED'))
@@ -169,6 +173,16 @@ async def restart_notification():
                 if msg:
                     await send_incomplete_task_message(cid, msg)
 
+    for ckpt in resumable:
+        buttons = ButtonMaker()
+        buttons.ibutton(BotTheme('RESUME_BT'), f"resume {ckpt['user_id']} {ckpt['_id']} go")
+        buttons.ibutton(BotTheme('DISCARD_BT'), f"resume {ckpt['user_id']} {ckpt['_id']} rm")
+        try:
+            await bot.send_message(chat_id=ckpt['cid'], reply_to_message_id=ckpt['mid'], disable_notification=True, reply_markup=buttons.build_menu(2),
+                                   text=BotTheme('UPLOAD_INTERRUPTED', name=escape(ckpt['name']), tag=ckpt['tag']))
+        except Exception as e:
+            LOGGER.error(e)
+
     if await aiopath.isfile(".restartmsg"):
         try:
             await bot.edit_message_text(chat_id=chat_id, message_id=msg_id, text=BotTheme('RESTART_SUCCESS', time=now.strftime('%I:%M:%S %p'), date=now.strftime('%d/%m/%y'), timz=config_dict['TIMEZONE'], version=get_version()))
@@ -210,10 +224,14 @@ async def health_check(request):
 
 
 async def main():
+    sys_stats.start()
+    start_aria2_listener()
+    resumable = await get_resumable_uploads() if INCOMPLETE_TASK_NOTIFIER and DATABASE_URL else []
     tasks = [
-        start_cleanup(),
+        start_cleanup([ckpt['uid'] for ckpt in resumable]),
+        get_all_versions(),
         torrent_search.initiate_search_tools(),
-        restart_notification(),
+        restart_notification(resumable),
         log_check(),
         set_commands(bot),
     ]
@@ -231,16 +249,12 @@ async def main():
     LOGGER.info("Bot Started Successfully!")
     signal(SIGINT, exit_clean_up)
 
-    # Set up a web server for health check
-    app = web.Application()
-    app.router.add_route('GET', '/health', health_check)
-    
-    # Assuming `runner` is an instance of aiohttp.web.AppRunner()
-    runner = web.AppRunner(app)
-    await runner.setup()
-    site = web.TCPSite(runner, '0.0.0.0', 8080)  # Customize your host and port here
-    await site.start()
-    LOGGER.info("Health check server started at http://0.0.0.0:8080/health")
+    # Health check and torrent file selector share one aiohttp app
+    web_app.router.add_route('GET', '/health', health_check)
+    await start_site(HEALTH_PORT)
+    LOGGER.info(f"Health check server started at http://0.0.0.0:{HEALTH_PORT}/health")
+    if config_dict['BASE_URL']:
+        await serve_selector(config_dict['BASE_URL_PORT'])
 
     await idle()  # Start the main event loop for the bot
 
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+from asyncio import sleep as aiosleep
+from functools import partial
+from threading import Lock, Thread
+from time import time, sleep
+from aria2p import Download
+
+from bot import aria2, LOGGER
+from bot.helper.ext_utils.bot_utils import setInterval, sync_to_async
+
+ARIA2_REFRESH_INTERVAL = 1
+ARIA2_TRACK_TIMEOUT = 30
+ARIA2_EVENTS = ('download_start', 'download_pause', 'download_stop', 'download_complete', 'download_error',
+                'bt_download_complete')
+STATUS_KEYS = ['gid', 'status', 'totalLength', 'completedLength', 'downloadSpeed', 'uploadLength', 'uploadSpeed',
+               'numSeeders', 'connections', 'seeder', 'followedBy', 'following', 'belongsTo', 'errorCode',
+               'errorMessage', 'dir']
+
+
+class Aria2Client:
+    # Status reads of all tracked downloads share one system.multicall per interval and aria2's
+    # websocket notifications are fanned out to the global handlers and per-gid subscribers
+    def __init__(self):
+        self.__downloads = {}
+        self.__static = {}
+        self.__last_read = {}
+        self.__subscribers = {}
+        self.__handlers = {}
+        self.__lock = Lock()
+        self.__refresher = None
+
+    def start(self, **handlers):
+        if self.__refresher is not None:
+            return
+        self.__handlers = handlers
+        self.__refresher = setInterval(ARIA2_REFRESH_INTERVAL, self.__tick)
+        Thread(target=self.__listen, daemon=True).start()
+
+    def get(self, gid):
+        with self.__lock:
+            self.__last_read[gid] = time()
+            if self.__refresher is not None and (download := self.__downloads.get(gid)) is not None:
+                return download
+        return self.fetch(gid)
+
+    def fetch(self, gid):
+        try:
+            struct = aria2.client.tell_status(gid)
+        except Exception as e:
+            LOGGER.error(f'{e}: Aria2c, Error while getting download info')
+            return None
+        download = Download(aria2, struct)
+        with self.__lock:
+            self.__last_read.setdefault(gid, time())
+            self.__static[gid] = {'bittorrent': struct['bittorrent']} if 'bittorrent' in struct else {}
+            self.__downloads[gid] = download
+        return download
+
+    async def wait_until(self, gid, predicate, timeout=None):
+        # Polls the download itself with a growing delay, for states the shared refresh would only see late
+        delay, waited = 0.1, 0
+        while (download := await sync_to_async(self.fetch, gid)) is not None and not predicate(download) \
+                and (timeout is None or waited < timeout):
+            await aiosleep(delay)
+            waited += delay
+            delay = min(delay * 2, ARIA2_REFRESH_INTERVAL)
+        return download
+
+    def subscribe(self, gid, callback):
+        with self.__lock:
+            self.__subscribers.setdefault(gid, set()).add(callback)
+
+    def unsubscribe(self, gid, callback):
+        with self.__lock:
+            if (callbacks := self.__subscribers.get(gid)) is not None:
+                callbacks.discard(callback)
+                if not callbacks:
+                    del self.__subscribers[gid]
+
+    async def __tick(self):
+        await sync_to_async(self.__refresh)
+
+    def __refresh(self):
+        now = time()
+        with self.__lock:
+            for gid in [gid for gid, last in self.__last_read.items()
+                        if now - last > ARIA2_TRACK_TIMEOUT and gid not in self.__subscribers]:
+                self.__drop(gid)
+            gids = list(self.__downloads)
+            # Files are only needed for the name while there is no torrent info, a torrent can list thousands
+            calls = [{'methodName': aria2.client.TELL_STATUS,
+                      'params': [gid, STATUS_KEYS if self.__static[gid].get('bittorrent', {}).get('info')
+                                 else STATUS_KEYS + ['files']]} for gid in gids]
+        if not calls:
+            return
+        try:
+            results = aria2.client.multicall(calls)
+        except Exception as e:
+            LOGGER.error(f'{e}: Aria2c, Error while refreshing downloads')
+            return
+        with self.__lock:
+            for gid, result in zip(gids, results):
+                if gid not in self.__downloads:
+                    continue
+                if isinstance(result, dict):
+                    # Removed from aria2, the next read will fetch it again or fail
+                    del self.__downloads[gid]
+                    continue
+                self.__downloads[gid] = Download(aria2, {**self.__static[gid], **result[0]})
+
+    def __drop(self, gid):
+        self.__downloads.pop(gid, None)
+        self.__static.pop(gid, None)
+        self.__last_read.pop(gid, None)
+
+    def __listen(self):
+        while True:
+            aria2.client.listen_to_notifications(timeout=60, handle_signals=False,
+                                                 **{f'on_{event}': partial(self.__notify, event) for event in ARIA2_EVENTS})
+            LOGGER.error('Aria2c notifications closed, reconnecting...')
+            sleep(5)
+
+    def __notify(self, event, gid):
+        # Refresh first so handlers and subscribers see the state that raised the event
+        self.fetch(gid)
+        if handler := self.__handlers.get(event):
+            try:
+                handler(aria2, gid)
+            except Exception as e:
+                LOGGER.error(f'Aria2c {event} handler: {e}')
+        with self.__lock:
+            callbacks = list(self.__subscribers.get(gid, ()))
+        for callback in callbacks:
+            callback(event, gid)
+
+
+aria2_client = Aria2Client()
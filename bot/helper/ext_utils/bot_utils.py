@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-import platform
 from base64 import b64encode
 from datetime import datetime
 from os import path as ospath
@@ -10,15 +9,13 @@ from re import match as re_match
 from time import time
 from html import escape
 from uuid import uuid4
-from subprocess import run as srun
-from psutil import disk_usage, disk_io_counters, Process, cpu_percent, swap_memory, cpu_count, cpu_freq, getloadavg, virtual_memory, net_io_counters, boot_time
-from asyncio import create_subprocess_exec, create_subprocess_shell, run_coroutine_threadsafe, sleep
+from collections import defaultdict
+from asyncio import create_subprocess_exec, create_subprocess_shell, run_coroutine_threadsafe, sleep, gather
 from asyncio.subprocess import PIPE
 from functools import partial, wraps
 from concurrent.futures import ThreadPoolExecutor
 
 from aiohttp import ClientSession as aioClientSession
-from psutil import virtual_memory, cpu_percent, disk_usage
 from requests import get as rget
 from mega import MegaApi
 from pyrogram.enums import ChatType
@@ -26,21 +23,29 @@ from pyrogram.types import BotCommand
 from pyrogram.errors import PeerIdInvalid
 
 from bot.helper.ext_utils.db_handler import DbManger
-from bot.helper.themes import BotTheme
+from bot.helper.themes import BotTheme, BotBlock
 from bot.version import get_version
 from bot import OWNER_ID, bot_name, bot_cache, DATABASE_URL, LOGGER, get_client, aria2, download_dict, download_dict_lock, botStartTime, user_data, config_dict, bot_loop, extra_buttons, user
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.ext_utils.telegraph_helper import telegraph
 from bot.helper.ext_utils.shortners import short_url
+from bot.helper.ext_utils.sys_stats import sys_stats
+from bot.helper.ext_utils.queue_scheduler import queue_scheduler
 
 THREADPOOL   = ThreadPoolExecutor(max_workers=1000)
 MAGNET_REGEX = r'magnet:\?xt=urn:(btih|btmh):[a-zA-Z0-9]*\s*'
 URL_REGEX    = r'^(?!\/)(rtmps?:\/\/|mms:\/\/|rtsp:\/\/|https?:\/\/|ftp:\/\/)?([^\/:]+:[^\/@]+@)?(www\.)?(?=[^\/:\s]+\.[^\/:\s]+)([^\/:\s]+\.[^\/:\s]+)(:\d+)?(\/[^#\s]*[\s\S]*)?(\?[^#\s]*)?(#.*)?$'
 SIZE_UNITS   = ['B', 'KB', 'MB', 'GB', 'TB', 'PB', 'EB']
-STATUS_START = 0
-PAGES        = 1
-PAGE_NO      = 1
+STATUS_PAGES = {}
+STATUS_BLOCKS = {}
+PROGRESS_BLOCK     = ('STATUS_NAME', 'BAR', 'PROCESSED', 'STATUS', 'ETA', 'SPEED', 'ELAPSED', 'ENGINE', 'STA_MODE')
+SEEDERS_BLOCK      = ('SEEDERS', 'LEECHERS')
+SEEDING_BLOCK      = ('STATUS_NAME', 'STATUS', 'SEED_SIZE', 'SEED_SPEED', 'UPLOADED', 'RATIO', 'TIME', 'SEED_ENGINE')
+NON_PROGRESS_BLOCK = ('STATUS_NAME', 'STATUS', 'STATUS_SIZE', 'NON_ENGINE')
+USER_BLOCK         = ('USER', 'ID')
+BTSEL_BLOCK        = ('BTSEL',)
+CANCEL_BLOCK       = ('CANCEL',)
 
 
 class MirrorStatus:
@@ -55,6 +60,7 @@ class MirrorStatus:
     STATUS_SPLITTING   = "Split"
     STATUS_CHECKING    = "CheckUp"
     STATUS_SEEDING     = "Seed"
+    STATUS_STREAMING   = "Stream"
 
 
 class setInterval:
@@ -84,24 +90,19 @@ def get_readable_file_size(size_in_bytes):
 
 async def getDownloadByGid(gid):
     async with download_dict_lock:
-        return next((dl for dl in download_dict.values() if dl.gid() == gid), None)
+        return download_dict.by_gid(gid)
 
 
 async def getAllDownload(req_status, user_id=None):
-    dls = []
     async with download_dict_lock:
-        for dl in list(download_dict.values()):
-            if user_id and user_id != dl.message.from_user.id:
-                continue
-            status = dl.status()
-            if req_status in ['all', status]:
-                dls.append(dl)
-    return dls
+        if req_status != 'all':
+            return download_dict.by_status(req_status, user_id)
+        return download_dict.by_user(user_id) if user_id else list(download_dict.values())
 
 
 async def get_user_tasks(user_id, maxtask):
-    if tasks := await getAllDownload('all', user_id):
-        return len(tasks) >= maxtask
+    async with download_dict_lock:
+        return download_dict.count_by_user(user_id) >= maxtask
 
 
 def bt_selection_buttons(id_):
@@ -148,44 +149,47 @@ def get_progress_bar_string(pct):
     return f"[{p_str}]"
 
 
-def get_all_versions():
-    try:
-        result = srun(['7z', '-version'], capture_output=True, text=True)
-        vp = result.stdout.split('\n')[2].split(' ')[2]
-    except FileNotFoundError:
-        vp = ''
-    try:
-        result = srun(['ffmpeg', '-version'], capture_output=True, text=True)
-        vf = result.stdout.split('\n')[0].split(' ')[2].split('ubuntu')[0]
-    except FileNotFoundError:
-        vf = ''
-    try:
-        result = srun(['rclone', 'version'], capture_output=True, text=True)
-        vr = result.stdout.split('\n')[0].split(' ')[1]
-    except FileNotFoundError:
-        vr = ''
-    try:
-        vpy = get_distribution('pyrogram').version
-    except DistributionNotFound:
+async def get_all_versions():
+    async def cmd_version(cmd, parse):
         try:
-            vpy = get_distribution('pyrofork').version
-        except DistributionNotFound:
-            vpy = "2.xx.xx"
+            return parse((await cmd_exec(cmd))[0])
+        except Exception:
+            return ''
+
+    async def sync_version(func):
+        try:
+            return await sync_to_async(func)
+        except Exception as e:
+            LOGGER.error(f"Engine Version Error: {e}")
+            return ''
+
+    def dist_version(*names, default=''):
+        for name in names:
+            try:
+                return get_distribution(name).version
+            except DistributionNotFound:
+                continue
+        return default
+
+    vp, vf, vr = await gather(cmd_version(['7z', '-version'], lambda out: out.split('\n')[2].split(' ')[2]),
+                              cmd_version(['ffmpeg', '-version'], lambda out: out.split('\n')[0].split(' ')[2].split('ubuntu')[0]),
+                              cmd_version(['rclone', 'version'], lambda out: out.split('\n')[0].split(' ')[1]))
+    aria_v, qbit_v, mega_v = await gather(sync_version(lambda: aria2.client.get_version()['version']),
+                                          sync_version(lambda: get_client().app.version),
+                                          sync_version(lambda: MegaApi('test').getVersion()))
     bot_cache['eng_versions'] = {'p7zip':vp, 'ffmpeg': vf, 'rclone': vr,
-                                    'aria': aria2.client.get_version()['version'],
-                                    'aiohttp': get_distribution('aiohttp').version,
-                                    'gapi': get_distribution('google-api-python-client').version,
-                                    'mega': MegaApi('test').getVersion(),
-                                    'qbit': get_client().app.version,
-                                    'pyro': vpy,
-                                    'ytdlp': get_distribution('yt-dlp').version}
+                                    'aria': aria_v,
+                                    'aiohttp': dist_version('aiohttp'),
+                                    'gapi': dist_version('google-api-python-client'),
+                                    'mega': mega_v,
+                                    'qbit': qbit_v,
+                                    'pyro': dist_version('pyrogram', 'pyrofork', default='2.xx.xx'),
+                                    'ytdlp': dist_version('yt-dlp')}
 
 
 class EngineStatus:
     def __init__(self):
-        if not (version_cache := bot_cache.get('eng_versions')):
-            get_all_versions()
-            version_cache = bot_cache.get('eng_versions')
+        version_cache = bot_cache.get('eng_versions') or defaultdict(str)
         self.STATUS_ARIA = f"Aria2 v{version_cache['aria']}"
         self.STATUS_AIOHTTP = f"AioHttp {version_cache['aiohttp']}"
         self.STATUS_GD = f"Google-API v{version_cache['gapi']}"
@@ -200,89 +204,115 @@ class EngineStatus:
         self.STATUS_RCLONE = f"RClone {version_cache['rclone']}"
 
 
-def get_readable_message():
+def visible(value, bits=7):
+    # Only the top bits count, so the key moves once the value changed by ~1% (bits=7), i.e. by what the
+    # two decimal size or the time text would show
+    value = int(value or 0)
+    shift = max(value.bit_length() - bits, 0)
+    return shift, value >> shift
+
+
+def get_status_block(uid, download, tstatus):
+    elapsed = time() - download.message.date.timestamp()
+    safe_name = config_dict['SAFE_MODE'] and elapsed >= config_dict['STATUS_UPDATE_INTERVAL']
+    # Keyed on raw values, nothing is formatted unless one of them moved by a visible amount
+    key = (tstatus, safe_name, download.name(), download.gid(), download.upload_details['mode'])
+    peers = ()
+    if tstatus not in [MirrorStatus.STATUS_SPLITTING, MirrorStatus.STATUS_SEEDING]:
+        progress, processed, speed, eta, size = download.progress_raw(), download.processed_raw(), download.speed_raw(), \
+            download.eta_raw(), download.size_raw()
+        if hasattr(download, 'seeders_num'):
+            try:
+                peers = (download.seeders_num(), download.leechers_num())
+            except Exception:
+                pass
+        key += (round(progress, 1), visible(processed), visible(speed), eta is not None and visible(eta, 5), size,
+                visible(elapsed, 5), peers)
+    elif tstatus == MirrorStatus.STATUS_SEEDING:
+        speed, uploaded, ratio, seed_time, size = download.upload_speed_raw(), download.uploaded_raw(), download.ratio(), \
+            download.seeding_time_raw(), download.size_raw()
+        key += (visible(speed), visible(uploaded), ratio, visible(seed_time, 5), size)
+    else:
+        size = download.size_raw()
+        key += (size,)
+    if (cached := STATUS_BLOCKS.get(uid)) and cached[0] == key:
+        return cached[1]
+    name = "Task is being Processed!" if safe_name else escape(f'{key[2]}')
+    msg_link = download.message.link if download.message.chat.type in [
+        ChatType.SUPERGROUP, ChatType.CHANNEL] and not config_dict['DELETE_LINKS'] else ''
+    block = {'Name': name, 'Status': tstatus, 'Url': msg_link, 'Engine': download.eng(),
+             'User': download.message.from_user.mention(style="html"), 'Id': download.message.from_user.id,
+             'Cancel': f"/{BotCommands.CancelMirror}_{key[3]}"}
+    if tstatus not in [MirrorStatus.STATUS_SPLITTING, MirrorStatus.STATUS_SEEDING]:
+        parts = PROGRESS_BLOCK
+        progress = f"{round(progress, 2)}%"
+        block.update(Bar=f"{get_progress_bar_string(progress)} {progress}",
+                     Processed=f"{get_readable_file_size(processed)} of {get_readable_file_size(size)}",
+                     Eta=get_readable_time(eta) if eta is not None else '-', Speed=f"{get_readable_file_size(speed)}/s",
+                     Elapsed=get_readable_time(elapsed), Mode=key[4])
+        if peers:
+            block.update(Seeders=peers[0], Leechers=peers[1])
+            parts += SEEDERS_BLOCK
+    elif tstatus == MirrorStatus.STATUS_SEEDING:
+        parts = SEEDING_BLOCK
+        block.update(Size=get_readable_file_size(size), Speed=f"{get_readable_file_size(speed)}/s",
+                     Upload=get_readable_file_size(uploaded), Ratio=ratio, Time=get_readable_time(seed_time))
+    else:
+        parts = NON_PROGRESS_BLOCK
+        block['Size'] = get_readable_file_size(size)
+    parts += USER_BLOCK
+    if block['Engine'].startswith("qBit"):
+        block['Btsel'] = f"/{BotCommands.BtSelectCommand}_{key[3]}"
+        parts += BTSEL_BLOCK
+    text = BotBlock(parts + CANCEL_BLOCK, **block)
+    STATUS_BLOCKS[uid] = (key, text)
+    return text
+
+
+def get_status_snapshot():
+    snapshot = [(uid, download, download.status()) for uid, download in list(download_dict.items())]
+    # Runs in the threadpool, the status index is only touched from the loop
+    bot_loop.call_soon_threadsafe(download_dict.observe_snapshot, snapshot)
+    return snapshot
+
+
+def get_readable_message(chat_id=None, snapshot=None):
     msg = ""
     button = None
     STATUS_LIMIT = config_dict['STATUS_LIMIT']
-    tasks = len(download_dict)
-    globals()['PAGES'] = (tasks + STATUS_LIMIT - 1) // STATUS_LIMIT
-    if PAGE_NO > PAGES and PAGES != 0:
-        globals()['STATUS_START'] = STATUS_LIMIT * (PAGES - 1)
-        globals()['PAGE_NO'] = PAGES
-    for download in list(download_dict.values())[STATUS_START:STATUS_LIMIT+STATUS_START]:
-        msg_link = download.message.link if download.message.chat.type in [
-            ChatType.SUPERGROUP, ChatType.CHANNEL] and not config_dict['DELETE_LINKS'] else ''
-        elapsed = time() - download.message.date.timestamp()
-        msg += BotTheme('STATUS_NAME', Name="Task is being Processed!" if config_dict['SAFE_MODE'] and elapsed >= config_dict['STATUS_UPDATE_INTERVAL'] else escape(f'{download.name()}'))
-        if download.status() not in [MirrorStatus.STATUS_SPLITTING, MirrorStatus.STATUS_SEEDING]:
-            msg += BotTheme('BAR', Bar=f"{get_progress_bar_string(download.progress())} {download.progress()}")
-            msg += BotTheme('PROCESSED', Processed=f"{download.processed_bytes()} of {download.size()}")
-            msg += BotTheme('STATUS', Status=download.status(), Url=msg_link)
-            msg += BotTheme('ETA', Eta=download.eta())
-            msg += BotTheme('SPEED', Speed=download.speed())
-            msg += BotTheme('ELAPSED', Elapsed=get_readable_time(elapsed))
-            msg += BotTheme('ENGINE', Engine=download.eng())
-            msg += BotTheme('STA_MODE', Mode=download.upload_details['mode'])
-            if hasattr(download, 'seeders_num'):
-                try:
-                    msg += BotTheme('SEEDERS', Seeders=download.seeders_num())
-                    msg += BotTheme('LEECHERS', Leechers=download.leechers_num())
-                except Exception:
-                    pass
-        elif download.status() == MirrorStatus.STATUS_SEEDING:
-            msg += BotTheme('STATUS', Status=download.status(), Url=msg_link)
-            msg += BotTheme('SEED_SIZE', Size=download.size())
-            msg += BotTheme('SEED_SPEED', Speed=download.upload_speed())
-            msg += BotTheme('UPLOADED', Upload=download.uploaded_bytes())
-            msg += BotTheme('RATIO', Ratio=download.ratio())
-            msg += BotTheme('TIME', Time=download.seeding_time())
-            msg += BotTheme('SEED_ENGINE', Engine=download.eng())
-        else:
-            msg += BotTheme('STATUS', Status=download.status(), Url=msg_link)
-            msg += BotTheme('STATUS_SIZE', Size=download.size())
-            msg += BotTheme('NON_ENGINE', Engine=download.eng())
-
-        msg += BotTheme('USER',
-                        User=download.message.from_user.mention(style="html"))
-        msg += BotTheme('ID', Id=download.message.from_user.id)
-        if (download.eng()).startswith("qBit"):
-            msg += BotTheme('BTSEL', Btsel=f"/{BotCommands.BtSelectCommand}_{download.gid()}")
-        msg += BotTheme('CANCEL', Cancel=f"/{BotCommands.CancelMirror}_{download.gid()}")
+    if snapshot is None:
+        snapshot = get_status_snapshot()
+    tasks = len(snapshot)
+    pages = max((tasks + STATUS_LIMIT - 1) // STATUS_LIMIT, 1)
+    page_no = STATUS_PAGES.get(chat_id, 1)
+    if page_no > pages:
+        page_no = pages
+        STATUS_PAGES[chat_id] = pages
+    for uid in STATUS_BLOCKS.keys() - download_dict.keys():
+        del STATUS_BLOCKS[uid]
+    status_start = STATUS_LIMIT * (page_no - 1)
+    for uid, download, tstatus in snapshot[status_start:STATUS_LIMIT+status_start]:
+        msg += get_status_block(uid, download, tstatus)
 
     if len(msg) == 0:
         return None, None
 
-    dl_speed = 0
-
-    def convert_speed_to_bytes_per_second(spd):
-        if 'K' in spd:
-            return float(spd.split('K')[0]) * 1024
-        elif 'M' in spd:
-            return float(spd.split('M')[0]) * 1048576
-        elif 'G' in spd:
-            return float(spd.split('G')[0]) * 1073741824
-        elif 'T' in spd:
-            return float(spd.split('T')[0]) * 1099511627776
-        else:
-            return 0
-
     dl_speed = 0
     up_speed = 0
-    for download in download_dict.values():
-        tstatus = download.status()
-        spd = download.speed() if tstatus != MirrorStatus.STATUS_SEEDING else download.upload_speed()
-        speed_in_bytes_per_second = convert_speed_to_bytes_per_second(spd)
+    for _, download, tstatus in snapshot:
         if tstatus == MirrorStatus.STATUS_DOWNLOADING:
-            dl_speed += speed_in_bytes_per_second
-        elif tstatus in [
-            MirrorStatus.STATUS_UPLOADING,
-            MirrorStatus.STATUS_SEEDING,
-        ]:
-            up_speed += speed_in_bytes_per_second
+            dl_speed += download.speed_raw()
+        elif tstatus == MirrorStatus.STATUS_UPLOADING:
+            up_speed += download.speed_raw()
+        elif tstatus == MirrorStatus.STATUS_SEEDING:
+            up_speed += download.upload_speed_raw()
+        elif tstatus == MirrorStatus.STATUS_STREAMING:
+            dl_speed += download.speed_raw()
+            up_speed += download.speed_raw()
 
     msg += BotTheme('FOOTER')
     buttons = ButtonMaker()
-    buttons.ibutton(BotTheme('REFRESH', Page=f"{PAGE_NO}/{PAGES}"), "status ref")
+    buttons.ibutton(BotTheme('REFRESH', Page=f"{page_no}/{pages}"), "status ref")
     if tasks > STATUS_LIMIT:
         if config_dict['BOT_MAX_TASKS']:
             msg += BotTheme('BOT_TASKS', Tasks=tasks, Ttask=config_dict['BOT_MAX_TASKS'], Free=config_dict['BOT_MAX_TASKS']-tasks)
@@ -290,36 +320,40 @@ def get_readable_message():
             msg += BotTheme('TASKS', Tasks=tasks)
         buttons = ButtonMaker()
         buttons.ibutton(BotTheme('PREVIOUS'), "status pre")
-        buttons.ibutton(BotTheme('REFRESH', Page=f"{PAGE_NO}/{PAGES}"), "status ref")
+        buttons.ibutton(BotTheme('REFRESH', Page=f"{page_no}/{pages}"), "status ref")
         buttons.ibutton(BotTheme('NEXT'), "status nex")
     button = buttons.build_menu(3)
-    msg += BotTheme('Cpu', cpu=cpu_percent())
-    msg += BotTheme('FREE', free=get_readable_file_size(disk_usage(config_dict['DOWNLOAD_DIR']).free), free_p=round(100-disk_usage(config_dict['DOWNLOAD_DIR']).percent, 1))
-    msg += BotTheme('Ram', ram=virtual_memory().percent)
+    if stats := sys_stats.latest:
+        msg += BotTheme('Cpu', cpu=stats['cpu'])
+        msg += BotTheme('FREE', free=get_readable_file_size(stats['dl_disk'].free), free_p=round(100-stats['dl_disk'].percent, 1))
+        msg += BotTheme('Ram', ram=stats['ram'].percent)
     msg += BotTheme('uptime', uptime=get_readable_time(time() - botStartTime))
     msg += BotTheme('DL', DL=get_readable_file_size(dl_speed))
     msg += BotTheme('UL', UL=get_readable_file_size(up_speed))
+    if queue_summary := queue_scheduler.summary():
+        msg += f"\n<b>Queue :</b> {queue_summary}"
     return msg, button
 
 
-async def turn_page(data):
+def get_readable_messages(chat_ids):
+    rendered, pages = {}, {}
+    snapshot = get_status_snapshot()
+    for chat_id in chat_ids:
+        if (page_no := STATUS_PAGES.get(chat_id, 1)) not in pages:
+            pages[page_no] = get_readable_message(chat_id, snapshot)
+        rendered[chat_id] = pages[page_no]
+    return rendered
+
+
+async def turn_page(data, chat_id):
     STATUS_LIMIT = config_dict['STATUS_LIMIT']
-    global STATUS_START, PAGE_NO
     async with download_dict_lock:
+        pages = max((len(download_dict) + STATUS_LIMIT - 1) // STATUS_LIMIT, 1)
+        page_no = min(STATUS_PAGES.get(chat_id, 1), pages)
         if data[1] == "nex":
-            if PAGE_NO == PAGES:
-                STATUS_START = 0
-                PAGE_NO = 1
-            else:
-                STATUS_START += STATUS_LIMIT
-                PAGE_NO += 1
+            STATUS_PAGES[chat_id] = 1 if page_no == pages else page_no + 1
         elif data[1] == "pre":
-            if PAGE_NO == 1:
-                STATUS_START = STATUS_LIMIT * (PAGES - 1)
-                PAGE_NO = PAGES
-            else:
-                STATUS_START -= STATUS_LIMIT
-                PAGE_NO -= 1
+            STATUS_PAGES[chat_id] = pages if page_no == 1 else page_no - 1
 
 
 def get_readable_time(seconds):
@@ -510,10 +544,11 @@ async def get_stats(event, key="home"):
         btns.ibutton('Bot Limits', f'wzmlx {user_id} stats botlimits')
         msg = "⌬ <b><i>Bot & OS Statistics!</i></b>"
     elif key == "stbot":
-        total, used, free, disk = disk_usage('/')
-        swap = swap_memory()
-        memory = virtual_memory()
-        disk_io = disk_io_counters()
+        stats = await sys_stats.get_latest()
+        total, used, free, disk = stats['root_disk']
+        swap = stats['swap']
+        memory = stats['ram']
+        disk_io = stats['disk_io']
         msg = BotTheme(
             'BOT_STATS',
             bot_uptime=get_readable_time(time() - botStartTime),
@@ -539,26 +574,30 @@ async def get_stats(event, key="home"):
             disk_u=get_readable_file_size(used),
             disk_f=get_readable_file_size(free),
         )
+        msg += f"\n<b>RAM Trend :</b> <code>{sys_stats.sparkline(lambda sample: sample['ram'].percent)}</code>"
     elif key == "stsys":
-        cpuUsage = cpu_percent(interval=0.5)
+        stats, static = await sys_stats.get_latest(), sys_stats.static
+        cpuUsage = stats['cpu']
+        net_io = stats['net_io']
         msg = BotTheme('SYS_STATS',
-            os_uptime=get_readable_time(time() - boot_time()),
-            os_version=platform.version(),
-            os_arch=platform.platform(),
-            up_data=get_readable_file_size(net_io_counters().bytes_sent),
-            dl_data=get_readable_file_size(net_io_counters().bytes_recv),
-            pkt_sent=str(net_io_counters().packets_sent)[:-3],
-            pkt_recv=str(net_io_counters().packets_recv)[:-3],
-            tl_data=get_readable_file_size(net_io_counters().bytes_recv + net_io_counters().bytes_sent),
+            os_uptime=get_readable_time(time() - static['boot_time']),
+            os_version=static['os_version'],
+            os_arch=static['os_arch'],
+            up_data=get_readable_file_size(net_io.bytes_sent),
+            dl_data=get_readable_file_size(net_io.bytes_recv),
+            pkt_sent=str(net_io.packets_sent)[:-3],
+            pkt_recv=str(net_io.packets_recv)[:-3],
+            tl_data=get_readable_file_size(net_io.bytes_recv + net_io.bytes_sent),
             cpu=cpuUsage,
             cpu_bar=get_progress_bar_string(cpuUsage),
-            cpu_freq=f"{cpu_freq(percpu=False).current / 1000:.2f} GHz" if cpu_freq() else "Access Denied",
-            sys_load="%, ".join(str(round((x / cpu_count() * 100), 2)) for x in getloadavg()) + "%, (1m, 5m, 15m)",
-            p_core=cpu_count(logical=False),
-            v_core=cpu_count(logical=True) - cpu_count(logical=False),
-            total_core=cpu_count(logical=True),
-            cpu_use=len(Process().cpu_affinity()),
+            cpu_freq=f"{stats['cpu_freq'] / 1000:.2f} GHz" if stats['cpu_freq'] else "Access Denied",
+            sys_load="%, ".join(str(round((x / static['total_core'] * 100), 2)) for x in stats['load']) + "%, (1m, 5m, 15m)",
+            p_core=static['p_core'],
+            v_core=static['total_core'] - static['p_core'],
+            total_core=static['total_core'],
+            cpu_use=static['cpu_use'],
         )
+        msg += f"\n<b>CPU Trend :</b> <code>{sys_stats.sparkline(lambda sample: sample['cpu'])}</code>"
     elif key == "strepo":
         last_commit, changelog = 'No Data', 'N/A'
         if await aiopath.exists('.git'):
@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+from time import time
 from aiofiles.os import path as aiopath, makedirs
 from aiofiles import open as aiopen
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -130,10 +131,11 @@ class DbManger:
         await self.__db.users[bot_id].update_one({'_id': user_id}, {'$set': {key: doc_bin}}, upsert=True)
         self.__conn.close
 
-    async def get_pm_uids(self):
+    async def get_pm_uids(self, after=None):
         if self.__err:
             return
-        return [doc['_id'] async for doc in self.__db.pm_users[bot_id].find({})]
+        query = {'_id': {'$gt': after}} if after is not None else {}
+        return [doc['_id'] async for doc in self.__db.pm_users[bot_id].find(query).sort('_id', 1)]
         
     async def update_pm_users(self, user_id):
         if self.__err:
@@ -148,6 +150,42 @@ class DbManger:
             return
         await self.__db.pm_users[bot_id].delete_one({'_id': user_id})
         self.__conn.close
+
+    async def rm_pm_users(self, user_ids):
+        if self.__err or not user_ids:
+            return
+        await self.__db.pm_users[bot_id].delete_many({'_id': {'$in': list(user_ids)}})
+        self.__conn.close
+
+    async def save_bc_checkpoint(self, bc_id, data):
+        if self.__err:
+            return
+        await self.__db.broadcasts[bot_id].update_one({'_id': bc_id}, {'$set': data}, upsert=True)
+        self.__conn.close
+
+    async def get_bc_checkpoint(self, bc_id):
+        if self.__err:
+            return
+        return await self.__db.broadcasts[bot_id].find_one({'_id': bc_id})
+
+    async def rm_bc_checkpoint(self, bc_id):
+        if self.__err:
+            return
+        await self.__db.broadcasts[bot_id].delete_one({'_id': bc_id})
+        await self.__db.bc_msgs[bot_id].delete_many({'bc_id': bc_id})
+        self.__conn.close
+
+    async def add_bc_msgs(self, bc_id, chat_ids, msg_ids):
+        if self.__err:
+            return
+        await self.__db.bc_msgs[bot_id].insert_one({'bc_id': bc_id, 'chat_ids': chat_ids, 'msg_ids': msg_ids})
+        self.__conn.close
+
+    async def iter_bc_msgs(self, bc_id):
+        if self.__err:
+            return
+        async for doc in self.__db.bc_msgs[bot_id].find({'bc_id': bc_id}):
+            yield doc['chat_ids'], doc['msg_ids']
         
     async def rss_update_all(self):
         if self.__err:
@@ -199,6 +237,42 @@ class DbManger:
         self.__conn.close
         return notifier_dict  # return a dict ==> {cid: {tag: [{_id: source}, {_id, source}, ...]}}
 
+    async def save_upload_ckpt(self, key, data):
+        if self.__err:
+            return
+        await self.__db.upload_ckpt[bot_id].update_one({'_id': key}, {'$set': data}, upsert=True)
+        self.__conn.close
+
+    async def get_upload_ckpts(self):
+        if self.__err:
+            return []
+        # return a list ==> [{_id, cid, mid, uid, tag, name, dir, opts, gd_dirs, gd_sessions, gd_done, tg_parts}, ...]
+        return [row async for row in self.__db.upload_ckpt[bot_id].find({})]
+
+    async def get_upload_ckpt(self, key):
+        if self.__err:
+            return
+        return await self.__db.upload_ckpt[bot_id].find_one({'_id': key})
+
+    async def rm_upload_ckpt(self, key):
+        if self.__err:
+            return
+        await self.__db.upload_ckpt[bot_id].delete_one({'_id': key})
+        self.__conn.close
+
+    async def get_meta_cache(self, key, ttl):
+        if self.__err:
+            return
+        doc = await self.__db.meta_cache[bot_id].find_one({'_id': key})
+        if doc and time() - doc['time'] < ttl:
+            return doc['data']
+
+    async def set_meta_cache(self, key, data):
+        if self.__err:
+            return
+        await self.__db.meta_cache[bot_id].replace_one({'_id': key}, {'data': data, 'time': time()}, upsert=True)
+        self.__conn.close
+
     async def trunc_table(self, name):
         if self.__err:
             return
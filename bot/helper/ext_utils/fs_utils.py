@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-from os import walk, path as ospath
+from os import walk, lstat, remove, listdir as listdir_sync, path as ospath
+from threading import Lock
+from time import time
 from aiofiles.os import remove as aioremove, path as aiopath, listdir, rmdir, makedirs
 from aioshutil import rmtree as aiormtree
 from shutil import rmtree, disk_usage
@@ -11,6 +13,7 @@ from sys import exit as sexit
 from .exceptions import NotSupportedExtractionArchive
 from bot import aria2, LOGGER, DOWNLOAD_DIR, get_client, GLOBAL_EXTENSION_FILTER
 from bot.helper.ext_utils.bot_utils import sync_to_async, cmd_exec
+from bot.helper.ext_utils.upload_checkpoint import ckpt_dirs
 
 ARCH_EXT = [".tar.bz2", ".tar.gz", ".bz2", ".gz", ".tar.xz", ".tar", ".tbz2", ".tgz", ".lzma2",
             ".zip", ".7z", ".z", ".rar", ".iso", ".wim", ".cab", ".apm", ".arj", ".chm",
@@ -58,10 +61,16 @@ async def clean_download(path):
             pass
 
 
-async def start_cleanup():
+async def start_cleanup(keep=()):
     get_client().torrents_delete(torrent_hashes="all")
     try:
-        await aiormtree(DOWNLOAD_DIR)
+        if keep:
+            # Downloads of tasks with a resumable upload survive the restart
+            for item in await listdir(DOWNLOAD_DIR):
+                if item not in keep:
+                    await clean_target(ospath.join(DOWNLOAD_DIR, item))
+        else:
+            await aiormtree(DOWNLOAD_DIR)
     except Exception:
         pass
     await makedirs(DOWNLOAD_DIR, exist_ok=True)
@@ -71,7 +80,18 @@ def clean_all():
     aria2.remove_all(True)
     get_client().torrents_delete(torrent_hashes="all")
     try:
-        rmtree(DOWNLOAD_DIR)
+        if ckpt_dirs:
+            # Same as start_cleanup, a restart must not take the resumable uploads with it
+            for item in listdir_sync(DOWNLOAD_DIR):
+                if item in ckpt_dirs:
+                    continue
+                item = ospath.join(DOWNLOAD_DIR, item)
+                if ospath.isdir(item) and not ospath.islink(item):
+                    rmtree(item)
+                else:
+                    remove(item)
+        else:
+            rmtree(DOWNLOAD_DIR)
     except Exception:
         pass
 
@@ -81,7 +101,7 @@ def exit_clean_up(signal, frame):
         LOGGER.info(
             "Please wait, while we clean up and stop the running downloads")
         clean_all()
-        srun(['pkill', '-9', '-f', 'gunicorn|aria2c|qbittorrent-nox|ffmpeg'])
+        srun(['pkill', '-9', '-f', 'aria2c|qbittorrent-nox|ffmpeg'])
         sexit(0)
     except KeyboardInterrupt:
         LOGGER.warning("Force Exiting before the cleanup finishes!")
@@ -142,8 +162,81 @@ def get_mime_type(file_path):
     return mime_type
 
 
-def check_storage_threshold(size, threshold, arch=False, alloc=False):
-    free = disk_usage(DOWNLOAD_DIR).free
+LEDGER_MEASURE_TTL = 10
+
+
+def get_allocated_size(path):
+    total_size = 0
+    for root, _, files in walk(path):
+        for f in files:
+            try:
+                total_size += lstat(ospath.join(root, f)).st_blocks * 512
+            except OSError:
+                pass
+    return total_size
+
+
+class DiskLedger:
+    def __init__(self):
+        self.__reserved = {}
+        self.__written = {}
+        self.__lock = Lock()
+        self.__admit = Lock()
+
+    def reserve(self, uid, size, factor=1):
+        with self.__lock:
+            self.__reserved[uid] = size * factor
+            self.__written.setdefault(uid, (0, 0))
+
+    def release(self, uid):
+        with self.__lock:
+            self.__reserved.pop(uid, None)
+            self.__written.pop(uid, None)
+
+    def __measure(self, uid):
+        # Walks the task folders at most once per LEDGER_MEASURE_TTL, the walk itself runs unlocked
+        with self.__lock:
+            measured_at, written = self.__written.get(uid, (0, 0))
+        if time() - measured_at < LEDGER_MEASURE_TTL:
+            return written
+        size = get_allocated_size(f'{DOWNLOAD_DIR}{uid}') + get_allocated_size(f'{DOWNLOAD_DIR}{uid}10000')
+        with self.__lock:
+            if uid not in self.__reserved:
+                return size
+            # Leech deletes files as they're uploaded, so only count the high-water mark
+            written = max(size, self.__written.get(uid, (0, 0))[1])
+            self.__written[uid] = (time(), written)
+        return written
+
+    def outstanding(self, exclude=()):
+        total = 0
+        with self.__lock:
+            reserved = list(self.__reserved.items())
+        for uid, expected in reserved:
+            if uid in exclude:
+                continue
+            total += max(expected - self.__measure(uid), 0)
+        return total
+
+    def free_space(self, exclude=()):
+        return disk_usage(DOWNLOAD_DIR).free - self.outstanding(exclude)
+
+    def try_reserve(self, uid, size, factor, threshold):
+        with self.__admit:
+            self.release(uid)
+            if self.free_space() - size * factor < threshold:
+                return False
+            self.reserve(uid, size, factor)
+            return True
+
+
+disk_ledger = DiskLedger()
+
+
+def check_storage_threshold(size, threshold, arch=False, alloc=False, uid=None):
+    if uid is not None:
+        return disk_ledger.try_reserve(uid, size, 2 if arch else 1, threshold)
+    free = disk_ledger.free_space()
     if not alloc:
         if (not arch and free - size < threshold or arch and free - (size * 2) < threshold):
             return False
@@ -88,6 +88,7 @@ If you want to add path manually from your config (uploaded from usetting) add <
 ➲ <b><i>RClone Flags</i></b>: -rcf
 <code>/cmd</code> link -up path|rcl -rcf --buffer-size:8M|--drive-starred-only|key|key:value
 This will override all other flags except --exclude
+Add <code>debug</code> to the flags to save DEBUG log of that task in rlog.txt
 Check here all <a href='https://rclone.org/flags/'>RcloneFlags</a>.
 
 ➲ <b><i>Bulk Download</i></b>: -b or -bulk
@@ -131,6 +132,7 @@ MIRROR_HELP_MESSAGE = ["""<i>Send links/files along with cmd or reply to cmd to
 19. <b>-ud or -dump :</b> Dump category to Upload, Specific Name (case insensitive) or chat_id or chat_username
 20. <b>-ss or -screenshots :</b> Generate Screenshots for Leeched Files
 21. <b>-t or -thumb :</b> Custom Thumb for Specific Leech
+22. <b>-st or -stream :</b> Stream file directly to Drive/RClone without local copy
 """, """
 ➲ <b><i>By along the cmd</i></b>:
 <code>/cmd</code> link -n new name
@@ -148,6 +150,11 @@ MIRROR_HELP_MESSAGE = ["""<i>Send links/files along with cmd or reply to cmd to
 ➲ <b><i>Direct link custom headers</i></b>: -h or -headers
 <code>/cmd</code> link -h key: value key1: value1
 
+➲ <b><i>Stream Mirror</i></b>: -st or -stream
+<code>/cmd</code> link -st -up remote:path
+Pipes a single file from a direct link or rclone path straight into GDrive/RClone, nothing is saved on disk.
+<b>NOTES:</b> Doesn't work with leech, zip, extract, select, seed, join, samedir or ddl uploads.
+
 ➲ <b><i>Screenshot Generation</b>: -ss or -screenshots
 <code>/cmd</code> link -ss number ,Screenshots for each Video File
 
@@ -206,6 +213,7 @@ If you want to add path manually from your config (uploaded from usetting) add <
 ➲ <b><i>RClone Flags</i></b>: -rcf
 <code>/cmd</code> link|path|rcl -up path|rcl -rcf --buffer-size:8M|--drive-starred-only|key|key:value
 This will override all other flags except --exclude
+Add <code>debug</code> to the flags to save DEBUG log of that task in rlog.txt
 Check here all <a href='https://rclone.org/flags/'>RcloneFlags</a>.
 
 ➲ <b><i>Bulk Download</i></b>: -b or -bulk
@@ -244,6 +252,8 @@ Some links need user access so sure you must add USER_SESSION_STRING for it.
 • <b>Public:</b> <code>https://t.me/channel_name/message_id</code>
 • <b>Private:</b> <code>tg://openmessage?user_id=xxxxxx&message_id=xxxxx</code>
 • <b>Super:</b> <code>https://t.me/c/channel_id/message_id</code>
+• <b>Range:</b> <code>https://t.me/c/channel_id/start_id-end_id</code>
+Range links download every media in the range into one folder (-m folder_name or channel_range by default), skipping duplicates.
 
 ➲ <b>NOTES:</b>
 1. Commands that start with <b>qb</b> are ONLY for torrents.
@@ -501,6 +511,7 @@ default_desp = {'AS_DOCUMENT': 'Default type of Telegram file upload. Default is
                 'OWNER_ID': 'The Telegram User ID (not username) of the Owner of the bot.',
                 'QUEUE_ALL': 'Number of parallel tasks of downloads and uploads. For example if 20 task added and QUEUE_ALL is 8, then the summation of uploading and downloading tasks are 8 and the rest in queue. Int. NOTE: if you want to fill QUEUE_DOWNLOAD or QUEUE_UPLOAD, then QUEUE_ALL value must be greater than or equal to the greatest one and less than or equal to summation of QUEUE_UPLOAD and QUEUE_DOWNLOAD',
                 'QUEUE_DOWNLOAD': 'Number of all parallel downloading tasks. Int',
+                'QUEUE_DOWNLOAD_BURST': 'Let QUEUE_DOWNLOAD go up to 2x while the download link is mostly idle. Default is False.',
                 'QUEUE_UPLOAD': 'Number of all parallel uploading tasks. Int',
                 'RCLONE_FLAGS': 'key:value|key|key|key:value . Check here all RcloneFlags.',
                 'RCLONE_PATH': "Default rclone path to which you want to upload all the mirrors using rclone.",
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from time import time
+from collections import OrderedDict
+from aiohttp import ClientSession, ClientTimeout
+
+from bot import DATABASE_URL, LOGGER, bot_loop
+from bot.helper.ext_utils.db_handler import DbManger
+
+
+class TTLCache:
+    def __init__(self, maxsize=512, ttl=21600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.__data = OrderedDict()
+
+    def get(self, key):
+        if (item := self.__data.get(key)) is None:
+            return None
+        expire, value = item
+        if expire < time():
+            del self.__data[key]
+            return None
+        self.__data.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.__data[key] = (time() + self.ttl, value)
+        self.__data.move_to_end(key)
+        while len(self.__data) > self.maxsize:
+            self.__data.popitem(last=False)
+
+
+class MetaLookup:
+    def __init__(self, maxsize=512, ttl=21600):
+        self.__cache = TTLCache(maxsize, ttl)
+        self.__inflight = {}
+        self.__session = None
+
+    @property
+    def session(self):
+        if self.__session is None or self.__session.closed:
+            self.__session = ClientSession(timeout=ClientTimeout(total=30))
+        return self.__session
+
+    async def __load(self, key, fetcher, persist):
+        if persist and DATABASE_URL and (data := await DbManger().get_meta_cache(key, self.__cache.ttl)) is not None:
+            return data
+        data = await fetcher()
+        if data is not None and persist and DATABASE_URL:
+            try:
+                await DbManger().set_meta_cache(key, data)
+            except Exception as e:
+                LOGGER.error(f"Meta Cache Error: {e}")
+        return data
+
+    async def get(self, key, fetcher, persist=True):
+        if (data := self.__cache.get(key)) is not None:
+            return data
+        if (task := self.__inflight.get(key)) is None:
+            task = bot_loop.create_task(self.__load(key, fetcher, persist))
+            self.__inflight[key] = task
+            task.add_done_callback(lambda _: self.__inflight.pop(key, None))
+        data = await task
+        if data is not None:
+            self.__cache.set(key, data)
+        return data
+
+    async def get_json(self, url, key=None, persist=True):
+        async def fetch():
+            async with self.session.get(url) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.json()
+        return await self.get(key or f"GET:{url}", fetch, persist)
+
+    async def post_json(self, url, json, key, persist=True):
+        async def fetch():
+            async with self.session.post(url, json=json) as resp:
+                if resp.status != 200:
+                    return None
+                return await resp.json()
+        return await self.get(key, fetch, persist)
+
+
+meta_lookup = MetaLookup()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+from time import time
+from itertools import count
+
+BW_IDLE_RATIO = 0.5
+DISK_HOLD_TIMEOUT = 3 * 3600
+
+
+class QueueEntry:
+    def __init__(self, uid, user_id, size, priority, seq, listener=None):
+        self.uid = uid
+        self.user_id = user_id
+        self.size = size
+        self.priority = priority
+        self.seq = seq
+        self.listener = listener
+        self.added = time()
+        self.held_since = None
+        self.notified = False
+
+
+class QueueScheduler:
+    def __init__(self):
+        self.entries = {}
+        self.last_plan = {}
+        self.__seq = count()
+
+    def add(self, uid, user_id, size=0, priority=0, listener=None):
+        self.entries[uid] = QueueEntry(uid, user_id, size or 0, priority, next(self.__seq), listener)
+
+    def remove(self, uid):
+        self.entries.pop(uid, None)
+
+    def prune(self, uids):
+        for uid in self.entries.keys() - uids:
+            del self.entries[uid]
+
+    def order(self, uids, running_by_user, free_bytes=None):
+        # priority, then fewest running tasks for the user, then FIFO; smallest first when disk is tight
+        entries = [self.entries.get(uid) or QueueEntry(uid, None, 0, 0, -1) for uid in uids]
+        tight = free_bytes is not None and sum(e.size for e in entries) > free_bytes
+        running = dict(running_by_user)
+        plan, held = [], []
+        pending = entries
+        while pending:
+            best = min(pending, key=lambda e: (-e.priority, running.get(e.user_id, 0), e.size if tight else 0, e.seq))
+            pending = [e for e in pending if e is not best]
+            if tight and best.size > free_bytes:
+                held.append(best.uid)
+                continue
+            plan.append(best.uid)
+            running[best.user_id] = running.get(best.user_id, 0) + 1
+            if tight:
+                free_bytes -= best.size
+        return plan, held
+
+    def pick(self, name, uids, slots, running_by_user, free_bytes=None):
+        plan, held = self.order(uids, running_by_user, free_bytes)
+        self.last_plan[name] = (plan, held)
+        held_set = set(held)
+        for uid in uids:
+            if (entry := self.entries.get(uid)) is not None:
+                if uid not in held_set:
+                    entry.held_since = None
+                elif entry.held_since is None:
+                    entry.held_since = time()
+        return plan[:max(slots, 0)]
+
+    def held_entries(self, name):
+        # (entries to notify once, entries held past DISK_HOLD_TIMEOUT)
+        notify, expired = [], []
+        for uid in self.last_plan.get(name, ((), ()))[1]:
+            if (entry := self.entries.get(uid)) is None or entry.listener is None:
+                continue
+            if time() - entry.held_since > DISK_HOLD_TIMEOUT:
+                expired.append(self.entries.pop(uid))
+            elif not entry.notified:
+                entry.notified = True
+                notify.append(entry)
+        return notify, expired
+
+    @staticmethod
+    def bandwidth_limit(limit, rate, peak):
+        if not limit or not peak or (util := rate / peak) >= BW_IDLE_RATIO:
+            return limit
+        return limit + int(limit * (1 - util / BW_IDLE_RATIO))
+
+    def summary(self):
+        parts = []
+        for name, (plan, held) in self.last_plan.items():
+            if not (plan or held):
+                continue
+            line = f"{name}: {len(plan)} waiting"
+            if plan and (entry := self.entries.get(plan[0])):
+                line += f", next #{entry.user_id}"
+            if held:
+                line += f", {len(held)} held for disk"
+            parts.append(line)
+        return ' | '.join(parts)
+
+
+queue_scheduler = QueueScheduler()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import platform
+from time import time
+from collections import deque
+from asyncio import sleep
+from psutil import disk_usage, disk_io_counters, Process, cpu_percent, swap_memory, cpu_count, cpu_freq, getloadavg, virtual_memory, net_io_counters, boot_time
+
+from bot import LOGGER, config_dict, bot_loop
+
+SAMPLE_INTERVAL = 5
+SAMPLE_HISTORY = 120
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+class SystemSampler:
+    def __init__(self, interval=SAMPLE_INTERVAL, history=SAMPLE_HISTORY):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.static = {}
+        self.__task = None
+
+    def __collect(self):
+        if not self.static:
+            self.static = {'os_version': platform.version(), 'os_arch': platform.platform(), 'boot_time': boot_time(),
+                           'p_core': cpu_count(logical=False), 'total_core': cpu_count(logical=True),
+                           'cpu_use': len(Process().cpu_affinity())}
+        try:
+            freq = cpu_freq(percpu=False)
+        except Exception:
+            freq = None
+        return {'time': time(), 'cpu': cpu_percent(), 'ram': virtual_memory(), 'swap': swap_memory(),
+                'dl_disk': disk_usage(config_dict['DOWNLOAD_DIR']), 'root_disk': disk_usage('/'),
+                'disk_io': disk_io_counters(), 'net_io': net_io_counters(), 'load': getloadavg(),
+                'cpu_freq': freq.current if freq else None}
+
+    async def __run(self):
+        while True:
+            try:
+                self.samples.append(await bot_loop.run_in_executor(None, self.__collect))
+            except Exception as e:
+                LOGGER.error(f"System Sampler Error: {e}")
+            await sleep(self.interval)
+
+    def start(self):
+        if self.__task is None:
+            cpu_percent()
+            self.__task = bot_loop.create_task(self.__run())
+
+    @property
+    def latest(self):
+        # None until the first sample, psutil reads must not run on the loop
+        return self.samples[-1] if self.samples else None
+
+    async def get_latest(self):
+        if not self.samples:
+            self.samples.append(await bot_loop.run_in_executor(None, self.__collect))
+        return self.samples[-1]
+
+    def history(self, getter):
+        return [getter(sample) for sample in self.samples]
+
+    def sparkline(self, getter, width=24, top=100):
+        values = self.history(getter)[-width:]
+        return ''.join(SPARK_CHARS[min(int(value / top * len(SPARK_CHARS)), len(SPARK_CHARS) - 1)] for value in values)
+
+
+sys_stats = SystemSampler()
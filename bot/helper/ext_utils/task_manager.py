@@ -2,11 +2,13 @@
 from time import time
 from asyncio import Event
 
-from bot import bot_cache, config_dict, queued_dl, queued_up, non_queued_up, non_queued_dl, queue_dict_lock, LOGGER, user_data, download_dict
+from bot import bot_cache, config_dict, queued_dl, queued_up, non_queued_up, non_queued_dl, queue_dict_lock, LOGGER, user_data, download_dict, OWNER_ID
 from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
-from bot.helper.ext_utils.fs_utils import get_base_name, check_storage_threshold
-from bot.helper.ext_utils.bot_utils import get_user_tasks, getdailytasks, sync_to_async, get_telegraph_list, get_readable_file_size, checking_access, get_readable_time
-from bot.helper.telegram_helper.message_utils import forcesub, check_botpm
+from bot.helper.ext_utils.fs_utils import get_base_name, check_storage_threshold, disk_ledger
+from bot.helper.ext_utils.bot_utils import get_user_tasks, getdailytasks, sync_to_async, get_telegraph_list, get_readable_file_size, checking_access, get_readable_time, setInterval
+from bot.helper.ext_utils.queue_scheduler import queue_scheduler, DISK_HOLD_TIMEOUT
+from bot.helper.ext_utils.sys_stats import sys_stats
+from bot.helper.telegram_helper.message_utils import forcesub, check_botpm, sendMessage
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.themes import BotTheme
 
@@ -44,11 +46,61 @@ async def timeval_check(user_id):
     return None
 
 
-async def is_queued(uid):
+def task_priority(user_id):
+    if user_id == OWNER_ID:
+        return 2
+    user_dict = user_data.get(user_id, {})
+    return user_dict.get('priority', 1 if user_dict.get('is_sudo') else 0)
+
+
+def storage_factor(listener, size):
+    if listener.isStream:
+        return 0
+    if listener.compress or listener.extract:
+        return 2
+    if listener.isLeech:
+        split_size = user_data.get(listener.message.from_user.id, {}).get('split_size') or config_dict['LEECH_SPLIT_SIZE']
+        if size > split_size:
+            return 2
+    return 1
+
+
+def enqueue(uid, listener, size=0):
+    user_id = listener.message.from_user.id
+    queue_scheduler.add(uid, user_id, size, task_priority(user_id), listener)
+    if not bot_cache.get('queue_ticker'):
+        bot_cache['queue_ticker'] = setInterval(30, start_from_queued)
+
+
+def __running_by_user(uids):
+    running = {}
+    for uid in uids:
+        if (task := download_dict.get(uid)) is not None:
+            user_id = task.message.from_user.id
+            running[user_id] = running.get(user_id, 0) + 1
+    return running
+
+
+def __dl_bandwidth():
+    samples = list(sys_stats.samples)
+    rates = [(b['net_io'].bytes_recv - a['net_io'].bytes_recv) / (b['time'] - a['time'])
+             for a, b in zip(samples, samples[1:]) if b['time'] > a['time']]
+    return (rates[-1], max(rates)) if rates else (0, 0)
+
+
+def dl_queue_limit():
+    if not config_dict['QUEUE_DOWNLOAD_BURST']:
+        return config_dict['QUEUE_DOWNLOAD']
+    return queue_scheduler.bandwidth_limit(config_dict['QUEUE_DOWNLOAD'], *__dl_bandwidth())
+
+
+async def is_queued(uid, listener=None, size=0):
     all_limit = config_dict['QUEUE_ALL']
-    dl_limit = config_dict['QUEUE_DOWNLOAD']
+    dl_limit = dl_queue_limit()
     event = None
     added_to_queue = False
+    if listener and size:
+        disk_ledger.reserve(uid, size, storage_factor(listener, size))
     if all_limit or dl_limit:
         async with queue_dict_lock:
             dl = len(non_queued_dl)
@@ -57,77 +109,65 @@ async def is_queued(uid):
                 added_to_queue = True
                 event = Event()
                 queued_dl[uid] = event
+                if listener:
+                    enqueue(uid, listener, size)
     return added_to_queue, event
 
 
 def start_dl_from_queued(uid):
     queued_dl[uid].set()
     del queued_dl[uid]
+    queue_scheduler.remove(uid)
 
 
 def start_up_from_queued(uid):
     queued_up[uid].set()
     del queued_up[uid]
+    queue_scheduler.remove(uid)
 
 
-async def start_from_queued():
-    if all_limit := config_dict['QUEUE_ALL']:
-        dl_limit = config_dict['QUEUE_DOWNLOAD']
-        up_limit = config_dict['QUEUE_UPLOAD']
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            up = len(non_queued_up)
-            all_ = dl + up
-            if all_ < all_limit:
-                f_tasks = all_limit - all_
-                if queued_up and (not up_limit or up < up_limit):
-                    for index, uid in enumerate(list(queued_up.keys()), start=1):
-                        f_tasks = all_limit - all_
-                        start_up_from_queued(uid)
-                        f_tasks -= 1
-                        if f_tasks == 0 or (up_limit and index >= up_limit - up):
-                            break
-                if queued_dl and (not dl_limit or dl < dl_limit) and f_tasks != 0:
-                    for index, uid in enumerate(list(queued_dl.keys()), start=1):
-                        start_dl_from_queued(uid)
-                        if (dl_limit and index >= dl_limit - dl) or index == f_tasks:
-                            break
-        return
+async def __free_bytes():
+    return await sync_to_async(disk_ledger.free_space, set(queued_dl))
 
-    if up_limit := config_dict['QUEUE_UPLOAD']:
-        async with queue_dict_lock:
-            up = len(non_queued_up)
-            if queued_up and up < up_limit:
-                f_tasks = up_limit - up
-                for index, uid in enumerate(list(queued_up.keys()), start=1):
-                    start_up_from_queued(uid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_up:
-                for uid in list(queued_up.keys()):
-                    start_up_from_queued(uid)
 
-    if dl_limit := config_dict['QUEUE_DOWNLOAD']:
-        async with queue_dict_lock:
-            dl = len(non_queued_dl)
-            if queued_dl and dl < dl_limit:
-                f_tasks = dl_limit - dl
-                for index, uid in enumerate(list(queued_dl.keys()), start=1):
-                    start_dl_from_queued(uid)
-                    if index == f_tasks:
-                        break
-    else:
-        async with queue_dict_lock:
-            if queued_dl:
-                for uid in list(queued_dl.keys()):
-                    start_dl_from_queued(uid)
+async def start_from_queued():
+    all_limit = config_dict['QUEUE_ALL']
+    up_limit = config_dict['QUEUE_UPLOAD']
+    dl_limit = dl_queue_limit()
+    async with queue_dict_lock:
+        queue_scheduler.prune(queued_dl.keys() | queued_up.keys())
+        dl = len(non_queued_dl)
+        up = len(non_queued_up)
+        up_slots = up_limit - up if up_limit else len(queued_up)
+        dl_slots = dl_limit - dl if dl_limit else len(queued_dl)
+        if all_limit:
+            free_slots = all_limit - dl - up
+            up_slots = min(up_slots, free_slots)
+        if queued_up:
+            for uid in queue_scheduler.pick('UP', list(queued_up), up_slots, __running_by_user(non_queued_up)):
+                start_up_from_queued(uid)
+                if all_limit:
+                    free_slots -= 1
+        if all_limit:
+            dl_slots = min(dl_slots, free_slots)
+        if queued_dl:
+            for uid in queue_scheduler.pick('DL', list(queued_dl), dl_slots, __running_by_user(non_queued_dl), await __free_bytes()):
+                start_dl_from_queued(uid)
+        notify, expired = queue_scheduler.held_entries('DL')
+    # onDownloadError takes queue_dict_lock and calls back into start_from_queued
+    for entry in notify:
+        await sendMessage(entry.listener.message, BotTheme('QUEUE_HELD_DISK', size=get_readable_file_size(entry.size),
+                                                           timeout=get_readable_time(DISK_HOLD_TIMEOUT)))
+    for entry in expired:
+        await entry.listener.onDownloadError(BotTheme('QUEUE_HOLD_TIMEOUT', size=get_readable_file_size(entry.size),
+                                                      timeout=get_readable_time(DISK_HOLD_TIMEOUT)))
 
 
 async def limit_checker(size, listener, isTorrent=False, isMega=False, isDriveLink=False, isYtdlp=False, isPlayList=None):
     LOGGER.info('Checking Size Limit of link/file/folder/tasks...')
     user_id = listener.message.from_user.id 
+    if size and not listener.isClone:
+        disk_ledger.reserve(listener.uid, size, storage_factor(listener, size))
     if await CustomFilters.sudo('', listener.message):
         return
     limit_exceeded = ''
@@ -171,9 +211,9 @@ async def limit_checker(size, listener, isTorrent=False, isMega=False, isDriveLi
                 limit_exceeded = f'Leech limit is {get_readable_file_size(limit)}'
         
         if (STORAGE_THRESHOLD := config_dict['STORAGE_THRESHOLD']) and not listener.isClone:
-            arch = any([listener.compress, listener.extract])
+            arch = storage_factor(listener, size) == 2
             limit = STORAGE_THRESHOLD * 1024**3
-            acpt = await sync_to_async(check_storage_threshold, size, limit, arch)
+            acpt = await sync_to_async(check_storage_threshold, size, limit, arch, uid=listener.uid)
             if not acpt:
                 limit_exceeded = f'You must leave {get_readable_file_size(limit)} free storage.'
 
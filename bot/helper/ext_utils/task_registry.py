@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+
+class TaskRegistry(dict):
+    # Tasks whose gid can change while running (aria2 metadata -> torrent) set volatile_gid.
+    # Status is indexed on insert and refreshed by observe() wherever a task changes state in place
+    def __init__(self):
+        super().__init__()
+        self.__by_gid = {}
+        self.__gid_of = {}
+        self.__by_user = {}
+        self.__user_of = {}
+        self.__by_status = {}
+        self.__status_of = {}
+        self.__unresolved = set()
+
+    def __unindex(self, uid):
+        if (gid := self.__gid_of.pop(uid, None)) is not None and self.__by_gid.get(gid) == uid:
+            del self.__by_gid[gid]
+        if (user_id := self.__user_of.pop(uid, None)) is not None:
+            self.__by_user[user_id].discard(uid)
+            if not self.__by_user[user_id]:
+                del self.__by_user[user_id]
+        self.__unindex_status(uid)
+        self.__unresolved.discard(uid)
+
+    def __unindex_status(self, uid):
+        if (status := self.__status_of.pop(uid, None)) is not None:
+            self.__by_status[status].discard(uid)
+            if not self.__by_status[status]:
+                del self.__by_status[status]
+
+    def __index_status(self, uid, status):
+        if self.__status_of.get(uid) == status:
+            return
+        self.__unindex_status(uid)
+        if status is not None:
+            self.__status_of[uid] = status
+            self.__by_status.setdefault(status, set()).add(uid)
+
+    def __index_gid(self, uid, task):
+        try:
+            gid = task.gid()
+        except Exception:
+            self.__unresolved.add(uid)
+            return None
+        if (old := self.__gid_of.get(uid)) is not None and old != gid and self.__by_gid.get(old) == uid:
+            del self.__by_gid[old]
+        self.__gid_of[uid] = gid
+        self.__by_gid[gid] = uid
+        if getattr(task, 'volatile_gid', False):
+            self.__unresolved.add(uid)
+        else:
+            self.__unresolved.discard(uid)
+        return gid
+
+    def __setitem__(self, uid, task):
+        if uid in self:
+            self.__unindex(uid)
+        super().__setitem__(uid, task)
+        user_id = task.message.from_user.id
+        self.__user_of[uid] = user_id
+        self.__by_user.setdefault(user_id, set()).add(uid)
+        self.__index_gid(uid, task)
+        self.observe(uid)
+
+    def __delitem__(self, uid):
+        super().__delitem__(uid)
+        self.__unindex(uid)
+
+    def pop(self, uid, *default):
+        if uid in self:
+            self.__unindex(uid)
+        return super().pop(uid, *default)
+
+    def clear(self):
+        super().clear()
+        for index in (self.__by_gid, self.__gid_of, self.__by_user, self.__user_of, self.__by_status, self.__status_of,
+                      self.__unresolved):
+            index.clear()
+
+    def observe(self, uid, status=None, task=None):
+        # status/task come from a status read done elsewhere, dropped if the task was replaced since
+        if (current := self.get(uid)) is None or task is not None and current is not task:
+            return
+        task = current
+        if status is None:
+            try:
+                status = task.status()
+            except Exception:
+                return
+        self.__index_status(uid, status)
+
+    def observe_snapshot(self, snapshot):
+        for uid, task, status in snapshot:
+            self.observe(uid, status, task)
+
+    def by_gid(self, gid):
+        if (uid := self.__by_gid.get(gid)) is not None:
+            if uid not in self.__unresolved:
+                return self[uid]
+            if self.__index_gid(uid, self[uid]) == gid:
+                return self[uid]
+        for uid in list(self.__unresolved):
+            if self.__index_gid(uid, self[uid]) == gid:
+                return self[uid]
+        return None
+
+    def by_user(self, user_id):
+        return [self[uid] for uid in self.__by_user.get(user_id, ())]
+
+    def count_by_user(self, user_id):
+        return len(self.__by_user.get(user_id, ()))
+
+    def by_status(self, status, user_id=None):
+        uids = self.__by_status.get(status, set())
+        if user_id is not None:
+            uids = uids & self.__by_user.get(user_id, set())
+        return [self[uid] for uid in uids]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+from asyncio import sleep, shield
+from base64 import b16encode, b32decode
+from json import dumps, loads
+from re import search as re_search
+from time import time
+from aiofiles import open as aiopen
+from aiofiles.os import path as aiopath, makedirs, remove as aioremove, listdir
+
+from bot import DOWNLOAD_DIR, LOGGER, bot_loop, get_client
+from bot.helper.ext_utils.bot_utils import sync_to_async
+
+TORRENT_META_DIR = 'torrent_meta'
+TORRENT_META_MAX = 300
+RESOLVE_TIMEOUT = 60
+
+
+def magnet_hash(link):
+    if not link.startswith('magnet:') or not (match := re_search(r'xt=urn:btih:([a-zA-Z0-9]+)', link)):
+        return None
+    hash_ = match.group(1)
+    if len(hash_) == 32:
+        hash_ = b16encode(b32decode(hash_.upper())).decode()
+    return hash_.lower() if len(hash_) == 40 else None
+
+
+async def wait_for_torrent(client, predicate, timeout=None, **filters):
+    # qBittorrent has no push channel, poll with a growing delay instead of spinning
+    delay, start = 0.1, time()
+    while True:
+        tor_info = await sync_to_async(client.torrents_info, **filters)
+        tor_info = tor_info[0] if tor_info else None
+        if predicate(tor_info) or (timeout is not None and time() - start >= timeout):
+            return tor_info
+        await sleep(delay)
+        delay = min(delay * 2, 1)
+
+
+class TorrentMetaCache:
+    # .torrent files and file lists by infohash, so a repeated magnet skips DHT metadata resolution
+    def __init__(self, maxsize=TORRENT_META_MAX):
+        self.maxsize = maxsize
+        self.__index = None
+        self.__inflight = {}
+
+    @staticmethod
+    def torrent_path(hash_):
+        return f'{TORRENT_META_DIR}/{hash_}.torrent'
+
+    async def __load_index(self):
+        if self.__index is None:
+            self.__index = {}
+            await makedirs(TORRENT_META_DIR, exist_ok=True)
+            for item in await listdir(TORRENT_META_DIR):
+                if not item.endswith('.json'):
+                    continue
+                try:
+                    async with aiopen(f'{TORRENT_META_DIR}/{item}', 'r') as f:
+                        self.__index[item[:-5]] = loads(await f.read())
+                except Exception:
+                    continue
+        return self.__index
+
+    async def lookup(self, link):
+        if not (hash_ := magnet_hash(link)):
+            return None
+        index = await self.__load_index()
+        if (meta := index.get(hash_)) is not None and await aiopath.exists(self.torrent_path(hash_)):
+            return meta
+        return None
+
+    async def store(self, client, hash_):
+        hash_ = hash_.lower()
+        index = await self.__load_index()
+        if hash_ in index:
+            return index[hash_]
+        try:
+            data = await sync_to_async(client.torrents_export, torrent_hash=hash_)
+            files = await sync_to_async(client.torrents_files, torrent_hash=hash_)
+            tor_info = (await sync_to_async(client.torrents_info, torrent_hashes=hash_))[0]
+        except Exception as e:
+            LOGGER.error(f'Torrent Meta Cache: {e}')
+            return None
+        meta = {'hash': hash_, 'name': tor_info.name, 'size': tor_info.total_size,
+                'files': [[file_.name, file_.size] for file_ in files], 'time': time()}
+        async with aiopen(self.torrent_path(hash_), 'wb') as f:
+            await f.write(data)
+        async with aiopen(f'{TORRENT_META_DIR}/{hash_}.json', 'w') as f:
+            await f.write(dumps(meta))
+        index[hash_] = meta
+        for old in sorted(index, key=lambda key: index[key]['time'])[:max(len(index) - self.maxsize, 0)]:
+            del index[old]
+            for ext in ('torrent', 'json'):
+                try:
+                    await aioremove(f'{TORRENT_META_DIR}/{old}.{ext}')
+                except Exception:
+                    pass
+        return meta
+
+    async def resolve(self, link, timeout=RESOLVE_TIMEOUT):
+        # Metadata before admission: size for limit checks and the file list for selection, from cache or the swarm
+        if (meta := await self.lookup(link)) is not None or not (hash_ := magnet_hash(link)):
+            return meta
+        if (task := self.__inflight.get(hash_)) is None:
+            task = bot_loop.create_task(self.__resolve(link, hash_, timeout))
+            self.__inflight[hash_] = task
+            task.add_done_callback(lambda _: self.__inflight.pop(hash_, None))
+        return await shield(task)
+
+    async def __resolve(self, link, hash_, timeout):
+        client = await sync_to_async(get_client)
+        if await sync_to_async(client.torrents_info, torrent_hashes=hash_):
+            # Already added by a task, its own metadata download will fill the cache
+            return None
+        tag = f'meta_{hash_}'
+        try:
+            op = await sync_to_async(client.torrents_add, link, save_path=f'{DOWNLOAD_DIR}{tag}', tags=tag,
+                                     stop_condition='MetadataReceived', download_limit=1024)
+            if op.lower() != 'ok.':
+                return None
+            tor_info = await wait_for_torrent(client, lambda tor: tor is not None and tor.state not in
+                                              ['metaDL', 'checkingResumeData'], timeout, tag=tag)
+            if tor_info is None or tor_info.state in ['metaDL', 'checkingResumeData']:
+                LOGGER.info(f'Metadata not resolved in {timeout}s: {hash_}')
+                return None
+            return await self.store(client, hash_)
+        except Exception as e:
+            LOGGER.error(f'Torrent Meta Resolve: {e}')
+            return None
+        finally:
+            await sync_to_async(client.torrents_delete, torrent_hashes=hash_, delete_files=True)
+            await sync_to_async(client.torrents_delete_tags, tags=tag)
+            await sync_to_async(client.auth_log_out)
+
+
+torrent_meta = TorrentMetaCache()
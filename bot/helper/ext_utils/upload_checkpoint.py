@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+from hashlib import md5
+from os import path as ospath
+from time import time
+from aiofiles.os import path as aiopath
+
+from bot import DATABASE_URL, DOWNLOAD_DIR, config_dict
+from bot.helper.ext_utils.db_handler import DbManger
+
+CKPT_TTL = 2 * 24 * 3600
+# Download folders with a checkpoint row, kept by the restart and exit cleanups
+ckpt_dirs = set()
+
+
+def ckpt_field(rel_path):
+    # Mongo field names can't carry the dots and dollars of file names
+    return md5(rel_path.encode()).hexdigest()
+
+
+class UploadCheckpoint:
+    # Upload progress of one task, kept in the DB so a restart can resume instead of redoing the task
+    def __init__(self, listener, doc=None):
+        self.key = f'{listener.message.chat.id}_{listener.uid}'
+        self.__listener = listener
+        doc = doc or {}
+        self.__uid = doc.get('uid')
+        if self.__uid:
+            ckpt_dirs.add(self.__uid)
+        self.__gd_dirs = doc.get('gd_dirs', {})
+        self.__gd_sessions = doc.get('gd_sessions', {})
+        self.__gd_done = doc.get('gd_done', {})
+        self.__tg_parts = doc.get('tg_parts', {})
+
+    @staticmethod
+    def supported(listener):
+        return bool(DATABASE_URL and config_dict['INCOMPLETE_TASK_NOTIFIER'] and listener.isSuperGroup
+                    and (listener.isLeech or listener.upPath == 'gd'))
+
+    async def __save(self, data):
+        await DbManger().save_upload_ckpt(self.key, data)
+
+    async def begin(self, up_dir, up_name):
+        listener = self.__listener
+        self.__uid = ospath.relpath(up_dir, DOWNLOAD_DIR).split('/', 1)[0]
+        ckpt_dirs.add(self.__uid)
+        await self.__save({'cid': listener.message.chat.id, 'mid': listener.uid, 'user_id': listener.user_id, 'tag': listener.tag,
+                           'uid': self.__uid, 'dir': up_dir, 'name': up_name,
+                           'time': time(), 'opts': {'isLeech': listener.isLeech, 'upPath': listener.upPath,
+                                                    'drive_id': listener.drive_id, 'index_link': listener.index_link,
+                                                    'compress': bool(listener.compress), 'extract': bool(listener.extract),
+                                                    'isQbit': listener.isQbit, 'isYtdlp': listener.isYtdlp,
+                                                    'source_url': listener.source_url, 'leech_utils': listener.leech_utils}})
+
+    async def discard(self):
+        ckpt_dirs.discard(self.__uid)
+        await DbManger().rm_upload_ckpt(self.key)
+
+    def drive_dir(self, rel_path):
+        return self.__gd_dirs.get(ckpt_field(rel_path))
+
+    async def set_drive_dir(self, rel_path, dir_id):
+        field = ckpt_field(rel_path)
+        self.__gd_dirs[field] = dir_id
+        await self.__save({f'gd_dirs.{field}': dir_id})
+
+    def drive_session(self, rel_path):
+        return self.__gd_sessions.get(ckpt_field(rel_path))
+
+    async def set_drive_session(self, rel_path, uri, offset, size):
+        field = ckpt_field(rel_path)
+        self.__gd_sessions[field] = session = {'uri': uri, 'offset': offset, 'size': size}
+        await self.__save({f'gd_sessions.{field}': session})
+
+    def drive_done(self, rel_path):
+        return self.__gd_done.get(ckpt_field(rel_path))
+
+    def drive_done_count(self):
+        return len(self.__gd_done)
+
+    async def set_drive_done(self, rel_path, file_id):
+        field = ckpt_field(rel_path)
+        self.__gd_sessions.pop(field, None)
+        self.__gd_done[field] = file_id
+        await self.__save({f'gd_done.{field}': file_id, f'gd_sessions.{field}': None})
+
+    def tg_part(self, rel_path):
+        return self.__tg_parts.get(ckpt_field(rel_path))
+
+    def tg_parts(self):
+        return sorted(self.__tg_parts.values(), key=lambda part: part['order'])
+
+    async def set_tg_part(self, rel_path, msg, name):
+        field = ckpt_field(rel_path)
+        self.__tg_parts[field] = part = {'chat_id': msg.chat.id, 'msg_id': msg.id, 'link': msg.link,
+                                         'name': name, 'order': len(self.__tg_parts)}
+        await self.__save({f'tg_parts.{field}': part})
+
+
+async def get_resumable_uploads():
+    resumable = []
+    for doc in await DbManger().get_upload_ckpts():
+        if time() - doc['time'] > CKPT_TTL or not await aiopath.exists(f"{doc['dir']}/{doc['name']}"):
+            await DbManger().rm_upload_ckpt(doc['_id'])
+        else:
+            ckpt_dirs.add(doc['uid'])
+            resumable.append(doc)
+    return resumable
@@ -1,106 +1,84 @@
 #!/usr/bin/env python3
-from asyncio import sleep
+from asyncio import sleep, gather
 from time import time
 from aiofiles.os import remove as aioremove, path as aiopath
 
-from bot import aria2, download_dict_lock, download_dict, LOGGER, config_dict
-from bot.helper.ext_utils.task_manager import limit_checker
-from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
+from bot import download_dict_lock, download_dict, LOGGER, config_dict
+from bot.helper.ext_utils.task_manager import limit_checker, stop_duplicate_check
+from bot.helper.ext_utils.aria2_client import aria2_client
 from bot.helper.mirror_utils.status_utils.aria2_status import Aria2Status
-from bot.helper.ext_utils.fs_utils import get_base_name, clean_unwanted
-from bot.helper.ext_utils.bot_utils import getDownloadByGid, new_thread, bt_selection_buttons, sync_to_async, get_telegraph_list
+from bot.helper.ext_utils.fs_utils import clean_unwanted
+from bot.helper.ext_utils.bot_utils import getDownloadByGid, new_thread, bt_selection_buttons, sync_to_async
 from bot.helper.telegram_helper.message_utils import sendMessage, deleteMessage, update_all_messages
-from bot.helper.themes import BotTheme
+
+
+async def __get_task(gid, timeout=3):
+    # The start notification can arrive before add_aria2c_download registers the task
+    delay, waited = 0.05, 0
+    while (dl := await getDownloadByGid(gid)) is None and waited < timeout:
+        await sleep(delay)
+        waited += delay
+        delay = min(delay * 2, 0.5)
+    return dl
+
+
+async def __observe(gid):
+    if (dl := await getDownloadByGid(gid)) and hasattr(dl, 'listener'):
+        download_dict.observe(dl.listener().uid, await sync_to_async(dl.status), dl)
 
 
 @new_thread
 async def __onDownloadStarted(api, gid):
-    download = await sync_to_async(api.get_download, gid)
-    if download.options.follow_torrent == 'false':
+    download = await sync_to_async(aria2_client.get, gid)
+    if download is None or (await sync_to_async(getattr, download, 'options')).follow_torrent == 'false':
         return
+    await __observe(gid)
     if download.is_metadata:
         LOGGER.info(f'onDownloadStarted: {gid} METADATA')
-        await sleep(1)
-        if dl := await getDownloadByGid(gid):
-            listener = dl.listener()
-            if listener.select:
-                metamsg = "Downloading Metadata, wait then you can select files. Use torrent file to avoid this wait."
-                meta = await sendMessage(listener.message, metamsg)
-                while True:
-                    await sleep(0.5)
-                    if download.is_removed or download.followed_by_ids:
-                        await deleteMessage(meta)
-                        break
-                    download = download.live
+        if (dl := await __get_task(gid)) and dl.listener().select:
+            metamsg = "Downloading Metadata, wait then you can select files. Use torrent file to avoid this wait."
+            meta = await sendMessage(dl.listener().message, metamsg)
+            await aria2_client.wait_until(gid, lambda d: d.followed_by_ids or d.status in ['complete', 'error', 'removed'])
+            await deleteMessage(meta)
         return
-    else:
-        LOGGER.info(f'onDownloadStarted: {download.name} - Gid: {gid}')
-    dl = None
-    if any([config_dict['DIRECT_LIMIT'],
-            config_dict['TORRENT_LIMIT'],
-            config_dict['LEECH_LIMIT'],
-            config_dict['STORAGE_THRESHOLD'],
-            config_dict['DAILY_TASK_LIMIT'],
-            config_dict['DAILY_MIRROR_LIMIT'],
-            config_dict['DAILY_LEECH_LIMIT']]):
-        await sleep(1)
-        if dl is None:
-            dl = await getDownloadByGid(gid)
-        if dl:
-            if not hasattr(dl, 'listener'):
-                LOGGER.warning(
-                    f"onDownloadStart: {gid}. at Download limit didn't pass since download completed earlier!")
-                return
-            listener = dl.listener()
-            download = await sync_to_async(api.get_download, gid)
-            if not download.is_torrent:
-                await sleep(3)
-                download = download.live
-            size = download.total_length
-            LOGGER.info(f"listener size : {size}")
-            if limit_exceeded := await limit_checker(size, listener):
-                await listener.onDownloadError(limit_exceeded)
-                await sync_to_async(api.remove, [download], force=True, files=True)
+    LOGGER.info(f'onDownloadStarted: {download.name} - Gid: {gid}')
+    check_limit = any([config_dict['DIRECT_LIMIT'],
+                       config_dict['TORRENT_LIMIT'],
+                       config_dict['LEECH_LIMIT'],
+                       config_dict['STORAGE_THRESHOLD'],
+                       config_dict['DAILY_TASK_LIMIT'],
+                       config_dict['DAILY_MIRROR_LIMIT'],
+                       config_dict['DAILY_LEECH_LIMIT']])
+    if not check_limit and not config_dict['STOP_DUPLICATE']:
+        return
+    if not (dl := await __get_task(gid)):
+        return
+    if not hasattr(dl, 'listener'):
+        LOGGER.warning(
+            f"onDownloadStart: {gid}. Limit and duplicate checks didn't pass since download completed earlier!")
+        return
+    listener = dl.listener()
+    if not download.is_torrent:
+        # Size and final name are known once aria2 gets the response headers
+        download = await aria2_client.wait_until(gid, lambda d: d.total_length or d.status != 'active', timeout=3) or download
+    checks = []
+    if check_limit:
+        LOGGER.info(f"listener size : {download.total_length}")
+        checks.append(limit_checker(download.total_length, listener))
     if config_dict['STOP_DUPLICATE']:
-        await sleep(1)
-        if dl is None:
-            dl = await getDownloadByGid(gid)
-        if dl:
-            if not hasattr(dl, 'listener'):
-                LOGGER.warning(
-                    f"onDownloadStart: {gid}. STOP_DUPLICATE didn't pass since download completed earlier!")
-                return
-            listener = dl.listener()
-            if not listener.isLeech and not listener.select and listener.upPath == 'gd':
-                download = await sync_to_async(api.get_download, gid)
-                if not download.is_torrent:
-                    await sleep(3)
-                    download = download.live
-                LOGGER.info('Checking File/Folder if already in Drive...')
-                name = download.name
-                if listener.compress:
-                    name = f"{name}.zip"
-                elif listener.extract:
-                    try:
-                        name = get_base_name(name)
-                    except Exception:
-                        name = None
-                if name is not None:
-                    telegraph_content, contents_no = await sync_to_async(GoogleDriveHelper().drive_list, name, True)
-                    if telegraph_content:
-                        msg = BotTheme('STOP_DUPLICATE', content=contents_no)
-                        button = await get_telegraph_list(telegraph_content)
-                        await listener.onDownloadError(msg, button)
-                        await sync_to_async(api.remove, [download], force=True, files=True)
-                        return
-
-
+        checks.append(stop_duplicate_check(download.name, listener))
+    for result in await gather(*checks):
+        msg, button = result if isinstance(result, tuple) else (result, None)
+        if msg:
+            await listener.onDownloadError(msg, button)
+            await sync_to_async(api.remove, [download], force=True, files=True)
+            return
 
 
 @new_thread
 async def __onDownloadComplete(api, gid):
     try:
-        download = await sync_to_async(api.get_download, gid)
+        download = await sync_to_async(aria2_client.get, gid)
     except Exception:
         return
     if download.options.follow_torrent == 'false':
@@ -136,7 +114,7 @@ async def __onDownloadComplete(api, gid):
 async def __onBtDownloadComplete(api, gid):
     seed_start_time = time()
     await sleep(1)
-    download = await sync_to_async(api.get_download, gid)
+    download = await sync_to_async(aria2_client.get, gid)
     if download.options.follow_torrent == 'false':
         return
     LOGGER.info(f"onBtDownloadComplete: {download.name} - Gid: {gid}")
@@ -164,7 +142,7 @@ async def __onBtDownloadComplete(api, gid):
             except Exception as e:
                 LOGGER.error(f"{e} GID: {gid}")
         await listener.onDownloadComplete()
-        download = download.live
+        download = await sync_to_async(aria2_client.fetch, gid)
         if listener.seed:
             if download.is_complete:
                 if dl := await getDownloadByGid(gid):
@@ -185,6 +163,11 @@ async def __onBtDownloadComplete(api, gid):
             await sync_to_async(api.remove, [download], force=True, files=True)
 
 
+@new_thread
+async def __onDownloadPaused(api, gid):
+    await __observe(gid)
+
+
 @new_thread
 async def __onDownloadStopped(api, gid):
     await sleep(6)
@@ -198,7 +181,7 @@ async def __onDownloadError(api, gid):
     LOGGER.info(f"onDownloadError: {gid}")
     error = "None"
     try:
-        download = await sync_to_async(api.get_download, gid)
+        download = await sync_to_async(aria2_client.get, gid)
         if download.options.follow_torrent == 'false':
             return
         error = download.error_message
@@ -211,10 +194,9 @@ async def __onDownloadError(api, gid):
 
 
 def start_aria2_listener():
-    aria2.listen_to_notifications(threaded=False,
-                                  on_download_start=__onDownloadStarted,
-                                  on_download_error=__onDownloadError,
-                                  on_download_stop=__onDownloadStopped,
-                                  on_download_complete=__onDownloadComplete,
-                                  on_bt_download_complete=__onBtDownloadComplete,
-                                  timeout=60)
+    aria2_client.start(download_start=__onDownloadStarted,
+                       download_pause=__onDownloadPaused,
+                       download_error=__onDownloadError,
+                       download_stop=__onDownloadStopped,
+                       download_complete=__onDownloadComplete,
+                       bt_download_complete=__onBtDownloadComplete)
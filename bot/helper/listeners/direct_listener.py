@@ -1,6 +1,7 @@
-from time import sleep
+from threading import Event
 
 from bot import LOGGER, aria2
+from bot.helper.ext_utils.aria2_client import aria2_client, ARIA2_REFRESH_INTERVAL
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
 
 
@@ -12,6 +13,7 @@ class DirectListener:
         self.__a2c_opt = a2c_opt
         self.__proc_bytes = 0
         self.__failed = 0
+        self.__changed = Event()
         self.task = None
         self.name = foldername
         self.total_size = total_size
@@ -26,6 +28,9 @@ class DirectListener:
     def speed(self):
         return self.task.download_speed if self.task else 0
 
+    def __on_event(self, *_):
+        self.__changed.set()
+
     def download(self, contents):
         self.is_downloading = True
         for content in contents:
@@ -43,13 +48,14 @@ class DirectListener:
                 self.__failed += 1
                 LOGGER.error(f'Unable to download {filename} due to: {e}')
                 continue
-            self.task = self.task.live
+            gid = self.task.gid
+            aria2_client.subscribe(gid, self.__on_event)
             while True:
                 if self.__is_cancelled:
                     if self.task:
                         self.task.remove(True, True)
                     break
-                self.task = self.task.live
+                self.task = aria2_client.get(gid) or self.task
                 if error_message:= self.task.error_message:
                     self.__failed += 1
                     LOGGER.error(f'Unable to download {self.task.name} due to: {error_message}')
@@ -59,7 +65,10 @@ class DirectListener:
                     self.__proc_bytes += self.task.total_length
                     self.task.remove(True)
                     break
-                sleep(1)
+                # Woken early by aria2's complete/error notification
+                self.__changed.wait(ARIA2_REFRESH_INTERVAL)
+                self.__changed.clear()
+            aria2_client.unsubscribe(gid, self.__on_event)
             self.task = None
         if self.__is_cancelled:
             return
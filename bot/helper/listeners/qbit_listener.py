@@ -8,6 +8,7 @@ from bot.helper.telegram_helper.message_utils import update_all_messages
 from bot.helper.ext_utils.bot_utils import get_readable_time, getDownloadByGid, new_task, sync_to_async
 from bot.helper.ext_utils.fs_utils import clean_unwanted
 from bot.helper.ext_utils.task_manager import limit_checker, stop_duplicate_check
+from bot.helper.ext_utils.torrent_meta import torrent_meta
 
 
 async def __remove_torrent(client, hash_, tag):
@@ -67,6 +68,10 @@ async def __size_checked(tor):
         if limit_exceeded := await limit_checker(size, listener, isTorrent=True):
             await __onDownloadError(limit_exceeded, tor)
 
+@new_task
+async def __cache_metadata(tor):
+    await torrent_meta.store(await sync_to_async(get_client), tor.hash)
+
 @new_task
 async def __onDownloadComplete(tor):
     ext_hash = tor.hash
@@ -119,6 +124,10 @@ async def __qb_listener():
                     if tag not in QbTorrents:
                         continue
                     state = tor_info.state
+                    if QbTorrents[tag]['state'] != state:
+                        QbTorrents[tag]['state'] = state
+                        if (dl := download_dict.get(int(tag))) is not None:
+                            download_dict.observe(int(tag), await sync_to_async(dl.status), dl)
                     if state == "metaDL":
                         TORRENT_TIMEOUT = config_dict['TORRENT_TIMEOUT']
                         QbTorrents[tag]['stalled_time'] = time()
@@ -128,6 +137,9 @@ async def __qb_listener():
                             await sync_to_async(client.torrents_reannounce, torrent_hashes=tor_info.hash)
                     elif state == "downloading":
                         QbTorrents[tag]['stalled_time'] = time()
+                        if not QbTorrents[tag]['meta_cached']:
+                            QbTorrents[tag]['meta_cached'] = True
+                            __cache_metadata(tor_info)
                         if config_dict['STOP_DUPLICATE'] and not QbTorrents[tag]['stop_dup_check']:
                             QbTorrents[tag]['stop_dup_check'] = True
                             __stop_duplicate(tor_info)
@@ -165,10 +177,11 @@ async def __qb_listener():
         await sleep(3)
 
 
-async def onDownloadStart(tag):
+async def onDownloadStart(tag, size_checked=False):
     async with qb_listener_lock:
         QbTorrents[tag] = {'stalled_time': time(
-        ), 'stop_dup_check': False, 'rechecked': False, 'uploaded': False, 'seeding': False, 'size_checked': False}
+        ), 'stop_dup_check': False, 'rechecked': False, 'uploaded': False, 'seeding': False, 'size_checked': size_checked,
+            'meta_cached': False, 'state': None}
         if not QbInterval:
             periodic = bot_loop.create_task(__qb_listener())
             QbInterval.append(periodic)
@@ -4,6 +4,7 @@ from time import time
 from copy import deepcopy
 from pytz import timezone
 from datetime import datetime
+from secrets import token_hex
 from urllib.parse import unquote, quote
 from requests import utils as rutils
 from aiofiles.os import path as aiopath, remove as aioremove, listdir, makedirs
@@ -18,10 +19,11 @@ from bot import OWNER_ID, Interval, aria2, DOWNLOAD_DIR, download_dict, download
     queued_dl, queue_dict_lock, bot, GLOBAL_EXTENSION_FILTER
 from bot.helper.ext_utils.bot_utils import extra_btns, sync_to_async, get_readable_file_size, get_readable_time, is_mega_link, is_gdrive_link
 from bot.helper.ext_utils.fs_utils import get_base_name, get_path_size, clean_download, clean_target, \
-    is_first_archive_split, is_archive, is_archive_split, join_files
+    is_first_archive_split, is_archive, is_archive_split, join_files, disk_ledger
 from bot.helper.ext_utils.leech_utils import split_file, format_filename
 from bot.helper.ext_utils.exceptions import NotSupportedExtractionArchive
-from bot.helper.ext_utils.task_manager import start_from_queued
+from bot.helper.ext_utils.task_manager import start_from_queued, enqueue
+from bot.helper.ext_utils.upload_checkpoint import UploadCheckpoint
 from bot.helper.mirror_utils.status_utils.extract_status import ExtractStatus
 from bot.helper.mirror_utils.status_utils.zip_status import ZipStatus
 from bot.helper.mirror_utils.status_utils.split_status import SplitStatus
@@ -34,7 +36,7 @@ from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
 from bot.helper.mirror_utils.upload_utils.pyrogramEngine import TgUploader
 from bot.helper.mirror_utils.upload_utils.ddlEngine import DDLUploader
 from bot.helper.mirror_utils.rclone_utils.transfer import RcloneTransferHelper
-from bot.helper.telegram_helper.message_utils import sendCustomMsg, sendMessage, editMessage, deleteMessage, delete_all_messages, delete_links, sendMultiMessage, update_all_messages
+from bot.helper.telegram_helper.message_utils import sendCustomMsg, sendMessage, editMessage, deleteMessage, delete_all_messages, delete_links, sendMultiMessage, update_all_messages, sendStatusMessage
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.ext_utils.db_handler import DbManger
 from bot.helper.themes import BotTheme
@@ -42,7 +44,7 @@ from bot.helper.themes import BotTheme
 
 class MirrorLeechListener:
     def __init__(self, message, compress=False, extract=False, isQbit=False, isLeech=False, tag=None, select=False, seed=False, sameDir=None, rcFlags=None, upPath=None, isClone=False, 
-                join=False, drive_id=None, index_link=None, isYtdlp=False, source_url=None, logMessage=None, leech_utils={}):
+                join=False, drive_id=None, index_link=None, isYtdlp=False, source_url=None, logMessage=None, leech_utils={}, isStream=False):
         if sameDir is None:
             sameDir = {}
         self.message = message
@@ -56,6 +58,7 @@ class MirrorLeechListener:
         self.isMega = is_mega_link(source_url) if source_url else False
         self.isGdrive = is_gdrive_link(source_url) if source_url else False
         self.isYtdlp = isYtdlp
+        self.isStream = isStream
         self.tag = tag
         self.seed = seed
         self.newDir = ""
@@ -78,6 +81,7 @@ class MirrorLeechListener:
         self.linkslogmsg = None
         self.botpmmsg = None
         self.upload_details = {}
+        self.upload_ckpt = None
         self.leech_utils = leech_utils
         self.source_url = (
             source_url
@@ -315,9 +319,9 @@ class MirrorLeechListener:
 
         up_dir, up_name = up_path.rsplit('/', 1)
         size = await get_path_size(up_dir)
+        m_size = []
+        o_files = []
         if self.isLeech:
-            m_size = []
-            o_files = []
             if not self.compress:
                 checked = False
                 LEECH_SPLIT_SIZE = user_dict.get(
@@ -352,6 +356,23 @@ class MirrorLeechListener:
                                 m_size.append(f_size)
                                 o_files.append(file_)
 
+        await self.__startUpload(name, gid, up_path, size, o_files, m_size)
+
+    async def resumeUpload(self, doc):
+        self.upload_ckpt = UploadCheckpoint(self, doc)
+        up_path = f"{doc['dir']}/{doc['name']}"
+        size = await get_path_size(doc['dir'] if self.isLeech else up_path)
+        if self.isSuperGroup and config_dict['INCOMPLETE_TASK_NOTIFIER'] and DATABASE_URL:
+            await DbManger().add_incomplete_task(self.message.chat.id, self.message.link, self.tag, self.source_url, self.message.text)
+        LOGGER.info(f"Resuming Upload: {doc['name']}")
+        gid = token_hex(5)
+        async with download_dict_lock:
+            download_dict[self.uid] = QueueStatus(doc['name'], size, gid, self, 'Up')
+        await sendStatusMessage(self.message)
+        await self.__startUpload(doc['name'], gid, up_path, size)
+
+    async def __startUpload(self, name, gid, up_path, size, o_files=[], m_size=[]):
+        up_dir, up_name = up_path.rsplit('/', 1)
         up_limit = config_dict['QUEUE_UPLOAD']
         all_limit = config_dict['QUEUE_ALL']
         added_to_queue = False
@@ -363,6 +384,7 @@ class MirrorLeechListener:
                 LOGGER.info(f"Added to Queue/Upload: {name}")
                 event = Event()
                 queued_up[self.uid] = event
+                enqueue(self.uid, self, size)
         if added_to_queue:
             async with download_dict_lock:
                 download_dict[self.uid] = QueueStatus(
@@ -374,6 +396,10 @@ class MirrorLeechListener:
             LOGGER.info(f'Start from Queued/Upload: {name}')
         async with queue_dict_lock:
             non_queued_up.add(self.uid)
+        if self.upload_ckpt is None and UploadCheckpoint.supported(self):
+            self.upload_ckpt = UploadCheckpoint(self)
+        if self.upload_ckpt is not None:
+            await self.upload_ckpt.begin(up_dir, up_name)
         if self.isLeech:
             size = await get_path_size(up_dir)
             for s in m_size:
@@ -418,6 +444,8 @@ class MirrorLeechListener:
     async def onUploadComplete(self, link, size, files, folders, mime_type, name, rclonePath='', private=False):
         if self.isSuperGroup and config_dict['INCOMPLETE_TASK_NOTIFIER'] and DATABASE_URL:
             await DbManger().rm_complete_task(self.message.link)
+        if self.upload_ckpt is not None:
+            await self.upload_ckpt.discard()
         user_id = self.message.from_user.id
         name, _ = await format_filename(name, user_id, isMirror=not self.isLeech)
         user_dict = user_data.get(user_id, {})
@@ -592,6 +620,7 @@ class MirrorLeechListener:
             await deleteMessage(self.botpmmsg)
         
         await clean_download(self.dir)
+        disk_ledger.release(self.uid)
         async with download_dict_lock:
             if self.uid in download_dict.keys():
                 del download_dict[self.uid]
@@ -602,6 +631,9 @@ class MirrorLeechListener:
             await update_all_messages()
 
         async with queue_dict_lock:
+            # Streams upload while downloading and never pass through onDownloadComplete
+            if self.uid in non_queued_dl:
+                non_queued_dl.remove(self.uid)
             if self.uid in non_queued_up:
                 non_queued_up.remove(self.uid)
 
@@ -631,6 +663,8 @@ class MirrorLeechListener:
 
         if self.isSuperGroup and config_dict['INCOMPLETE_TASK_NOTIFIER'] and DATABASE_URL:
             await DbManger().rm_complete_task(self.message.link)
+        if self.upload_ckpt is not None:
+            await self.upload_ckpt.discard()
 
         async with queue_dict_lock:
             if self.uid in queued_dl:
@@ -647,6 +681,7 @@ class MirrorLeechListener:
         await start_from_queued()
         await sleep(3)
         await clean_download(self.dir)
+        disk_ledger.release(self.uid)
         if self.newDir:
             await clean_download(self.newDir)
 
@@ -669,6 +704,8 @@ class MirrorLeechListener:
 
         if self.isSuperGroup and config_dict['INCOMPLETE_TASK_NOTIFIER'] and DATABASE_URL:
             await DbManger().rm_complete_task(self.message.link)
+        if self.upload_ckpt is not None:
+            await self.upload_ckpt.discard()
 
         async with queue_dict_lock:
             if self.uid in queued_dl:
@@ -685,5 +722,6 @@ class MirrorLeechListener:
         await start_from_queued()
         await sleep(3)
         await clean_download(self.dir)
+        disk_ledger.release(self.uid)
         if self.newDir:
             await clean_download(self.newDir)
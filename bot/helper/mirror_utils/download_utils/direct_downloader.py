@@ -27,7 +27,7 @@ async def add_direct_download(details, path, listener, foldername):
         return
 
     gid = token_hex(5)
-    added_to_queue, event = await is_queued(listener.uid)
+    added_to_queue, event = await is_queued(listener.uid, listener, size)
     if added_to_queue:
         LOGGER.info(f"Added to Queue/Download: {foldername}")
         async with download_dict_lock:
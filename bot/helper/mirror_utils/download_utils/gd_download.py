@@ -30,7 +30,7 @@ async def add_gd_download(link, path, listener, newname, org_link):
     if limit_exceeded := await limit_checker(size, listener, isDriveLink=True):
         await sendMessage(listener.message, limit_exceeded)
         return
-    added_to_queue, event = await is_queued(listener.uid)
+    added_to_queue, event = await is_queued(listener.uid, listener, size)
     if added_to_queue:
         LOGGER.info(f"Added to Queue/Download: {name}")
         async with download_dict_lock:
@@ -160,7 +160,7 @@ async def add_mega_download(mega_link, path, listener, name):
     if limit_exceeded := await limit_checker(size, listener, isMega=True):
         await sendMessage(listener.message, limit_exceeded)
         return
-    added_to_queue, event = await is_queued(listener.uid)
+    added_to_queue, event = await is_queued(listener.uid, listener, size)
     if added_to_queue:
         LOGGER.info(f"Added to Queue/Download: {name}")
         async with download_dict_lock:
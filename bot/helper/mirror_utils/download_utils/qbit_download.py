@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-from time import time
 from aiofiles.os import remove as aioremove, path as aiopath
 
 from bot import download_dict, download_dict_lock, get_client, LOGGER, config_dict, non_queued_dl, queue_dict_lock
@@ -7,7 +6,10 @@ from bot.helper.mirror_utils.status_utils.qbit_status import QbittorrentStatus
 from bot.helper.telegram_helper.message_utils import sendMessage, deleteMessage, sendStatusMessage
 from bot.helper.ext_utils.bot_utils import bt_selection_buttons, sync_to_async
 from bot.helper.listeners.qbit_listener import onDownloadStart
-from bot.helper.ext_utils.task_manager import is_queued
+from bot.helper.ext_utils.task_manager import is_queued, limit_checker
+from bot.helper.ext_utils.torrent_meta import torrent_meta, wait_for_torrent
+
+PRE_RESOLVE_TIMEOUT = 30
 
 
 """
@@ -32,28 +34,33 @@ def __get_hash_file(path):
 
 async def add_qb_torrent(link, path, listener, ratio, seed_time):
     client = await sync_to_async(get_client)
-    ADD_TIME = time()
     try:
         url = link
         tpath = None
         if await aiopath.exists(link):
             url = None
             tpath = link
-        added_to_queue, event = await is_queued(listener.uid)
+        size_limits = any([config_dict['STORAGE_THRESHOLD'], config_dict['TORRENT_LIMIT'], config_dict['LEECH_LIMIT'],
+                           config_dict['DAILY_LEECH_LIMIT'], config_dict['DAILY_MIRROR_LIMIT'], config_dict['DAILY_TASK_LIMIT']])
+        meta = None
+        if link.startswith('magnet:'):
+            meta = await torrent_meta.resolve(link, PRE_RESOLVE_TIMEOUT) if size_limits else await torrent_meta.lookup(link)
+        if meta is not None:
+            url = None
+            tpath = torrent_meta.torrent_path(meta['hash'])
+            LOGGER.info(f"Using cached metadata: {meta['name']} - Hash: {meta['hash']}")
+            if size_limits and (limit_exceeded := await limit_checker(meta['size'], listener, isTorrent=True)):
+                await sendMessage(listener.message, limit_exceeded)
+                return
+        added_to_queue, event = await is_queued(listener.uid, listener, meta['size'] if meta else 0)
         op = await sync_to_async(client.torrents_add, url, tpath, path, is_paused=added_to_queue, tags=f'{listener.uid}',
                                  ratio_limit=ratio, seeding_time_limit=seed_time, headers={'user-agent': 'Wget/1.12'})
         if op.lower() == "ok.":
-            tor_info = await sync_to_async(client.torrents_info, tag=f'{listener.uid}')
-            if len(tor_info) == 0:
-                while True:
-                    tor_info = await sync_to_async(client.torrents_info, tag=f'{listener.uid}')
-                    if len(tor_info) > 0:
-                        break
-                    elif time() - ADD_TIME >= 120:
-                        msg = "Not added! Check if the link is valid or not. If it's torrent file then report, this happens if torrent file size above 10mb."
-                        await sendMessage(listener.message, msg)
-                        return
-            tor_info = tor_info[0]
+            tor_info = await wait_for_torrent(client, lambda tor: tor is not None, 120, tag=f'{listener.uid}')
+            if tor_info is None:
+                msg = "Not added! Check if the link is valid or not. If it's torrent file then report, this happens if torrent file size above 10mb."
+                await sendMessage(listener.message, msg)
+                return
             ext_hash = tor_info.hash
         else:
             await sendMessage(listener.message, "This Torrent already added or unsupported/invalid link/file.")
@@ -62,7 +69,7 @@ async def add_qb_torrent(link, path, listener, ratio, seed_time):
         async with download_dict_lock:
             download_dict[listener.uid] = QbittorrentStatus(
                 listener, queued=added_to_queue)
-        await onDownloadStart(f'{listener.uid}')
+        await onDownloadStart(f'{listener.uid}', size_checked=size_limits and meta is not None)
 
         if added_to_queue:
             LOGGER.info(
@@ -76,22 +83,14 @@ async def add_qb_torrent(link, path, listener, ratio, seed_time):
         await listener.onDownloadStart()
 
         if config_dict['BASE_URL'] and listener.select:
-            if link.startswith('magnet:'):
+            if link.startswith('magnet:') and meta is None:
                 metamsg = "Downloading Metadata, wait then you can select files. Use torrent file to avoid this wait."
-                meta = await sendMessage(listener.message, metamsg)
-                while True:
-                    tor_info = await sync_to_async(client.torrents_info, tag=f'{listener.uid}')
-                    if len(tor_info) == 0:
-                        await deleteMessage(meta)
-                        return
-                    try:
-                        tor_info = tor_info[0]
-                        if tor_info.state not in ["metaDL", "checkingResumeData", "pausedDL"]:
-                            await deleteMessage(meta)
-                            break
-                    except:
-                        await deleteMessage(meta)
-                        return
+                meta_msg = await sendMessage(listener.message, metamsg)
+                tor_info = await wait_for_torrent(client, lambda tor: tor is None or tor.state not in
+                                                  ["metaDL", "checkingResumeData", "pausedDL"], tag=f'{listener.uid}')
+                await deleteMessage(meta_msg)
+                if tor_info is None:
+                    return
 
             ext_hash = tor_info.hash
             if not added_to_queue:
@@ -108,9 +107,11 @@ async def add_qb_torrent(link, path, listener, ratio, seed_time):
             async with download_dict_lock:
                 if listener.uid not in download_dict:
                     return
-                download_dict[listener.uid].queued = False
+                download = download_dict[listener.uid]
+                download.queued = False
 
             await sync_to_async(client.torrents_resume, torrent_hashes=ext_hash)
+            download_dict.observe(listener.uid, await sync_to_async(download.status), download)
             LOGGER.info(
                 f'Start Queued Download from Qbittorrent: {tor_info.name} - Hash: {ext_hash}')
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+from secrets import token_hex
+
+from bot import download_dict, download_dict_lock, queue_dict_lock, non_queued_dl, LOGGER, GLOBAL_EXTENSION_FILTER
+from bot.helper.telegram_helper.message_utils import sendMessage, sendStatusMessage
+from bot.helper.ext_utils.task_manager import is_queued, stop_duplicate_check
+from bot.helper.mirror_utils.status_utils.stream_status import StreamStatus
+from bot.helper.mirror_utils.status_utils.queue_status import QueueStatus
+from bot.helper.mirror_utils.upload_utils.streamEngine import StreamMirrorHelper
+
+
+async def add_stream_download(source, listener):
+    try:
+        await source.open()
+    except Exception as e:
+        LOGGER.error(f"Stream Source Error: {e}")
+        await sendMessage(listener.message, f'<b>Stream Error:</b> {e}')
+        return
+    if source.name.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)):
+        await source.close()
+        await sendMessage(listener.message, 'This file extension is excluded by extension filter!')
+        return
+    msg, button = await stop_duplicate_check(source.name, listener)
+    if msg:
+        await source.close()
+        await sendMessage(listener.message, msg, button)
+        return
+
+    gid = token_hex(5)
+    added_to_queue, event = await is_queued(listener.uid, listener, source.size or 0)
+    if added_to_queue:
+        # Don't hold the connection open while waiting for a slot
+        await source.close()
+        LOGGER.info(f"Added to Queue/Download: {source.name}")
+        async with download_dict_lock:
+            download_dict[listener.uid] = QueueStatus(
+                source.name, source.size or 0, gid, listener, 'dl')
+        await listener.onDownloadStart()
+        await sendStatusMessage(listener.message)
+        await event.wait()
+        async with download_dict_lock:
+            if listener.uid not in download_dict:
+                return
+        try:
+            await source.open()
+        except Exception as e:
+            await listener.onDownloadError(str(e))
+            return
+        from_queue = True
+    else:
+        from_queue = False
+
+    stream = StreamMirrorHelper(listener, source)
+    async with download_dict_lock:
+        download_dict[listener.uid] = StreamStatus(
+            stream, listener.message, gid, listener.upload_details)
+    async with queue_dict_lock:
+        non_queued_dl.add(listener.uid)
+
+    if from_queue:
+        LOGGER.info(f'Start Queued Stream: {source.name}')
+    else:
+        await listener.onDownloadStart()
+        await sendStatusMessage(listener.message)
+        LOGGER.info(f"Stream Mirror: {source.link}")
+
+    await stream.upload()
@@ -1,17 +1,24 @@
 #!/usr/bin/env python3
 from logging import getLogger, ERROR
 from time import time
-from asyncio import Lock
-from pyrogram import Client
+from math import ceil
+from os import open as osopen, close as osclose, ftruncate, pwrite, path as ospath, O_RDWR, O_CREAT
+from asyncio import Lock, gather
+from aiofiles.os import makedirs, remove as aioremove
 
-from bot import LOGGER, download_dict, download_dict_lock, non_queued_dl, queue_dict_lock, bot, user, IS_PREMIUM_USER
+from bot import LOGGER, download_dict, download_dict_lock, non_queued_dl, queue_dict_lock, bot, bot_loop, user, IS_PREMIUM_USER
 from bot.helper.mirror_utils.status_utils.telegram_status import TelegramStatus
 from bot.helper.mirror_utils.status_utils.queue_status import QueueStatus
 from bot.helper.telegram_helper.message_utils import sendStatusMessage, sendMessage, delete_links
+from bot.helper.telegram_helper.session_pool import user_sessions
 from bot.helper.ext_utils.task_manager import is_queued, limit_checker, stop_duplicate_check
+from bot.helper.ext_utils.bot_utils import sync_to_async
 
 global_lock = Lock()
 GLOBAL_GID = set()
+TG_CHUNK_SIZE = 1024 * 1024
+PARALLEL_MIN_SIZE = 50 * 1024 * 1024
+PARALLEL_WORKERS = 6
 getLogger("pyrogram").setLevel(ERROR)
 
 
@@ -25,6 +32,7 @@ class TelegramDownloadHelper:
         self.__client = bot
         self.__decrypter = None
         self.__id = ""
+        self.__size = 0
         self.__is_cancelled = False
 
     @property
@@ -40,6 +48,7 @@ class TelegramDownloadHelper:
             GLOBAL_GID.add(file_id)
         self.name = name
         self.__id = file_id
+        self.__size = size
         async with download_dict_lock:
             download_dict[self.__listener.uid] = TelegramStatus(
                 self, size, self.__listener.message, file_id[:12], 'dl', self.__listener.upload_details)
@@ -70,19 +79,64 @@ class TelegramDownloadHelper:
         async with global_lock:
             GLOBAL_GID.remove(self.__id)
 
+    async def __fetch_media(self, message, path):
+        if self.__size >= PARALLEL_MIN_SIZE and self.name != 'None':
+            des_path = ospath.join(path, self.name) if path.endswith('/') else path
+            try:
+                return await self.__parallel_download(message, des_path)
+            except Exception as e:
+                if self.__is_cancelled:
+                    return None
+                LOGGER.warning(f'Parallel Telegram download failed, falling back to single stream: {e}')
+                self.__processed_bytes = 0
+                if ospath.exists(des_path):
+                    await aioremove(des_path)
+        return await self.__client.download_media(message=message, file_name=path, progress=self.__onDownloadProgress)
+
+    async def __parallel_download(self, message, des_path):
+        await makedirs(ospath.dirname(des_path), exist_ok=True)
+        total_chunks = ceil(self.__size / TG_CHUNK_SIZE)
+        per_worker = ceil(total_chunks / PARALLEL_WORKERS)
+        fd = osopen(des_path, O_RDWR | O_CREAT)
+        try:
+            ftruncate(fd, self.__size)
+
+            async def fetch_range(start, count):
+                offset = start * TG_CHUNK_SIZE
+                async for chunk in self.__client.stream_media(message, offset=start, limit=count):
+                    if self.__is_cancelled:
+                        raise ValueError('Cancelled by user!')
+                    await sync_to_async(pwrite, fd, chunk, offset)
+                    offset += len(chunk)
+                    self.__processed_bytes += len(chunk)
+                if offset != min((start + count) * TG_CHUNK_SIZE, self.__size):
+                    raise ValueError(f'Incomplete range at chunk {start}')
+
+            tasks = [bot_loop.create_task(fetch_range(start, min(per_worker, total_chunks - start)))
+                     for start in range(0, total_chunks, per_worker)]
+            try:
+                await gather(*tasks)
+            except Exception:
+                for task in tasks:
+                    task.cancel()
+                await gather(*tasks, return_exceptions=True)
+                raise
+        finally:
+            osclose(fd)
+        return des_path
+
     async def __download(self, message, path):
         try:
             if self.__client is None and self.__decrypter is not None:
                 try:
-                    async with Client(str(self.__listener.user_id), session_string=self.__decrypter.decrypt(self.__listener.user_dict.get('usess')).decode(), 
-                                    in_memory=True, no_updates=True) as self.__client:
-                        download = await self.__client.download_media(message=message, file_name=path, progress=self.__onDownloadProgress)
+                    async with user_sessions.session(self.__listener.user_id, self.__decrypter.decrypt(self.__listener.user_dict.get('usess')).decode()) as self.__client:
+                        download = await self.__fetch_media(message, path)
                 except Exception as e:
                     if not self.__is_cancelled:
                         await self.__onDownloadError(f'ERROR: {e}')
                         return
             else:
-                download = await self.__client.download_media(message=message, file_name=path, progress=self.__onDownloadProgress)
+                download = await self.__fetch_media(message, path)
             if self.__is_cancelled:
                 await self.__onDownloadError('Cancelled by user!')
                 return
@@ -129,7 +183,7 @@ class TelegramDownloadHelper:
                     await sendMessage(self.__listener.message, limit_exceeded)
                     await delete_links(self.__listener.message)
                     return
-                added_to_queue, event = await is_queued(self.__listener.uid)
+                added_to_queue, event = await is_queued(self.__listener.uid, self.__listener, size)
                 if added_to_queue:
                     LOGGER.info(f"Added to Queue/Download: {name}")
                     async with download_dict_lock:
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from asyncio import wait_for, Event, wrap_future
+from asyncio import wait_for, Event, wrap_future, shield
 from aiofiles.os import path as aiopath
 from aiofiles import open as aiopen
 from configparser import ConfigParser
@@ -9,13 +9,111 @@ from functools import partial
 from json import loads
 from time import time
 
-from bot import LOGGER, config_dict
+from bot import LOGGER, config_dict, bot_loop
 from bot.helper.ext_utils.db_handler import DbManger
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.telegram_helper.message_utils import sendMessage, editMessage, deleteMessage
 from bot.helper.ext_utils.bot_utils import cmd_exec, new_thread, get_readable_file_size, new_task, get_readable_time
+from bot.helper.mirror_utils.rclone_utils.rcd import rc_daemons
 
 LIST_LIMIT = 6
+LIST_CACHE_TTL = 120
+LIST_PREFETCH_LIMIT = 6
+
+
+def split_rc_path(path):
+    remote, _, path = path.partition(':')
+    return remote, [part for part in path.split('/') if part]
+
+
+class RcloneListCache:
+    # Listings per (config, path), both item types in one entry; any upload below a path drops it and its parents
+    def __init__(self, ttl=LIST_CACHE_TTL):
+        self.ttl = ttl
+        self.__entries = {}
+        self.__pending = {}
+        self.__remotes = {}
+        self.__epoch = 0
+
+    @staticmethod
+    def __key(config_path, path):
+        remote, parts = split_rc_path(path)
+        return config_path, f"{remote}:{'/'.join(parts)}"
+
+    @staticmethod
+    async def __lsjson(config_path, path):
+        async with rc_daemons.daemon(config_path) as daemon:
+            if daemon is not None:
+                return (await daemon.call('operations/list', fs=path, remote='',
+                                          opt={'noModTime': True, 'noMimeType': True}))['list']
+        cmd = ['rclone', 'lsjson', '--fast-list', '--no-mimetype',
+               '--no-modtime', '--config', config_path, path]
+        res, err, code = await cmd_exec(cmd)
+        if code != 0:
+            raise Exception(err or f'rclone lsjson exited with {code}')
+        return loads(res)
+
+    async def __fetch(self, key, mtime):
+        epoch = self.__epoch
+        items = await self.__lsjson(*key)
+        if epoch == self.__epoch:
+            now = time()
+            for old in [k for k, entry in self.__entries.items() if entry[0] <= now]:
+                del self.__entries[old]
+            self.__entries[key] = (now + self.ttl, mtime, items)
+        return items
+
+    def __done(self, key, task):
+        self.__pending.pop(key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def __start(self, key, mtime):
+        if (task := self.__pending.get(key)) is None:
+            task = self.__pending[key] = bot_loop.create_task(self.__fetch(key, mtime))
+            task.add_done_callback(partial(self.__done, key))
+        return task
+
+    def __cached(self, key, mtime):
+        if (entry := self.__entries.get(key)) and entry[0] > time() and entry[1] == mtime:
+            return entry[2]
+
+    async def list(self, config_path, path):
+        key = self.__key(config_path, path)
+        mtime = await aiopath.getmtime(config_path)
+        if (items := self.__cached(key, mtime)) is not None:
+            return items
+        return await shield(self.__start(key, mtime))
+
+    async def prefetch(self, config_path, paths):
+        mtime = await aiopath.getmtime(config_path)
+        for path in paths[:LIST_PREFETCH_LIMIT]:
+            key = self.__key(config_path, path)
+            if self.__cached(key, mtime) is None:
+                self.__start(key, mtime)
+
+    def invalidate(self, config_path, path):
+        remote, parts = split_rc_path(path)
+        self.__epoch += 1
+        for key in list(self.__entries):
+            if key[0] != config_path:
+                continue
+            kremote, kparts = split_rc_path(key[1])
+            if kremote == remote and (parts[:len(kparts)] == kparts or kparts[:len(parts)] == parts):
+                del self.__entries[key]
+
+    async def remotes(self, config_path):
+        mtime = await aiopath.getmtime(config_path)
+        if (cached := self.__remotes.get(config_path)) is None or cached[0] != mtime:
+            config = ConfigParser()
+            async with aiopen(config_path, 'r') as f:
+                contents = await f.read()
+                config.read_string(contents)
+            cached = self.__remotes[config_path] = (mtime, [section for section in config.sections() if section != 'combine'])
+        return cached[1]
+
+
+rclone_list_cache = RcloneListCache()
 
 
 @new_task
@@ -155,6 +253,8 @@ class RcloneList:
                 ptype = 'fi'
                 name = f"[{get_readable_file_size(idict['Size'])}] {idict['Path']}"
             buttons.ibutton(name, f'rcq pa {ptype} {orig_index}')
+        await rclone_list_cache.prefetch(self.config_path, [f"{self.remote}{self.path}/{idict['Path']}" if self.path else f"{self.remote}{idict['Path']}"
+                                                            for idict in self.path_list[self.iter_start:LIST_LIMIT+self.iter_start] if idict['IsDir']])
         if items_no > LIST_LIMIT:
             for i in [1, 2, 4, 6, 10, 30, 50, 100]:
                 buttons.ibutton(i, f'rcq ps {i}', position='header')
@@ -197,19 +297,19 @@ class RcloneList:
             self.item_type == itype
         elif self.list_status == 'rcu':
             self.item_type == '--dirs-only'
-        cmd = ['rclone', 'lsjson', self.item_type, '--fast-list', '--no-mimetype',
-               '--no-modtime', '--config', self.config_path, f"{self.remote}{self.path}"]
         if self.is_cancelled:
             return
-        res, err, code = await cmd_exec(cmd)
-        if code not in [0, -9]:
+        try:
+            items = await rclone_list_cache.list(self.config_path, f"{self.remote}{self.path}")
+        except Exception as err:
             LOGGER.error(
                 f'While rclone listing. Path: {self.remote}{self.path}. Stderr: {err}')
-            self.remote = err[:4000]
+            self.remote = str(err)[:4000]
             self.path = ''
             self.event.set()
             return
-        result = loads(res)
+        is_dir = self.item_type == '--dirs-only'
+        result = [item for item in items if item['IsDir'] == is_dir]
         if len(result) == 0 and itype != self.item_type and self.list_status == 'rcd':
             itype = '--dirs-only' if self.item_type == '--files-only' else '--files-only'
             self.item_type = itype
@@ -219,13 +319,7 @@ class RcloneList:
         await self.get_path_buttons()
 
     async def list_remotes(self):
-        config = ConfigParser()
-        async with aiopen(self.config_path, 'r') as f:
-            contents = await f.read()
-            config.read_string(contents)
-        if config.has_section('combine'):
-            config.remove_section('combine')
-        self.__sections = config.sections()
+        self.__sections = await rclone_list_cache.remotes(self.config_path)
         if len(self.__sections) == 1:
             self.remote = f'{self.__sections[0]}:'
             await self.get_path()
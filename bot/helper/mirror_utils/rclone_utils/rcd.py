@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+from asyncio import create_subprocess_exec, get_running_loop, shield, sleep, Lock
+from asyncio.subprocess import DEVNULL
+from contextlib import asynccontextmanager
+from secrets import token_hex
+from socket import socket
+from time import time
+from aiofiles.os import path as aiopath
+from aiohttp import ClientSession, BasicAuth
+from logging import getLogger
+from os import environ
+
+from bot.helper.ext_utils.bot_utils import setInterval
+
+LOGGER = getLogger(__name__)
+
+RCD_IDLE_TIMEOUT = 600
+RCD_START_TIMEOUT = 15
+
+
+class RcloneRCError(Exception):
+    pass
+
+
+class RcloneDaemon:
+    def __init__(self, config_path):
+        self.config_path = config_path
+        self.refs = 0
+        self.last_used = time()
+        self.mtime = None
+        self.__proc = None
+        self.__session = None
+        self.__url = ''
+
+    @property
+    def alive(self):
+        return self.__proc is not None and self.__proc.returncode is None
+
+    async def start(self):
+        with socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        user, pswd = token_hex(8), token_hex(16)
+        self.mtime = await aiopath.getmtime(self.config_path)
+        # Credentials go through the environment, the command line is visible to anyone running ps
+        self.__proc = await create_subprocess_exec('rclone', 'rcd', '--rc-addr', f'127.0.0.1:{port}', '--config', self.config_path,
+                                                   '--log-file', 'rlog.txt', stdout=DEVNULL, stderr=DEVNULL,
+                                                   env={**environ, 'RCLONE_RC_USER': user, 'RCLONE_RC_PASS': pswd})
+        self.__url = f'http://127.0.0.1:{port}'
+        self.__session = ClientSession(auth=BasicAuth(user, pswd))
+        for _ in range(RCD_START_TIMEOUT * 4):
+            await sleep(0.25)
+            if not self.alive:
+                break
+            try:
+                await self.call('rc/noop')
+                LOGGER.info(f'Started rclone rcd for {self.config_path} on port {port}')
+                return
+            except Exception:
+                continue
+        await self.stop()
+        raise RcloneRCError(f'rclone rcd failed to start for {self.config_path}')
+
+    async def stop(self):
+        if self.alive:
+            try:
+                self.__proc.kill()
+            except:
+                pass
+        if self.__session is not None:
+            await self.__session.close()
+        self.__proc = self.__session = None
+
+    async def call(self, method, **params):
+        async with self.__session.post(f'{self.__url}/{method}', json=params) as resp:
+            data = await resp.json(content_type=None)
+        if resp.status != 200:
+            raise RcloneRCError(data.get('error', resp.reason) if isinstance(data, dict) else resp.reason)
+        return data
+
+    async def submit(self, method, group, **params):
+        return (await self.call(method, _async=True, _group=group, **params))['jobid']
+
+    async def job_status(self, jobid):
+        return await self.call('job/status', jobid=jobid)
+
+    async def stats(self, group):
+        return await self.call('core/stats', group=group)
+
+    async def stop_job(self, jobid):
+        try:
+            await self.call('job/stop', jobid=jobid)
+        except Exception as e:
+            LOGGER.error(f'rclone rc job/stop {jobid}: {e}')
+
+    async def forget(self, group):
+        try:
+            await self.call('core/stats-delete', group=group)
+        except Exception:
+            pass
+
+
+class RcloneDaemonPool:
+    # One rclone rcd per config file so remotes, auth and connection pools are shared by all its jobs
+    def __init__(self, idle_timeout=RCD_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.__daemons = {}
+        self.__starting = {}
+        self.__lock = Lock()
+        self.__reaper = None
+
+    async def acquire(self, config_path):
+        while True:
+            stale = None
+            async with self.__lock:
+                if self.__reaper is None:
+                    self.__reaper = setInterval(60, self.__evict_idle)
+                daemon = self.__daemons.get(config_path)
+                if daemon is not None and (not daemon.alive or daemon.refs == 0
+                                           and daemon.mtime != await aiopath.getmtime(config_path)):
+                    stale = self.__daemons.pop(config_path)
+                    daemon = None
+                if daemon is not None:
+                    daemon.refs += 1
+                    daemon.last_used = time()
+                    return daemon
+                starting = self.__starting.get(config_path)
+                if starting is None:
+                    self.__starting[config_path] = get_running_loop().create_future()
+            if stale is not None:
+                await stale.stop()
+            if starting is None:
+                break
+            # Another task is starting the daemon for this config, other configs aren't held up meanwhile
+            if await shield(starting) is None:
+                return None
+        daemon = RcloneDaemon(config_path)
+        try:
+            await daemon.start()
+        except Exception as e:
+            LOGGER.error(f'{e}, using rclone cli')
+            daemon = None
+        async with self.__lock:
+            starting = self.__starting.pop(config_path)
+            if daemon is not None:
+                daemon.refs += 1
+                daemon.last_used = time()
+                self.__daemons[config_path] = daemon
+        starting.set_result(daemon)
+        return daemon
+
+    async def release(self, daemon):
+        async with self.__lock:
+            daemon.refs -= 1
+            daemon.last_used = time()
+
+    @asynccontextmanager
+    async def daemon(self, config_path):
+        daemon = await self.acquire(config_path)
+        try:
+            yield daemon
+        finally:
+            if daemon is not None:
+                await self.release(daemon)
+
+    async def __evict_idle(self):
+        idle = []
+        async with self.__lock:
+            for config_path, daemon in list(self.__daemons.items()):
+                if daemon.refs == 0 and time() - daemon.last_used > self.idle_timeout:
+                    del self.__daemons[config_path]
+                    idle.append(daemon)
+        for daemon in idle:
+            await daemon.stop()
+
+
+rc_daemons = RcloneDaemonPool()
@@ -1,6 +1,6 @@
-from asyncio import create_subprocess_exec, gather
+from asyncio import create_subprocess_exec, gather, sleep
 from asyncio.subprocess import PIPE
-from re import findall as re_findall
+from secrets import token_hex
 from json import loads
 from aiofiles.os import path as aiopath, mkdir, listdir
 from aiofiles import open as aiopen
@@ -9,22 +9,34 @@ from random import randrange
 from logging import getLogger
 
 from bot import config_dict, GLOBAL_EXTENSION_FILTER
-from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async
+from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async, get_readable_file_size, get_readable_time
 from bot.helper.ext_utils.fs_utils import get_mime_type, count_files_and_folders
+from bot.helper.mirror_utils.rclone_utils.rcd import rc_daemons
+from bot.helper.mirror_utils.rclone_utils.list import rclone_list_cache
 
 
 LOGGER = getLogger(__name__)
 
+remote_options_cache = {}
+
+
+def rc_split(path):
+    # 'remote:dir/file' -> ('remote:dir', 'file'), '/local/dir/file' -> ('/local/dir', 'file')
+    head, _, tail = path.rstrip('/').rpartition('/')
+    if not head and ':' in tail:
+        remote, tail = tail.split(':', 1)
+        head = f'{remote}:'
+    return head, tail
+
 
 class RcloneTransferHelper:
     def __init__(self, listener=None, name=''):
         self.__listener = listener
         self.__proc = None
-        self.__transferred_size = '0 B'
-        self.__eta = '-'
-        self.__percentage = '0%'
-        self.__speed = '0 B/s'
-        self.__size = '0 B'
+        self.__raw = (0, 0, 0, 0, None)
+        self.__errors = []
+        self.__debug = False
+        self.__rc_job_ref = None
         self.__is_cancelled = False
         self.__is_download = False
         self.__is_upload = False
@@ -35,35 +47,145 @@ class RcloneTransferHelper:
 
     @property
     def transferred_size(self):
-        return self.__transferred_size
+        return get_readable_file_size(self.__raw[0])
 
     @property
     def percentage(self):
-        return self.__percentage
+        return f'{round(self.__raw[2])}%'
 
     @property
     def speed(self):
-        return self.__speed
+        return f'{get_readable_file_size(self.__raw[3])}/s'
 
     @property
     def eta(self):
-        return self.__eta
+        return get_readable_time(self.__raw[4]) if self.__raw[4] else '-'
 
     @property
     def size(self):
-        return self.__size
+        return get_readable_file_size(self.__raw[1])
+
+    @property
+    def transferred_bytes(self):
+        return self.__raw[0]
+
+    @property
+    def size_bytes(self):
+        return self.__raw[1]
+
+    @property
+    def progress_raw(self):
+        return self.__raw[2]
+
+    @property
+    def speed_bytes(self):
+        return self.__raw[3]
+
+    @property
+    def eta_seconds(self):
+        return self.__raw[4]
+
+    def __update_stats(self, stats):
+        transferred, size = stats.get('bytes', 0), stats.get('totalBytes', 0)
+        self.__raw = (transferred, size, transferred / size * 100 if size else 0,
+                      stats.get('speed', 0), stats.get('eta'))
 
     async def __progress(self):
-        while not (self.__proc is None or self.__is_cancelled):
-            try:
-                data = (await self.__proc.stdout.readline()).decode()
-            except:
-                continue
-            if not data:
-                break
-            if data := re_findall(r'Transferred:\s+([\d.]+\s*\w+)\s+/\s+([\d.]+\s*\w+),\s+([\d.]+%)\s*,\s+([\d.]+\s*\w+/s),\s+ETA\s+([\dwdhms]+)', data):
-                self.__transferred_size, self.__size, self.__percentage, self.__speed, self.__eta = data[
-                    0]
+        # rclone runs with --use-json-log, stats arrive as numeric json on stderr
+        self.__errors = []
+        debug_log = await aiopen('rlog.txt', 'ab') if self.__debug else None
+        try:
+            while not (self.__proc is None or self.__is_cancelled):
+                try:
+                    line = await self.__proc.stderr.readline()
+                except:
+                    continue
+                if not line:
+                    break
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    self.__errors.append(line.decode(errors='ignore').strip())
+                    continue
+                if stats := entry.get('stats'):
+                    self.__update_stats(stats)
+                    continue
+                if debug_log is not None:
+                    await debug_log.write(line)
+                if entry.get('level') in ['error', 'critical', 'fatal']:
+                    self.__errors.append(entry.get('msg', '').strip())
+        finally:
+            if debug_log is not None:
+                await debug_log.close()
+
+    async def __rc_job(self, daemon, method, **params):
+        group = f'task_{token_hex(5)}'
+        self.__rc_job_ref = (daemon, await daemon.submit(method, group, **params))
+        try:
+            while True:
+                status = await daemon.job_status(self.__rc_job_ref[1])
+                self.__update_stats(await daemon.stats(group))
+                if status['finished']:
+                    return status['success'], status['error']
+                await sleep(1)
+        finally:
+            self.__rc_job_ref = None
+            await daemon.forget(group)
+
+    @staticmethod
+    def __rc_options(**config):
+        ext = '*.{' + ','.join(GLOBAL_EXTENSION_FILTER) + '}'
+        return {'_config': {'LowLevelRetries': 1, 'Metadata': True, **config},
+                '_filter': {'ExcludeRule': [ext], 'IgnoreCase': True}}
+
+    async def __rc_copy(self, daemon, method, source, destination, is_dir, **config):
+        options = self.__rc_options(**config)
+        if is_dir:
+            return await self.__rc_job(daemon, f'sync/{method}', srcFs=source, dstFs=destination, **options)
+        src_fs, name = rc_split(source)
+        return await self.__rc_job(daemon, f'operations/{method}file', srcFs=src_fs, srcRemote=name,
+                                   dstFs=destination, dstRemote=name, **options)
+
+    async def __rc_link(self, daemon, remote, rc_path, destination, mime_type, remote_type):
+        if remote_type == 'drive':
+            parent = rc_path.strip('/').rsplit('/', 1)[0] if mime_type == 'Folder' and '/' in rc_path.strip('/') \
+                else '' if mime_type == 'Folder' else rc_path
+            items = (await daemon.call('operations/list', fs=f'{remote}:', remote=parent,
+                                       opt={'noModTime': True, 'noMimeType': True}))['list']
+            fid = next((item['ID'] for item in items if item['Name'] == self.name), 'err')
+            link = f'https://drive.google.com/drive/folders/{fid}' if mime_type == 'Folder' else f'https://drive.google.com/uc?id={fid}&export=download'
+        else:
+            link = (await daemon.call('operations/publiclink', fs=f'{remote}:', remote=destination.split(':', 1)[1]))['url']
+        return link
+
+    async def __get_link(self, config_path, remote, rc_path, mime_type, remote_type):
+        if mime_type == 'Folder':
+            destination = f"{remote}:{rc_path}"
+        elif rc_path:
+            destination = f"{remote}:{rc_path}/{self.name}"
+        else:
+            destination = f"{remote}:{self.name}"
+
+        async with rc_daemons.daemon(config_path) as daemon:
+            if daemon is not None:
+                try:
+                    return await self.__rc_link(daemon, remote, rc_path, destination, mime_type, remote_type), destination, ''
+                except Exception as err:
+                    LOGGER.error(f'while getting link. Path: {destination} | Error: {err}')
+                    return '', destination, str(err)
+
+        if remote_type == 'drive':
+            link, destination = await self.__get_gdrive_link(config_path, remote, rc_path, mime_type)
+            return link, destination, ''
+
+        cmd = ['rclone', 'link', '--config', config_path, destination]
+        res, err, code = await cmd_exec(cmd)
+        if code == 0:
+            return res, destination, ''
+        elif code != -9:
+            LOGGER.error(
+                f'while getting link. Path: {destination} | Stderr: {err}')
+        return '', destination, err
 
     def __switchServiceAccount(self):
         if self.__sa_index == self.__sa_number - 1:
@@ -108,7 +230,7 @@ class RcloneTransferHelper:
         if return_code == 0:
             await self.__listener.onDownloadComplete()
         elif return_code != -9:
-            error = (await self.__proc.stderr.read()).decode().strip()
+            error = '\n'.join(self.__errors).strip()
             if not error and remote_type == 'drive' and config_dict['USE_SERVICE_ACCOUNTS']:
                 error = "Mostly your service accounts don't have access to this drive!"
             LOGGER.error(error)
@@ -116,7 +238,7 @@ class RcloneTransferHelper:
             if self.__sa_number != 0 and remote_type == 'drive' and 'RATE_LIMIT_EXCEEDED' in error and config_dict['USE_SERVICE_ACCOUNTS']:
                 if self.__sa_count < self.__sa_number:
                     remote = self.__switchServiceAccount()
-                    cmd[6] = f"{remote}:{cmd[6].split(':', 1)[1]}"
+                    cmd[5] = f"{remote}:{cmd[5].split(':', 1)[1]}"
                     if self.__is_cancelled:
                         return
                     return await self.__start_download(cmd, remote_type)
@@ -126,6 +248,29 @@ class RcloneTransferHelper:
 
             await self.__listener.onDownloadError(error[:4000])
 
+    async def __rc_start_download(self, daemon, remote, rc_path, path, remote_type):
+        source = f'{remote},acknowledge_abuse=true:' if remote_type == 'drive' else f'{remote}:'
+        try:
+            item = (await daemon.call('operations/stat', fs=source, remote=rc_path)).get('item') if rc_path else None
+            success, error = await self.__rc_copy(daemon, 'copy', f'{source}{rc_path}', path, not item or item['IsDir'],
+                                                  **({} if remote_type == 'drive' else {'RetriesInterval': '3s'}))
+        except Exception as err:
+            success, error = False, str(err)
+
+        if self.__is_cancelled:
+            return
+        if success:
+            await self.__listener.onDownloadComplete()
+            return
+        LOGGER.error(error)
+        if self.__sa_number != 0 and remote_type == 'drive' and 'RATE_LIMIT_EXCEEDED' in error and config_dict['USE_SERVICE_ACCOUNTS']:
+            if self.__sa_count < self.__sa_number:
+                remote = self.__switchServiceAccount()
+                return await self.__rc_start_download(daemon, remote, rc_path, path, remote_type)
+            LOGGER.info(
+                f"Reached maximum number of service accounts switching, which is {self.__sa_count}")
+        await self.__listener.onDownloadError(error[:4000])
+
     async def download(self, remote, rc_path, config_path, path):
         self.__is_download = True
         try:
@@ -146,6 +291,11 @@ class RcloneTransferHelper:
                 LOGGER.info(f'Download with service account {remote}')
 
         rcflags = self.__listener.rcFlags or config_dict['RCLONE_FLAGS']
+        if not rcflags:
+            async with rc_daemons.daemon(config_path) as daemon:
+                if daemon is not None:
+                    return await self.__rc_start_download(daemon, remote, rc_path, path, remote_type)
+
         cmd = self.__getUpdatedCommand(
             config_path, f'{remote}:{rc_path}', path, rcflags, 'copy')
 
@@ -194,14 +344,14 @@ class RcloneTransferHelper:
         if return_code == -9:
             return False
         elif return_code != 0:
-            error = (await self.__proc.stderr.read()).decode().strip()
+            error = '\n'.join(self.__errors).strip()
             if not error and remote_type == 'drive' and config_dict['USE_SERVICE_ACCOUNTS']:
                 error = "Mostly your service accounts don't have access to this drive!"
             LOGGER.error(error)
             if self.__sa_number != 0 and remote_type == 'drive' and 'RATE_LIMIT_EXCEEDED' in error and config_dict['USE_SERVICE_ACCOUNTS']:
                 if self.__sa_count < self.__sa_number:
                     remote = self.__switchServiceAccount()
-                    cmd[7] = f"{remote}:{cmd[7].split(':', 1)[1]}"
+                    cmd[6] = f"{remote}:{cmd[6].split(':', 1)[1]}"
                     return False if self.__is_cancelled else await self.__start_upload(cmd, remote_type)
                 else:
                     LOGGER.info(
@@ -211,6 +361,28 @@ class RcloneTransferHelper:
         else:
             return True
 
+    async def __rc_start_upload(self, daemon, path, remote, rc_path, remote_type, method, mime_type):
+        destination = f'{remote},chunk_size=64M,upload_cutoff=32M:' if remote_type == 'drive' else f'{remote}:'
+        try:
+            success, error = await self.__rc_copy(daemon, method, path, f'{destination}{rc_path}', mime_type == 'Folder',
+                                                  **({} if remote_type == 'drive' else {'RetriesInterval': '3s'}))
+        except Exception as err:
+            success, error = False, str(err)
+
+        if self.__is_cancelled:
+            return False
+        if success:
+            return True
+        LOGGER.error(error)
+        if self.__sa_number != 0 and remote_type == 'drive' and 'RATE_LIMIT_EXCEEDED' in error and config_dict['USE_SERVICE_ACCOUNTS']:
+            if self.__sa_count < self.__sa_number:
+                remote = self.__switchServiceAccount()
+                return await self.__rc_start_upload(daemon, path, remote, rc_path, remote_type, method, mime_type)
+            LOGGER.info(
+                f"Reached maximum number of service accounts switching, which is {self.__sa_count}")
+        await self.__listener.onUploadError(error[:4000])
+        return False
+
     async def upload(self, path, size):
         self.__is_upload = True
         rc_path = self.__listener.upPath.strip('/')
@@ -255,37 +427,26 @@ class RcloneTransferHelper:
 
         rcflags = self.__listener.rcFlags or config_dict['RCLONE_FLAGS']
         method = 'move' if not self.__listener.seed or self.__listener.newDir else 'copy'
-        cmd = self.__getUpdatedCommand(
-            fconfig_path, path, f'{fremote}:{rc_path}', rcflags, method)
-        if remote_type == 'drive' and not config_dict['RCLONE_FLAGS'] and not self.__listener.rcFlags:
-            cmd.extend(('--drive-chunk-size', '64M',
-                       '--drive-upload-cutoff', '32M'))
-        elif remote_type != 'drive':
-            cmd.extend(('--retries-sleep', '3s'))
-
-        result = await self.__start_upload(cmd, remote_type)
+        daemon = None if rcflags else await rc_daemons.acquire(fconfig_path)
+        if daemon is not None:
+            try:
+                result = await self.__rc_start_upload(daemon, path, fremote, rc_path, remote_type, method, mime_type)
+            finally:
+                await rc_daemons.release(daemon)
+        else:
+            cmd = self.__getUpdatedCommand(
+                fconfig_path, path, f'{fremote}:{rc_path}', rcflags, method)
+            if remote_type == 'drive' and not rcflags:
+                cmd.extend(('--drive-chunk-size', '64M',
+                           '--drive-upload-cutoff', '32M'))
+            elif remote_type != 'drive':
+                cmd.extend(('--retries-sleep', '3s'))
+            result = await self.__start_upload(cmd, remote_type)
         if not result:
             return
 
-        if remote_type == 'drive':
-            link, destination = await self.__get_gdrive_link(oconfig_path, oremote, rc_path, mime_type)
-        else:
-            if mime_type == 'Folder':
-                destination = f"{oremote}:{rc_path}"
-            elif rc_path:
-                destination = f"{oremote}:{rc_path}/{self.name}"
-            else:
-                destination = f"{oremote}:{self.name}"
-
-            cmd = ['rclone', 'link', '--config', oconfig_path, destination]
-            res, err, code = await cmd_exec(cmd)
-
-            if code == 0:
-                link = res
-            elif code != -9:
-                LOGGER.error(
-                    f'while getting link. Path: {destination} | Stderr: {err}')
-                link = ''
+        rclone_list_cache.invalidate(oconfig_path, f'{oremote}:{rc_path}')
+        link, destination, _ = await self.__get_link(oconfig_path, oremote, rc_path, mime_type, remote_type)
         if self.__is_cancelled:
             return
         LOGGER.info(f'Upload Done. Path: {destination}')
@@ -303,62 +464,72 @@ class RcloneTransferHelper:
 
         src_remote_type, dst_remote_type = src_remote_opts['type'], dst_remote_opt['type']
 
-        cmd = self.__getUpdatedCommand(
-            config_path, f'{src_remote}:{src_path}', destination, rcflags, 'copy')
-        if not rcflags:
+        daemon = None if rcflags else await rc_daemons.acquire(config_path)
+        if daemon is not None:
+            source, target, config = f'{src_remote}:', f'{dst_remote}:', {}
             if src_remote_type == 'drive' and dst_remote_type != 'drive':
-                cmd.append('--drive-acknowledge-abuse')
+                source = f'{src_remote},acknowledge_abuse=true:'
             elif dst_remote_type == 'drive' and src_remote_type != 'drive':
-                cmd.extend(('--drive-chunk-size', '64M',
-                           '--drive-upload-cutoff', '32M'))
+                target = f'{dst_remote},chunk_size=64M,upload_cutoff=32M:'
             elif src_remote_type == 'drive':
-                cmd.extend(('--tpslimit', '3', '--transfers', '3'))
-
-        self.__proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-        _, return_code = await gather(self.__progress(), self.__proc.wait())
-
+                config = {'TPSLimit': 3, 'Transfers': 3}
+            try:
+                success, error = await self.__rc_copy(daemon, 'copy', f'{source}{src_path}', f'{target}{dst_path}',
+                                                      mime_type == 'Folder', **config)
+            except Exception as err:
+                success, error = False, str(err)
+            finally:
+                await rc_daemons.release(daemon)
+            if self.__is_cancelled:
+                return None, None
+            if not success:
+                LOGGER.error(error)
+                await self.__listener.onUploadError(error[:4000])
+                return None, None
+        else:
+            cmd = self.__getUpdatedCommand(
+                config_path, f'{src_remote}:{src_path}', destination, rcflags, 'copy')
+            if not rcflags:
+                if src_remote_type == 'drive' and dst_remote_type != 'drive':
+                    cmd.append('--drive-acknowledge-abuse')
+                elif dst_remote_type == 'drive' and src_remote_type != 'drive':
+                    cmd.extend(('--drive-chunk-size', '64M',
+                               '--drive-upload-cutoff', '32M'))
+                elif src_remote_type == 'drive':
+                    cmd.extend(('--tpslimit', '3', '--transfers', '3'))
+
+            self.__proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+            _, return_code = await gather(self.__progress(), self.__proc.wait())
+
+            if self.__is_cancelled or return_code == -9:
+                return None, None
+            elif return_code != 0:
+                error = '\n'.join(self.__errors).strip()
+                LOGGER.error(error)
+                await self.__listener.onUploadError(error[:4000])
+                return None, None
+
+        rclone_list_cache.invalidate(config_path, destination)
+        link, destination, err = await self.__get_link(config_path, dst_remote, dst_path, mime_type, dst_remote_type)
         if self.__is_cancelled:
             return None, None
-
-        if return_code == -9:
-            return None, None
-        elif return_code != 0:
-            error = (await self.__proc.stderr.read()).decode().strip()
-            LOGGER.error(error)
-            await self.__listener.onUploadError(error[:4000])
+        if dst_remote_type != 'drive' and not link:
+            await self.__listener.onUploadError(err[:4000])
             return None, None
-        else:
-            if dst_remote_type == 'drive':
-                link, destination = await self.__get_gdrive_link(config_path, dst_remote, dst_path, mime_type)
-                return (None, None) if self.__is_cancelled else (link, destination)
-            else:
-                if mime_type != 'Folder':
-                    destination += f'/{self.name}' if dst_path else self.name
-
-                cmd = ['rclone', 'link', '--config', config_path, destination]
-                res, err, code = await cmd_exec(cmd)
-
-                if self.__is_cancelled:
-                    return None, None
-
-                if code == 0:
-                    return res, destination
-                elif code != -9:
-                    LOGGER.error(
-                        f'while getting link. Path: {destination} | Stderr: {err}')
-                    await self.__listener.onUploadError(err[:4000])
-                    return None, None
+        return link, destination
 
-    @staticmethod
-    def __getUpdatedCommand(config_path, source, destination, rcflags, method):
+    def __getUpdatedCommand(self, config_path, source, destination, rcflags, method):
         ext = '*.{' + ','.join(GLOBAL_EXTENSION_FILTER) + '}'
-        cmd = ['rclone', method, '--fast-list', '--config', config_path, '-P', source, destination,
-               '--exclude', ext, '--ignore-case', '--low-level-retries', '1', '-M', '--log-file',
-               'rlog.txt', '--log-level', 'DEBUG']
+        cmd = ['rclone', method, '--fast-list', '--config', config_path, source, destination,
+               '--exclude', ext, '--ignore-case', '--low-level-retries', '1', '-M', '--use-json-log',
+               '--stats', '1s', '--stats-one-line', '--stats-log-level', 'NOTICE']
         if rcflags:
             rcflags = rcflags.split('|')
             for flag in rcflags:
-                if ":" in flag:
+                if flag.strip() == 'debug':
+                    self.__debug = True
+                    cmd.extend(('--log-level', 'DEBUG'))
+                elif ":" in flag:
                     key, value = map(str.strip, flag.split(':', 1))
                     cmd.extend((key, value))
                 elif len(flag) > 0:
@@ -367,15 +538,21 @@ class RcloneTransferHelper:
 
     @staticmethod
     async def __get_remote_options(config_path, remote):
-        config = ConfigParser()
-        async with aiopen(config_path, 'r') as f:
-            contents = await f.read()
-            config.read_string(contents)
+        mtime = await aiopath.getmtime(config_path)
+        if (cached := remote_options_cache.get(config_path)) is None or cached[0] != mtime:
+            config = ConfigParser()
+            async with aiopen(config_path, 'r') as f:
+                contents = await f.read()
+                config.read_string(contents)
+            cached = remote_options_cache[config_path] = (mtime, config)
+        config = cached[1]
         options = config.options(remote)
         return {opt: config.get(remote, opt) for opt in options}
 
     async def cancel_download(self):
         self.__is_cancelled = True
+        if self.__rc_job_ref is not None:
+            await self.__rc_job_ref[0].stop_job(self.__rc_job_ref[1])
         if self.__proc is not None:
             try:
                 self.__proc.kill()
@@ -2,22 +2,15 @@
 from time import time
 
 from bot import aria2, LOGGER
-from bot.helper.ext_utils.bot_utils import EngineStatus, MirrorStatus, get_readable_time, sync_to_async
-
-
-def get_download(gid):
-    try:
-        return aria2.get_download(gid)
-    except Exception as e:
-        LOGGER.error(f'{e}: Aria2c, Error while getting torrent info')
-        return None
+from bot.helper.ext_utils.aria2_client import aria2_client
+from bot.helper.ext_utils.bot_utils import EngineStatus, MirrorStatus, get_readable_file_size, get_readable_time, sync_to_async
 
 
 class Aria2Status:
 
     def __init__(self, gid, listener, seeding=False, queued=False):
         self.__gid = gid
-        self.__download = get_download(gid)
+        self.__download = aria2_client.get(gid)
         self.__listener = listener
         self.upload_details = self.__listener.upload_details
         self.queued = queued
@@ -25,32 +18,54 @@ class Aria2Status:
         self.seeding = seeding
         self.message = self.__listener.message
 
+    @property
+    def volatile_gid(self):
+        # Only a magnet's metadata download gets followed by the torrent under a new gid
+        download = self.__download
+        return download is None or (download.is_metadata and not download.followed_by_ids)
+
     def __update(self):
-        if self.__download is None:
-            self.__download = get_download(self.__gid)
-        else:
-            self.__download = self.__download.live
+        if download := aria2_client.get(self.__gid):
+            self.__download = download
         if self.__download.followed_by_ids:
             self.__gid = self.__download.followed_by_ids[0]
-            self.__download = get_download(self.__gid)
+            self.__download = aria2_client.get(self.__gid) or self.__download
+
+    def progress_raw(self):
+        return self.__download.progress
+
+    def processed_raw(self):
+        return self.__download.completed_length
+
+    def speed_raw(self):
+        return self.__download.download_speed
+
+    def size_raw(self):
+        return self.__download.total_length
+
+    def eta_raw(self):
+        try:
+            return (self.__download.total_length - self.__download.completed_length) / self.__download.download_speed
+        except ZeroDivisionError:
+            return None
 
     def progress(self):
-        return self.__download.progress_string()
+        return f'{round(self.progress_raw(), 2)}%'
 
     def processed_bytes(self):
-        return self.__download.completed_length_string()
+        return get_readable_file_size(self.processed_raw())
 
     def speed(self):
-        return self.__download.download_speed_string()
+        return f'{get_readable_file_size(self.speed_raw())}/s'
 
     def name(self):
         return self.__download.name
 
     def size(self):
-        return self.__download.total_length_string()
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        return self.__download.eta_string()
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
         
     def listener(self):
         return self.__listener
@@ -75,18 +90,27 @@ class Aria2Status:
     def leechers_num(self):
         return self.__download.connections
 
+    def uploaded_raw(self):
+        return self.__download.upload_length
+
+    def upload_speed_raw(self):
+        return self.__download.upload_speed
+
     def uploaded_bytes(self):
-        return self.__download.upload_length_string()
+        return get_readable_file_size(self.uploaded_raw())
 
     def upload_speed(self):
         self.__update()
-        return self.__download.upload_speed_string()
+        return f'{get_readable_file_size(self.upload_speed_raw())}/s'
 
     def ratio(self):
         return f"{round(self.__download.upload_length / self.__download.completed_length, 3)}"
 
+    def seeding_time_raw(self):
+        return time() - self.start_time
+
     def seeding_time(self):
-        return get_readable_time(time() - self.start_time)
+        return get_readable_time(self.seeding_time_raw())
 
     def download(self):
         return self
@@ -96,7 +120,6 @@ class Aria2Status:
         return self.__gid
 
     async def cancel_download(self):
-        self.__update()
         await sync_to_async(self.__update)
         if self.__download.seeder and self.seeding:
             LOGGER.info(f"Cancelling Seed: {self.name()}")
@@ -9,34 +9,47 @@ class DDLStatus:
         self.upload_details = upload_details
         self.message = message
 
-    def processed_bytes(self):
-        return get_readable_file_size(self.__obj.processed_bytes)
+    def processed_raw(self):
+        return self.__obj.processed_bytes
 
-    def size(self):
-        return get_readable_file_size(self.__size)
+    def speed_raw(self):
+        return self.__obj.speed
 
-    def status(self):
-        return MirrorStatus.STATUS_UPLOADING
-    
-    def name(self):
-        return self.__obj.name
+    def size_raw(self):
+        return self.__size
 
-    def progress(self):
+    def progress_raw(self):
+        try:
+            return self.processed_raw() / self.size_raw() * 100
+        except:
+            return 0
+
+    def eta_raw(self):
         try:
-            progress_raw = self.__obj.processed_bytes / self.__size * 100
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
         except:
-            progress_raw = 0
-        return f'{round(progress_raw, 2)}%'
+            return None
+
+    def processed_bytes(self):
+        return get_readable_file_size(self.processed_raw())
+
+    def size(self):
+        return get_readable_file_size(self.size_raw())
+
+    def progress(self):
+        return f'{round(self.progress_raw(), 2)}%'
 
     def speed(self):
-        return f'{get_readable_file_size(self.__obj.speed)}/s'
+        return f'{get_readable_file_size(self.speed_raw())}/s'
 
     def eta(self):
-        try:
-            seconds = (self.__size - self.__obj.processed_bytes) / self.__obj.speed
-            return get_readable_time(seconds)
-        except:
-            return '-'
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
+
+    def status(self):
+        return MirrorStatus.STATUS_UPLOADING
+    
+    def name(self):
+        return self.__obj.name
 
     def gid(self) -> str:
         return self.__gid
@@ -17,38 +17,49 @@ class DirectStatus:
     def gid(self):
         return self.__gid
 
+    def processed_raw(self):
+        return self.__obj.processed_bytes
+
+    def speed_raw(self):
+        return self.__obj.speed
+
+    def size_raw(self):
+        return self.__obj.total_size
+
     def progress_raw(self):
         try:
-            return self.__obj.processed_bytes / self.__obj.total_size * 100
+            return self.processed_raw() / self.size_raw() * 100
         except:
             return 0
 
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except:
+            return None
+
+    def size(self):
+        return get_readable_file_size(self.size_raw())
+
     def progress(self):
         return f'{round(self.progress_raw(), 2)}%'
 
     def speed(self):
-        return f'{get_readable_file_size(self.__obj.speed)}/s'
+        return f'{get_readable_file_size(self.speed_raw())}/s'
+
+    def eta(self):
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def name(self):
         return self.__obj.name
 
-    def size(self):
-        return get_readable_file_size(self.__obj.total_size)
-
-    def eta(self):
-        try:
-            seconds = (self.__obj.total_size - self.__obj.processed_bytes) / self.__obj.speed
-            return get_readable_time(seconds)
-        except:
-            return '-'
-
     def status(self):
         if self.__obj.task and self.__obj.task.is_waiting:
             return MirrorStatus.STATUS_QUEUEDL
         return MirrorStatus.STATUS_DOWNLOADING
 
     def processed_bytes(self):
-        return get_readable_file_size(self.__obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def download(self):
         return self.__obj
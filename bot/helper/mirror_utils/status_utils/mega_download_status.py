@@ -15,34 +15,44 @@ class MegaDownloadStatus:
     def name(self):
         return self.__name
 
+    def processed_raw(self):
+        return self.__obj.downloaded_bytes
+
+    def speed_raw(self):
+        return self.__obj.speed
+
+    def size_raw(self):
+        return self.__size
+
     def progress_raw(self):
         try:
-            return round(self.__obj.downloaded_bytes / self.__size * 100, 2)
+            return self.processed_raw() / self.size_raw() * 100
         except:
-            return 0.0
+            return 0
+
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except:
+            return None
 
     def progress(self):
-        return f"{self.progress_raw()}%"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def status(self):
         return MirrorStatus.STATUS_DOWNLOADING
 
     def processed_bytes(self):
-        return get_readable_file_size(self.__obj.downloaded_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def eta(self):
-        try:
-            seconds = (self.__size - self.__obj.downloaded_bytes) / \
-                self.__obj.speed
-            return get_readable_time(seconds)
-        except ZeroDivisionError:
-            return '-'
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def size(self):
-        return get_readable_file_size(self.__size)
+        return get_readable_file_size(self.size_raw())
 
     def speed(self):
-        return f'{get_readable_file_size(self.__obj.speed)}/s'
+        return f'{get_readable_file_size(self.speed_raw())}/s'
 
     def gid(self):
         return self.__gid
@@ -30,14 +30,29 @@ class QbittorrentStatus:
         if new_info is not None:
             self.__info = new_info
 
+    def progress_raw(self):
+        return self.__info.progress * 100
+
+    def processed_raw(self):
+        return self.__info.downloaded
+
+    def speed_raw(self):
+        return self.__info.dlspeed
+
+    def size_raw(self):
+        return self.__info.size
+
+    def eta_raw(self):
+        return self.__info.eta if self.__info.eta < 8640000 else None
+
     def progress(self):
-        return f'{round(self.__info.progress*100, 2)}%'
+        return f'{round(self.progress_raw(), 2)}%'
 
     def processed_bytes(self):
-        return get_readable_file_size(self.__info.downloaded)
+        return get_readable_file_size(self.processed_raw())
 
     def speed(self):
-        return f"{get_readable_file_size(self.__info.dlspeed)}/s"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         if self.__info.state in ["metaDL", "checkingResumeData"]:
@@ -46,10 +61,10 @@ class QbittorrentStatus:
             return self.__info.name
 
     def size(self):
-        return get_readable_file_size(self.__info.size)
+        return get_readable_file_size(self.size_raw())
 
     def eta(self):
-        return get_readable_time(self.__info.eta)
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def status(self):
         self.__update()
@@ -73,17 +88,26 @@ class QbittorrentStatus:
     def leechers_num(self):
         return self.__info.num_leechs
 
+    def uploaded_raw(self):
+        return self.__info.uploaded
+
+    def upload_speed_raw(self):
+        return self.__info.upspeed
+
     def uploaded_bytes(self):
-        return get_readable_file_size(self.__info.uploaded)
+        return get_readable_file_size(self.uploaded_raw())
 
     def upload_speed(self):
-        return f"{get_readable_file_size(self.__info.upspeed)}/s"
+        return f"{get_readable_file_size(self.upload_speed_raw())}/s"
 
     def ratio(self):
         return f"{round(self.__info.ratio, 3)}"
 
+    def seeding_time_raw(self):
+        return self.__info.seeding_time
+
     def seeding_time(self):
-        return get_readable_time(self.__info.seeding_time)
+        return get_readable_time(self.seeding_time_raw())
 
     def download(self):
         return self
@@ -12,6 +12,21 @@ class RcloneStatus:
     def gid(self):
         return self.__gid
 
+    def progress_raw(self):
+        return self.__obj.progress_raw
+
+    def processed_raw(self):
+        return self.__obj.transferred_bytes
+
+    def speed_raw(self):
+        return self.__obj.speed_bytes
+
+    def size_raw(self):
+        return self.__obj.size_bytes
+
+    def eta_raw(self):
+        return self.__obj.eta_seconds
+
     def progress(self):
         return self.__obj.percentage
 
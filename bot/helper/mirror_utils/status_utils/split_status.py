@@ -24,6 +24,21 @@ class SplitStatus:
     def name(self):
         return self.__name
 
+    def size_raw(self):
+        return self.__size
+
+    def processed_raw(self):
+        return 0
+
+    def progress_raw(self):
+        return 0
+
+    def speed_raw(self):
+        return 0
+
+    def eta_raw(self):
+        return None
+
     def size(self):
         return get_readable_file_size(self.__size)
 
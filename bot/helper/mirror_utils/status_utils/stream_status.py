@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+from bot.helper.ext_utils.bot_utils import EngineStatus, MirrorStatus, get_readable_file_size, get_readable_time
+
+
+class StreamStatus:
+    def __init__(self, obj, message, gid, upload_details):
+        self.__obj = obj
+        self.__gid = gid
+        self.upload_details = upload_details
+        self.message = message
+
+    def processed_raw(self):
+        return self.__obj.processed_bytes
+
+    def speed_raw(self):
+        return self.__obj.speed
+
+    def size_raw(self):
+        return self.__obj.size
+
+    def progress_raw(self):
+        try:
+            return self.processed_raw() / self.size_raw() * 100
+        except:
+            return 0
+
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except:
+            return None
+
+    def processed_bytes(self):
+        return get_readable_file_size(self.processed_raw())
+
+    def size(self):
+        return get_readable_file_size(self.size_raw())
+
+    def progress(self):
+        return f'{round(self.progress_raw(), 2)}%'
+
+    def speed(self):
+        return f'{get_readable_file_size(self.speed_raw())}/s'
+
+    def eta(self):
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
+
+    def status(self):
+        return MirrorStatus.STATUS_STREAMING
+
+    def name(self):
+        return self.__obj.name
+
+    def gid(self):
+        return self.__gid
+
+    def download(self):
+        return self.__obj
+
+    def eng(self):
+        return getattr(EngineStatus(), self.__obj.engine)
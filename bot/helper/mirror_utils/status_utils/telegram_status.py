@@ -11,11 +11,41 @@ class TelegramStatus:
         self.upload_details = upload_details
         self.message = message
 
+    def processed_raw(self):
+        return self.__obj.processed_bytes
+
+    def speed_raw(self):
+        return self.__obj.speed
+
+    def size_raw(self):
+        return self.__size
+
+    def progress_raw(self):
+        try:
+            return self.processed_raw() / self.size_raw() * 100
+        except:
+            return 0
+
+    def eta_raw(self):
+        try:
+            return (self.size_raw() - self.processed_raw()) / self.speed_raw()
+        except:
+            return None
+
     def processed_bytes(self):
-        return get_readable_file_size(self.__obj.processed_bytes)
+        return get_readable_file_size(self.processed_raw())
 
     def size(self):
-        return get_readable_file_size(self.__size)
+        return get_readable_file_size(self.size_raw())
+
+    def progress(self):
+        return f'{round(self.progress_raw(), 2)}%'
+
+    def speed(self):
+        return f'{get_readable_file_size(self.speed_raw())}/s'
+
+    def eta(self):
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def status(self):
         if self.__status == 'up':
@@ -25,24 +55,6 @@ class TelegramStatus:
     def name(self):
         return self.__obj.name
 
-    def progress(self):
-        try:
-            progress_raw = self.__obj.processed_bytes / self.__size * 100
-        except:
-            progress_raw = 0
-        return f'{round(progress_raw, 2)}%'
-
-    def speed(self):
-        return f'{get_readable_file_size(self.__obj.speed)}/s'
-
-    def eta(self):
-        try:
-            seconds = (self.__size - self.__obj.processed_bytes) / \
-                self.__obj.speed
-            return get_readable_time(seconds)
-        except:
-            return '-'
-
     def gid(self) -> str:
         return self.__gid
 
@@ -23,8 +23,25 @@ class YtDlpDownloadStatus:
         else:
             return async_to_sync(get_path_size, self.__listener.dir)
 
+    def size_raw(self):
+        return self.__obj.size
+
+    def speed_raw(self):
+        return self.__obj.download_speed
+
+    def progress_raw(self):
+        return self.__obj.progress
+
+    def eta_raw(self):
+        if self.__obj.eta != '-':
+            return self.__obj.eta
+        try:
+            return (self.__obj.size - self.processed_raw()) / self.__obj.download_speed
+        except:
+            return None
+
     def size(self):
-        return get_readable_file_size(self.__obj.size)
+        return get_readable_file_size(self.size_raw())
 
     def status(self):
         return MirrorStatus.STATUS_DOWNLOADING
@@ -33,20 +50,13 @@ class YtDlpDownloadStatus:
         return self.__obj.name
 
     def progress(self):
-        return f'{round(self.__obj.progress, 2)}%'
+        return f'{round(self.progress_raw(), 2)}%'
 
     def speed(self):
-        return f'{get_readable_file_size(self.__obj.download_speed)}/s'
+        return f'{get_readable_file_size(self.speed_raw())}/s'
 
     def eta(self):
-        if self.__obj.eta != '-':
-            return get_readable_time(self.__obj.eta)
-        try:
-            seconds = (self.__obj.size - self.processed_raw()) / \
-                self.__obj.download_speed
-            return get_readable_time(seconds)
-        except:
-            return '-'
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def download(self):
         return self.__obj
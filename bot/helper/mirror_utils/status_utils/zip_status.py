@@ -23,6 +23,15 @@ class ZipStatus:
     def speed_raw(self):
         return self.processed_raw() / (time() - self.__start_time)
 
+    def size_raw(self):
+        return self.__size
+
+    def eta_raw(self):
+        try:
+            return (self.__size - self.processed_raw()) / self.speed_raw()
+        except:
+            return None
+
     def progress_raw(self):
         try:
             return self.processed_raw() / self.__size * 100
@@ -42,11 +51,7 @@ class ZipStatus:
         return get_readable_file_size(self.__size)
 
     def eta(self):
-        try:
-            seconds = (self.__size - self.processed_raw()) / self.speed_raw()
-            return get_readable_time(seconds)
-        except:
-            return '-'
+        return get_readable_time(eta) if (eta := self.eta_raw()) is not None else '-'
 
     def status(self):
         return MirrorStatus.STATUS_ARCHIVING
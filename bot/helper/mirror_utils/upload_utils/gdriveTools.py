@@ -2,6 +2,7 @@
 from logging import getLogger, ERROR
 from time import time
 from pickle import load as pload
+from json import loads
 from os import makedirs, path as ospath, listdir, remove as osremove
 from io import FileIO
 from re import search as re_search
@@ -10,7 +11,8 @@ from random import randrange
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaFileUpload, MediaIoBaseDownload, MediaUpload, MediaUploadProgress, build_http
+from google_auth_httplib2 import AuthorizedHttp
 from tenacity import retry, wait_exponential, stop_after_attempt, retry_if_exception_type, RetryError
 
 from bot import OWNER_ID, config_dict, list_drives_dict, GLOBAL_EXTENSION_FILTER
@@ -21,6 +23,71 @@ from bot.helper.ext_utils.leech_utils import format_filename
 LOGGER = getLogger(__name__)
 getLogger('googleapiclient.discovery').setLevel(ERROR)
 
+STREAM_CHUNK_SIZE = 16 * 1024 * 1024
+STREAM_READ_SIZE = 1024 * 1024
+UPLOAD_MULTIPART_CUTOFF = 5 * 1024 * 1024
+UPLOAD_CHUNK_ALIGN = 256 * 1024
+UPLOAD_MIN_CHUNK = 8 * 1024 * 1024
+UPLOAD_MAX_CHUNK = 128 * 1024 * 1024
+UPLOAD_DEFAULT_RATE = 10 * 1024 * 1024
+UPLOAD_CHUNK_SECONDS = 10
+PERMISSION_BATCH_SIZE = 100
+UPLOAD_CKPT_INTERVAL = 30
+ANYONE_READER = {
+    'role': 'reader',
+    'type': 'anyone',
+    'value': None,
+    'withLink': True
+}
+
+
+class StreamMediaUpload(MediaUpload):
+    # Resumable media fed by a blocking read(n); keeps only the unacknowledged chunk in memory
+    def __init__(self, read, mimetype, size=None, chunksize=STREAM_CHUNK_SIZE):
+        super().__init__()
+        self.__read = read
+        self.__mimetype = mimetype
+        self.__size = size
+        self.__chunksize = chunksize
+        self.__buffer = bytearray()
+        self.__offset = 0
+        self.__next = 0
+
+    def __fill(self, end):
+        while self.__offset + len(self.__buffer) < end:
+            if not (data := self.__read(min(end - self.__offset - len(self.__buffer), STREAM_READ_SIZE))):
+                self.__size = self.__offset + len(self.__buffer)
+                return
+            self.__buffer += data
+
+    def chunksize(self):
+        return self.__chunksize
+
+    def mimetype(self):
+        return self.__mimetype
+
+    def size(self):
+        # Read one byte past the next chunk so the last chunk is sent with the total length
+        if self.__size is None:
+            self.__fill(self.__next + self.__chunksize + 1)
+        return self.__size
+
+    def resumable(self):
+        return True
+
+    def getbytes(self, begin, length):
+        if begin < self.__offset:
+            raise Exception('Stream can not be rewound!')
+        del self.__buffer[:begin - self.__offset]
+        self.__offset = begin
+        self.__fill(begin + length)
+        data = bytes(self.__buffer[:length])
+        self.__next = begin + len(data)
+        return data
+
+    def has_stream(self):
+        return False
+
 
 class GoogleDriveHelper:
 
@@ -31,6 +98,7 @@ class GoogleDriveHelper:
         self.__G_DRIVE_DIR_BASE_DOWNLOAD_URL = "https://drive.google.com/drive/folders/{}"
         self.__listener = listener
         self.__user_id = listener.message.from_user.id if listener else None
+        self.__ckpt = getattr(listener, 'upload_ckpt', None)
         self.__path = path
         self.__total_bytes = 0
         self.__total_files = 0
@@ -50,9 +118,12 @@ class GoogleDriveHelper:
         self.__sa_index = 0
         self.__sa_count = 1
         self.__sa_number = 100
+        self.__credentials = None
         self.__service = self.__authorize()
         self.__file_processed_bytes = 0
         self.__processed_bytes = 0
+        self.__throughput = 0
+        self.__pending_permissions = []
         self.name = name
 
     @property
@@ -83,6 +154,7 @@ class GoogleDriveHelper:
                 credentials = pload(f)
         else:
             LOGGER.error('token.pickle not found!')
+        self.__credentials = credentials
         return build('drive', 'v3', credentials=credentials, cache_discovery=False)
 
     def __alt_authorize(self):
@@ -98,6 +170,8 @@ class GoogleDriveHelper:
         return None
 
     def __switchServiceAccount(self):
+        # Permissions queued so far belong to files owned by the current account
+        self.__flush_permissions()
         if self.__sa_index == self.__sa_number - 1:
             self.__sa_index = 0
         else:
@@ -130,13 +204,96 @@ class GoogleDriveHelper:
     @retry(wait=wait_exponential(multiplier=2, min=3, max=6), stop=stop_after_attempt(3),
            retry=retry_if_exception_type(Exception))
     def __set_permission(self, file_id):
-        permissions = {
-            'role': 'reader',
-            'type': 'anyone',
-            'value': None,
-            'withLink': True
-        }
-        return self.__service.permissions().create(fileId=file_id, body=permissions, supportsAllDrives=True).execute()
+        return self.__service.permissions().create(fileId=file_id, body=ANYONE_READER, supportsAllDrives=True).execute()
+
+    def __queue_permission(self, file_id):
+        if config_dict['IS_TEAM_DRIVE']:
+            return
+        self.__pending_permissions.append(file_id)
+        if len(self.__pending_permissions) >= PERMISSION_BATCH_SIZE:
+            self.__flush_permissions()
+
+    def __flush_permissions(self):
+        file_ids, self.__pending_permissions = self.__pending_permissions, []
+        if not file_ids:
+            return
+        failed = []
+
+        def callback(request_id, _, exception):
+            if exception is not None:
+                failed.append(request_id)
+
+        batch = self.__service.new_batch_http_request(callback=callback)
+        for file_id in file_ids:
+            batch.add(self.__service.permissions().create(fileId=file_id, body=ANYONE_READER, fields='id',
+                                                          supportsAllDrives=True), request_id=file_id)
+        batch.execute()
+        for file_id in failed:
+            self.__set_permission(file_id)
+
+    def __ckpt_done(self, file_path):
+        if self.__ckpt is not None:
+            return self.__ckpt.drive_done(ospath.relpath(file_path, self.__path))
+
+    def __ckpt_directory(self, dir_path, dest_id):
+        rel_path = ospath.relpath(dir_path, self.__path)
+        if self.__ckpt is not None and (dir_id := self.__ckpt.drive_dir(rel_path)):
+            return dir_id
+        dir_id = self.__create_directory(ospath.basename(dir_path), dest_id)
+        if self.__ckpt is not None:
+            async_to_sync(self.__ckpt.set_drive_dir, rel_path, dir_id)
+        return dir_id
+
+    @staticmethod
+    def __session_offset(http, uri, file_size):
+        # Bytes the saved resumable session already received, None once Drive has dropped it
+        resp, content = http.request(uri, method='PUT', headers={'Content-Length': '0', 'Content-Range': f'bytes */{file_size}'})
+        if resp.status in [200, 201]:
+            return file_size, loads(content)
+        if resp.status == 308:
+            return (int(resp['range'].rsplit('-', 1)[1]) + 1 if 'range' in resp else 0), None
+        if resp.status in [404, 410]:
+            return None, None
+        raise HttpError(resp, content, uri=uri)
+
+    def __resume_session(self, session, file_path, file_size, rel_path):
+        http = AuthorizedHttp(self.__credentials, http=build_http())
+        uri = session['uri']
+        offset, response = self.__session_offset(http, uri, file_size)
+        if offset is None or response is not None:
+            return response
+        LOGGER.info(f"Resuming G-Drive upload of {ospath.basename(file_path)} from {get_readable_file_size(offset)}")
+        chunk_size = self.__chunk_size(file_size)
+        retries = 0
+        last_save = time()
+        with open(file_path, 'rb') as f:
+            while not self.__is_cancelled:
+                self.__status = MediaUploadProgress(offset, file_size)
+                f.seek(offset)
+                data = f.read(chunk_size)
+                resp, content = http.request(uri, method='PUT', body=data, headers={
+                    'Content-Length': str(len(data)), 'Content-Range': f'bytes {offset}-{offset + len(data) - 1}/{file_size}'})
+                if resp.status in [200, 201]:
+                    return loads(content)
+                if resp.status == 308:
+                    offset = int(resp['range'].rsplit('-', 1)[1]) + 1 if 'range' in resp else 0
+                    if time() - last_save >= UPLOAD_CKPT_INTERVAL:
+                        last_save = time()
+                        async_to_sync(self.__ckpt.set_drive_session, rel_path, uri, offset, file_size)
+                elif resp.status in [500, 502, 503, 504] and retries < 10:
+                    retries += 1
+                    offset, response = self.__session_offset(http, uri, file_size)
+                    if offset is None or response is not None:
+                        return response
+                elif resp.status in [404, 410]:
+                    return None
+                else:
+                    raise HttpError(resp, content, uri=uri)
+
+    def __chunk_size(self, file_size):
+        # About UPLOAD_CHUNK_SECONDS of transfer per request at the measured speed, one request if the file is smaller
+        chunk = min(max((self.__throughput or UPLOAD_DEFAULT_RATE) * UPLOAD_CHUNK_SECONDS, UPLOAD_MIN_CHUNK), UPLOAD_MAX_CHUNK, file_size)
+        return int(-(-chunk // UPLOAD_CHUNK_ALIGN) * UPLOAD_CHUNK_ALIGN)
 
     @retry(wait=wait_exponential(multiplier=2, min=3, max=6), stop=stop_after_attempt(3),
            retry=retry_if_exception_type(Exception))
@@ -224,28 +381,34 @@ class GoogleDriveHelper:
         item_path = f"{self.__path}/{file_name}"
         LOGGER.info(f"Uploading: {item_path}")
         self.__updater = setInterval(self.__update_interval, self.__progress)
+        if self.__ckpt is not None:
+            self.__total_files = self.__ckpt.drive_done_count()
         try:
             if ospath.isfile(item_path):
                 if item_path.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)):
                     raise Exception('This file extension is excluded by extension filter!')
                 mime_type = get_mime_type(item_path)
-                link = self.__upload_file(
-                    item_path, file_name, mime_type, gdrive_id, is_dir=False)
+                if file_id := self.__ckpt_done(item_path):
+                    link = self.__G_DRIVE_BASE_DOWNLOAD_URL.format(file_id)
+                else:
+                    link = self.__upload_file(
+                        item_path, file_name, mime_type, gdrive_id, is_dir=False)
                 if self.__is_cancelled:
                     return
                 if link is None:
                     raise Exception('Upload has been manually cancelled')
+                self.__flush_permissions()
                 LOGGER.info(f"Uploaded To G-Drive: {item_path}")
             else:
                 mime_type = 'Folder'
-                dir_id = self.__create_directory(ospath.basename(
-                    ospath.abspath(file_name)), gdrive_id)
+                dir_id = self.__ckpt_directory(ospath.abspath(item_path), gdrive_id)
                 result = self.__upload_dir(item_path, dir_id)
                 if result is None:
                     raise Exception('Upload has been manually cancelled!')
                 link = self.__G_DRIVE_DIR_BASE_DOWNLOAD_URL.format(dir_id)
                 if self.__is_cancelled:
                     return
+                self.__flush_permissions()
                 LOGGER.info(f"Uploaded To G-Drive: {file_name}")
         except Exception as err:
             if isinstance(err, RetryError):
@@ -268,6 +431,36 @@ class GoogleDriveHelper:
             async_to_sync(self.__listener.onUploadComplete, link, size, self.__total_files,
                           self.__total_folders, mime_type, file_name)
 
+    def upload_stream(self, read, file_name, mime_type, size, gdrive_id):
+        if not gdrive_id:
+            gdrive_id = config_dict['GDRIVE_ID']
+        self.__is_uploading = True
+        file_name, _ = async_to_sync(format_filename, file_name, self.__user_id, isMirror=True)
+        file_metadata = {
+            'name': file_name,
+            'description': config_dict['GD_INFO'],
+            'mimeType': mime_type,
+            'parents': [gdrive_id]
+        }
+        LOGGER.info(f"Streaming To G-Drive: {file_name}")
+        # No service account switching here, a consumed stream can't be replayed on a new session
+        drive_file = self.__service.files().create(body=file_metadata, media_body=StreamMediaUpload(read, mime_type, size),
+                                                   supportsAllDrives=True)
+        response = None
+        retries = 0
+        while response is None:
+            try:
+                _, response = drive_file.next_chunk()
+            except HttpError as err:
+                if err.resp.status in [500, 502, 503, 504] and retries < 10:
+                    retries += 1
+                    continue
+                raise err
+        if not config_dict['IS_TEAM_DRIVE']:
+            self.__set_permission(response['id'])
+        LOGGER.info(f"Streamed To G-Drive: {file_name}")
+        return self.__G_DRIVE_BASE_DOWNLOAD_URL.format(response['id']), file_name
+
     def __upload_dir(self, input_directory, dest_id):
         list_dirs = listdir(input_directory)
         if len(list_dirs) == 0:
@@ -276,16 +469,17 @@ class GoogleDriveHelper:
         for item in list_dirs:
             current_file_name = ospath.join(input_directory, item)
             if ospath.isdir(current_file_name):
-                current_dir_id = self.__create_directory(item, dest_id)
+                current_dir_id = self.__ckpt_directory(current_file_name, dest_id)
                 new_id = self.__upload_dir(current_file_name, current_dir_id)
                 self.__total_folders += 1
             elif not item.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)):
-                mime_type = get_mime_type(current_file_name)
-                file_name = current_file_name.split("/")[-1]
-                # current_file_name will have the full path
-                self.__upload_file(current_file_name,
-                                   file_name, mime_type, dest_id)
-                self.__total_files += 1
+                if not self.__ckpt_done(current_file_name):
+                    mime_type = get_mime_type(current_file_name)
+                    file_name = current_file_name.split("/")[-1]
+                    # current_file_name will have the full path
+                    self.__upload_file(current_file_name,
+                                       file_name, mime_type, dest_id)
+                    self.__total_files += 1
                 new_id = dest_id
             else:
                 osremove(current_file_name)
@@ -327,73 +521,81 @@ class GoogleDriveHelper:
         if dest_id is not None:
             file_metadata['parents'] = [dest_id]
 
-        if ospath.getsize(file_path) == 0:
-            media_body = MediaFileUpload(file_path,
-                                         mimetype=mime_type,
-                                         resumable=False)
-            response = self.__service.files().create(body=file_metadata, media_body=media_body,
-                                                     supportsAllDrives=True).execute()
-            if not config_dict['IS_TEAM_DRIVE']:
-                self.__set_permission(response['id'])
-
-            drive_file = self.__service.files().get(
-                fileId=response['id'], supportsAllDrives=True).execute()
-            return self.__G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get('id'))
-        media_body = MediaFileUpload(file_path,
-                                     mimetype=mime_type,
-                                     resumable=True,
-                                     chunksize=100 * 1024 * 1024)
-
-        # Insert a file
-        drive_file = self.__service.files().create(
-            body=file_metadata, media_body=media_body, supportsAllDrives=True)
-        response = None
-        retries = 0
-        while response is None and not self.__is_cancelled:
-            try:
-                self.__status, response = drive_file.next_chunk()
-            except HttpError as err:
-                if err.resp.status in [500, 502, 503, 504] and retries < 10:
-                    retries += 1
-                    continue
-                if err.resp.get('content-type', '').startswith('application/json'):
-                    reason = eval(err.content).get(
-                        'error').get('errors')[0].get('reason')
-                    if reason not in [
-                        'userRateLimitExceeded',
-                        'dailyLimitExceeded',
-                    ]:
-                        raise err
-                    if config_dict['USE_SERVICE_ACCOUNTS']:
-                        if self.__sa_count >= self.__sa_number:
-                            LOGGER.info(
-                                f"Reached maximum number of service accounts switching, which is {self.__sa_count}")
+        file_size = ospath.getsize(file_path)
+        rel_path = ospath.relpath(file_path, self.__path)
+        start_time = time()
+        try:
+            if file_size < UPLOAD_MULTIPART_CUTOFF:
+                # Metadata and content in a single request
+                response = self.__service.files().create(body=file_metadata, fields='id', supportsAllDrives=True,
+                                                         media_body=MediaFileUpload(file_path, mimetype=mime_type, resumable=False)).execute()
+            else:
+                response = None
+                if self.__ckpt is not None and (session := self.__ckpt.drive_session(rel_path)) and session['size'] == file_size:
+                    response = self.__resume_session(session, file_path, file_size, rel_path)
+                if response is None and not self.__is_cancelled:
+                    media_body = MediaFileUpload(file_path,
+                                                 mimetype=mime_type,
+                                                 resumable=True,
+                                                 chunksize=self.__chunk_size(file_size))
+                    drive_file = self.__service.files().create(
+                        body=file_metadata, media_body=media_body, fields='id', supportsAllDrives=True)
+                    retries = 0
+                    last_save = 0
+                    while response is None and not self.__is_cancelled:
+                        try:
+                            self.__status, response = drive_file.next_chunk()
+                        except HttpError as err:
+                            if err.resp.status in [500, 502, 503, 504] and retries < 10:
+                                retries += 1
+                                continue
                             raise err
-                        else:
-                            if self.__is_cancelled:
-                                return
-                            self.__switchServiceAccount()
-                            LOGGER.info(f"Got: {reason}, Trying Again.")
-                            return self.__upload_file(file_path, file_name, mime_type, dest_id)
-                    else:
-                        LOGGER.error(f"Got: {reason}")
+                        if response is None and self.__ckpt is not None and time() - last_save >= UPLOAD_CKPT_INTERVAL \
+                                and (uri := getattr(drive_file, 'resumable_uri', None)):
+                            last_save = time()
+                            async_to_sync(self.__ckpt.set_drive_session, rel_path, uri, self.__status.resumable_progress, file_size)
+        except HttpError as err:
+            if err.resp.get('content-type', '').startswith('application/json'):
+                reason = eval(err.content).get(
+                    'error').get('errors')[0].get('reason')
+                if reason not in [
+                    'userRateLimitExceeded',
+                    'dailyLimitExceeded',
+                ]:
+                    raise err
+                if config_dict['USE_SERVICE_ACCOUNTS']:
+                    if self.__sa_count >= self.__sa_number:
+                        LOGGER.info(
+                            f"Reached maximum number of service accounts switching, which is {self.__sa_count}")
                         raise err
+                    else:
+                        if self.__is_cancelled:
+                            return
+                        self.__switchServiceAccount()
+                        LOGGER.info(f"Got: {reason}, Trying Again.")
+                        return self.__upload_file(file_path, file_name, mime_type, dest_id, is_dir)
+                else:
+                    LOGGER.error(f"Got: {reason}")
+                    raise err
+            raise err
         if self.__is_cancelled:
             return
+        if file_size >= UPLOAD_MULTIPART_CUTOFF:
+            rate = file_size / max(time() - start_time, 1)
+            self.__throughput = (self.__throughput + rate) / 2 if self.__throughput else rate
+        self.__status = None
+        self.__processed_bytes += file_size - self.__file_processed_bytes
+        self.__file_processed_bytes = 0
+        if self.__ckpt is not None:
+            async_to_sync(self.__ckpt.set_drive_done, rel_path, response['id'])
         if not self.__listener.seed or self.__listener.newDir:
             try:
                 osremove(file_path)
             except:
                 pass
-        self.__file_processed_bytes = 0
-        # Insert new permissions
-        if not config_dict['IS_TEAM_DRIVE']:
-            self.__set_permission(response['id'])
-        # Define file instance and get url for download
+        self.__queue_permission(response['id'])
         if not is_dir:
-            drive_file = self.__service.files().get(
-                fileId=response['id'], supportsAllDrives=True).execute()
-            return self.__G_DRIVE_BASE_DOWNLOAD_URL.format(drive_file.get('id'))
+            return self.__G_DRIVE_BASE_DOWNLOAD_URL.format(response['id'])
         return
 
     def clone(self, link, gdrive_id):
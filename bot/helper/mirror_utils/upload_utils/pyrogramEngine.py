@@ -56,6 +56,7 @@ class TgUploader:
         self.__user_id = listener.message.from_user.id
         self.__leechmsg = {}
         self.__leech_utils = self.__listener.leech_utils
+        self.__ckpt = listener.upload_ckpt
         
     async def get_custom_thumb(self, thumb):
         if is_telegram_link(thumb):
@@ -292,6 +293,15 @@ class TgUploader:
         res = await self.__msg_to_reply()
         if not res:
             return
+        if self.__ckpt is not None and (parts := self.__ckpt.tg_parts()):
+            # Parts sent before a restart, continue the reply chain from the last one
+            for part in parts:
+                self.__msgs_dict[part['link']] = part['name']
+            self.__total_files += len(parts)
+            try:
+                self.__sent_msg = await bot.get_messages(parts[-1]['chat_id'], parts[-1]['msg_id'])
+            except Exception as err:
+                LOGGER.error(f"Failed to get last leeched part: {err}")
         isDeleted = False
         for dirpath, _, files in sorted(await sync_to_async(walk, self.__path)):
             if dirpath.endswith('/yt-dlp-thumb'):
@@ -305,6 +315,9 @@ class TgUploader:
                     f_size = await aiopath.getsize(self.__up_path)
                     if self.__listener.seed and file_ in o_files and f_size in m_size:
                         continue
+                    rel_path = ospath.relpath(self.__up_path, self.__path)
+                    if self.__ckpt is not None and self.__ckpt.tg_part(rel_path):
+                        continue
                     self.__total_files += 1
                     if f_size == 0:
                         LOGGER.error(f"{self.__up_path} size is zero, telegram don't upload zero size files")
@@ -333,6 +346,8 @@ class TgUploader:
                         return
                     if not self.__is_corrupted and (self.__listener.isSuperGroup or config_dict['LEECH_LOG_ID']):
                         self.__msgs_dict[self.__sent_msg.link] = file_
+                        if self.__ckpt is not None:
+                            await self.__ckpt.set_tg_part(rel_path, self.__sent_msg, file_)
                     await sleep(1)
                 except Exception as err:
                     if isinstance(err, RetryError):
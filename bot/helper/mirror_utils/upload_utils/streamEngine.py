@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+from asyncio import create_subprocess_exec
+from asyncio.subprocess import PIPE
+from configparser import ConfigParser
+from json import loads
+from logging import getLogger
+from mimetypes import guess_type
+from re import findall as re_findall, search as re_search
+from time import time
+from urllib.parse import unquote, urlparse
+from aiofiles import open as aiopen
+from aiohttp import ClientSession, ClientTimeout
+from tenacity import RetryError
+
+from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async, async_to_sync
+from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper, STREAM_READ_SIZE
+from bot.helper.mirror_utils.rclone_utils.list import rclone_list_cache
+
+LOGGER = getLogger(__name__)
+
+
+class HttpSource:
+    engine = 'STATUS_AIOHTTP'
+
+    def __init__(self, link, headers='', name=''):
+        self.link = link
+        self.name = name
+        self.size = None
+        self.mime_type = None
+        self.__headers = {key: value.strip() for key, value in re_findall(r'(\S+?):\s+(.*?)(?=\s+\S+?:\s|$)', headers or '')}
+        self.__headers['Accept-Encoding'] = 'identity'
+        self.__session = None
+        self.__response = None
+
+    async def open(self):
+        self.__session = ClientSession(trust_env=True, auto_decompress=False, timeout=ClientTimeout(total=None, sock_read=60))
+        try:
+            self.__response = await self.__session.get(self.link, headers=self.__headers)
+            self.__response.raise_for_status()
+        except Exception:
+            await self.close()
+            raise
+        if not self.name:
+            if (cd := self.__response.headers.get('Content-Disposition')) and \
+                    (match := re_search(r"filename\*=(?:UTF-8'')?([^;]+)|filename=\"?([^\";]+)", cd)):
+                self.name = unquote(match.group(1) or match.group(2)).strip()
+            else:
+                self.name = unquote(urlparse(str(self.__response.url)).path.rstrip('/').rsplit('/', 1)[-1])
+        self.size = self.__response.content_length
+        self.mime_type = guess_type(self.name)[0] or self.__response.content_type or 'application/octet-stream'
+
+    async def read(self, n):
+        return await self.__response.content.read(n)
+
+    async def close(self):
+        if self.__response is not None:
+            self.__response.close()
+        if self.__session is not None:
+            await self.__session.close()
+        self.__response = self.__session = None
+
+
+class RcloneSource:
+    engine = 'STATUS_RCLONE'
+
+    def __init__(self, rc_path, config_path, name=''):
+        self.link = rc_path
+        self.name = name
+        self.size = None
+        self.mime_type = None
+        self.__config_path = config_path
+        self.__proc = None
+
+    async def open(self):
+        cmd = ['rclone', 'lsjson', '--stat', '--no-modtime', '--config', self.__config_path, self.link]
+        res, err, code = await cmd_exec(cmd)
+        if code != 0:
+            raise Exception(f'While getting rclone stat. Path: {self.link}. Stderr: {err[:4000]}')
+        rstat = loads(res)
+        if rstat['IsDir']:
+            raise Exception('Only single files can be streamed!')
+        self.name = self.name or rstat['Name']
+        self.size = rstat['Size'] if rstat['Size'] >= 0 else None
+        self.mime_type = guess_type(self.name)[0] or rstat.get('MimeType') or 'application/octet-stream'
+        self.__proc = await create_subprocess_exec('rclone', 'cat', '--config', self.__config_path, self.link,
+                                                   stdout=PIPE, stderr=PIPE)
+
+    async def read(self, n):
+        if data := await self.__proc.stdout.read(n):
+            return data
+        if await self.__proc.wait() != 0:
+            raise Exception((await self.__proc.stderr.read()).decode().strip()[:4000] or 'rclone cat failed!')
+        return b''
+
+    async def close(self):
+        if self.__proc is not None and self.__proc.returncode is None:
+            try:
+                self.__proc.kill()
+            except:
+                pass
+        self.__proc = None
+
+
+class StreamMirrorHelper:
+    def __init__(self, listener, source):
+        self.__listener = listener
+        self.__source = source
+        self.__proc = None
+        self.__processed_bytes = 0
+        self.__start_time = time()
+        self.__is_cancelled = False
+        self.name = source.name
+        self.engine = source.engine
+
+    @property
+    def processed_bytes(self):
+        return self.__processed_bytes
+
+    @property
+    def size(self):
+        return self.__source.size or 0
+
+    @property
+    def speed(self):
+        try:
+            return self.__processed_bytes / (time() - self.__start_time)
+        except:
+            return 0
+
+    async def __read(self, n):
+        if self.__is_cancelled:
+            raise Exception('Stream stopped by user!')
+        data = await self.__source.read(n)
+        self.__processed_bytes += len(data)
+        return data
+
+    def __read_sync(self, n):
+        return async_to_sync(self.__read, n)
+
+    async def __to_drive(self, mime_type):
+        drive = GoogleDriveHelper(self.name, listener=self.__listener)
+        link, name = await sync_to_async(drive.upload_stream, self.__read_sync, self.name, mime_type,
+                                         self.__source.size, self.__listener.drive_id)
+        return link, name, ''
+
+    async def __to_rclone(self):
+        rc_path = self.__listener.upPath.strip('/')
+        if rc_path.startswith('mrcc:'):
+            rc_path = rc_path.split('mrcc:', 1)[1]
+            config_path = f'rclone/{self.__listener.message.from_user.id}.conf'
+        else:
+            config_path = 'rclone.conf'
+        remote, rc_path = rc_path.split(':', 1)
+        destination = f"{remote}:{rc_path}/{self.name}" if rc_path else f"{remote}:{self.name}"
+        config = ConfigParser()
+        async with aiopen(config_path, 'r') as f:
+            config.read_string(await f.read())
+        remote_type = config.get(remote, 'type')
+
+        self.__proc = await create_subprocess_exec('rclone', 'rcat', '--config', config_path, destination,
+                                                   stdin=PIPE, stderr=PIPE)
+        try:
+            while data := await self.__read(STREAM_READ_SIZE):
+                self.__proc.stdin.write(data)
+                await self.__proc.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception:
+            self.__proc.kill()
+            raise
+        finally:
+            self.__proc.stdin.close()
+        if await self.__proc.wait() != 0:
+            raise Exception((await self.__proc.stderr.read()).decode().strip()[:4000] or 'rclone rcat failed!')
+        rclone_list_cache.invalidate(config_path, destination)
+
+        if remote_type == 'drive':
+            cmd = ['rclone', 'lsjson', '--stat', '--no-mimetype', '--no-modtime', '--config', config_path, destination]
+        else:
+            cmd = ['rclone', 'link', '--config', config_path, destination]
+        res, err, code = await cmd_exec(cmd)
+        if code == 0:
+            link = f"https://drive.google.com/uc?id={loads(res)['ID']}&export=download" if remote_type == 'drive' else res
+        else:
+            if code != -9:
+                LOGGER.error(f'while getting link. Path: {destination} | Stderr: {err}')
+            link = ''
+        return link, self.name, destination
+
+    async def upload(self):
+        mime_type = self.__source.mime_type
+        try:
+            if self.__listener.upPath == 'gd':
+                link, name, destination = await self.__to_drive(mime_type)
+            else:
+                link, name, destination = await self.__to_rclone()
+        except Exception as err:
+            if self.__is_cancelled:
+                return
+            if isinstance(err, RetryError):
+                err = err.last_attempt.exception()
+            LOGGER.error(f"Stream Mirror Error: {err}")
+            await self.__listener.onUploadError(str(err).replace('>', '').replace('<', ''))
+            return
+        finally:
+            await self.__source.close()
+        if self.__is_cancelled:
+            return
+        LOGGER.info(f"Stream Done: {name}")
+        await self.__listener.onUploadComplete(link, self.__processed_bytes, 1, 0, mime_type, name, destination)
+
+    async def cancel_download(self):
+        self.__is_cancelled = True
+        LOGGER.info(f"Cancelling Stream: {self.name}")
+        if self.__proc is not None:
+            try:
+                self.__proc.kill()
+            except:
+                pass
+        await self.__source.close()
+        await self.__listener.onUploadError('Stream stopped by user!')
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+from array import array
+from time import monotonic
+from asyncio import Lock, sleep, gather, Semaphore
+from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated
+
+from bot import LOGGER
+
+BC_MAX_RATE = 25
+BC_MIN_RATE = 1
+BC_CONCURRENCY = 30
+BC_CHUNK_SIZE = 300
+
+
+class TokenBucket:
+    def __init__(self, rate=BC_MAX_RATE, capacity=BC_MAX_RATE, min_rate=BC_MIN_RATE, max_rate=BC_MAX_RATE):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.__tokens = capacity
+        self.__last = monotonic()
+        self.__paused_until = 0
+        self.__streak = 0
+        self.__lock = Lock()
+
+    def __refill(self, now):
+        self.__tokens = min(self.capacity, self.__tokens + (now - self.__last) * self.rate)
+        self.__last = now
+
+    async def acquire(self):
+        async with self.__lock:
+            while True:
+                now = monotonic()
+                if now < self.__paused_until:
+                    await sleep(self.__paused_until - now)
+                    continue
+                self.__refill(now)
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                await sleep((1 - self.__tokens) / self.rate)
+
+    def on_success(self):
+        self.__streak += 1
+        if self.__streak >= self.rate * 10 and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + 1)
+            self.__streak = 0
+
+    def on_flood(self, wait):
+        # Sends already in flight hit the same FloodWait, only the first one of the episode lowers the rate
+        now = monotonic()
+        if now >= self.__paused_until:
+            self.__streak = 0
+            self.rate = max(self.min_rate, self.rate / 2)
+            LOGGER.warning(f"Broadcast FloodWait: {wait}s, rate lowered to {self.rate:.2f} msg/s")
+        self.__tokens = 0
+        self.__paused_until = max(self.__paused_until, now + wait)
+
+
+class BroadcastStats:
+    def __init__(self):
+        self.total = 0
+        self.success = 0
+        self.blocked = 0
+        self.deleted = 0
+        self.unsuccess = 0
+
+
+class Broadcaster:
+    def __init__(self, action, bucket=None, concurrency=BC_CONCURRENCY, chunk_size=BC_CHUNK_SIZE, max_retries=3):
+        self.__action = action
+        self.__bucket = bucket or TokenBucket()
+        self.__sem = Semaphore(concurrency)
+        self.__chunk_size = chunk_size
+        self.__max_retries = max_retries
+        self.stats = BroadcastStats()
+        self.results = []
+        self.dead_uids = []
+
+    async def __send(self, item):
+        async with self.__sem:
+            for _ in range(self.__max_retries):
+                await self.__bucket.acquire()
+                try:
+                    result = await self.__action(item)
+                except FloodWait as f:
+                    self.__bucket.on_flood(f.value)
+                    continue
+                except UserIsBlocked:
+                    self.stats.blocked += 1
+                    self.dead_uids.append(item)
+                    return
+                except InputUserDeactivated:
+                    self.stats.deleted += 1
+                    self.dead_uids.append(item)
+                    return
+                except Exception:
+                    break
+                self.__bucket.on_success()
+                self.stats.success += 1
+                if result:
+                    self.results.append(result)
+                return
+            self.stats.unsuccess += 1
+
+    async def run(self, items, on_chunk=None):
+        for i in range(0, len(items), self.__chunk_size):
+            chunk = items[i:i + self.__chunk_size]
+            await gather(*(self.__send(item) for item in chunk))
+            self.stats.total += len(chunk)
+            if on_chunk:
+                await on_chunk(chunk[-1], self)
+            self.results.clear()
+        return self.stats
+
+
+def pack_msg_ids(pairs):
+    chat_ids, msg_ids = array('q'), array('q')
+    for chat_id, msg_id in pairs:
+        chat_ids.append(chat_id)
+        msg_ids.append(msg_id)
+    return chat_ids.tobytes(), msg_ids.tobytes()
+
+
+def unpack_msg_ids(chat_ids, msg_ids):
+    cids, mids = array('q'), array('q')
+    cids.frombytes(chat_ids)
+    mids.frombytes(msg_ids)
+    return list(zip(cids, mids))
@@ -1,20 +1,20 @@
 #!/usr/bin/env python3
 from traceback import format_exc
-from asyncio import sleep
+from asyncio import sleep, gather
 from aiofiles.os import remove as aioremove
 from random import choice as rchoice
 from time import time
 from re import match as re_match
 from cryptography.fernet import InvalidToken
 
-from pyrogram import Client
 from pyrogram.enums import ParseMode
 from pyrogram.types import InputMediaPhoto
 from pyrogram.errors import ReplyMarkupInvalid, FloodWait, PeerIdInvalid, ChannelInvalid, RPCError, UserNotParticipant, MessageNotModified, MessageEmpty, PhotoInvalidDimensions, WebpageCurlFailed, MediaEmpty
 
 from bot import config_dict, user_data, categories_dict, bot_cache, LOGGER, bot_name, status_reply_dict, status_reply_dict_lock, Interval, bot, user, download_dict_lock
-from bot.helper.ext_utils.bot_utils import get_readable_message, setInterval, sync_to_async, download_image_url, fetch_user_tds, fetch_user_dumps, new_thread
+from bot.helper.ext_utils.bot_utils import get_readable_message, get_readable_messages, setInterval, sync_to_async, download_image_url, fetch_user_tds, fetch_user_dumps, new_thread
 from bot.helper.telegram_helper.button_build import ButtonMaker
+from bot.helper.telegram_helper.session_pool import user_sessions
 from bot.helper.ext_utils.exceptions import TgLinkException
 
 
@@ -266,7 +266,7 @@ async def get_tg_link_content(link, user_id, decrypter=None):
         if decrypter is None:
             return None, ""
         try:
-            async with Client(user_id, session_string=decrypter.decrypt(user_sess).decode(), in_memory=True, no_updates=True) as usession:
+            async with user_sessions.session(user_id, decrypter.decrypt(user_sess).decode()) as usession:
                 user_message = await usession.get_messages(chat_id=chat, message_ids=msg_id)
         except InvalidToken:
             raise TgLinkException("Provided Decryption Key is Invalid, Recheck & Retry")
@@ -282,30 +282,80 @@ async def get_tg_link_content(link, user_id, decrypter=None):
         raise TgLinkException("Bot can't download from GROUPS without joining!, Set your Own Session to get access !")
 
 
+TG_RANGE_REGEX = r"(https:\/\/(?:t\.me|telegram\.me|telegram\.dog|telegram\.space)\/(?:c\/)?[^\/]+(?:\/[^\/]+)?)\/([0-9]+)-([0-9]+)\/?$"
+
+
+def is_tg_link_range(link):
+    return bool(re_match(TG_RANGE_REGEX, link))
+
+
+async def get_tg_link_range_content(link, user_id, decrypter=None):
+    rng = re_match(TG_RANGE_REGEX, link)
+    base, start, end = rng.group(1), int(rng.group(2)), int(rng.group(3))
+    if start > end:
+        start, end = end, start
+    first, session = await get_tg_link_content(f'{base}/{start}', user_id, decrypter)
+    if first is None and session == "":
+        return [], ""
+    msg_ids = list(range(start, end + 1))
+    messages = []
+
+    async def fetch_batches(client):
+        for i in range(0, len(msg_ids), 200):
+            messages.extend(await client.get_messages(chat_id=first.chat.id, message_ids=msg_ids[i:i+200]))
+
+    if session == 'user_sess':
+        user_sess = user_data.get(user_id, {}).get('usess', '')
+        async with user_sessions.session(user_id, decrypter.decrypt(user_sess).decode()) as usession:
+            await fetch_batches(usession)
+    else:
+        await fetch_batches(user if session == 'user' else bot)
+    return [(f'{base}/{msg.id}', msg) for msg in messages if not msg.empty and msg.media], session
+
+
+STATUS_EDIT_GAP = 3
+status_editing = set()
+
+
 async def update_all_messages(force=False):
     async with status_reply_dict_lock:
-        if not status_reply_dict or not Interval or (not force and time() - list(status_reply_dict.values())[0][1] < 3):
+        if not status_reply_dict or not Interval:
             return
-        for chat_id in list(status_reply_dict.keys()):
-            status_reply_dict[chat_id][1] = time()
-    async with download_dict_lock:
-        msg, buttons = await sync_to_async(get_readable_message)
-    if msg is None:
+        now = time()
+        chats = [chat_id for chat_id, data in status_reply_dict.items() if data and chat_id not in status_editing
+                 and (force or now - data[1] >= STATUS_EDIT_GAP)]
+        for chat_id in chats:
+            status_reply_dict[chat_id][1] = now
+    if not chats:
         return
+    async with download_dict_lock:
+        rendered = await sync_to_async(get_readable_messages, chats)
     async with status_reply_dict_lock:
-        for chat_id in list(status_reply_dict.keys()):
-            if status_reply_dict[chat_id] and msg != status_reply_dict[chat_id][0].text:
-                rmsg = await editMessage(status_reply_dict[chat_id][0], msg, buttons, 'IMAGES')
-                if isinstance(rmsg, str) and rmsg.startswith('Telegram says: [400'):
-                    del status_reply_dict[chat_id]
-                    continue
-                status_reply_dict[chat_id][0].text = msg
-                status_reply_dict[chat_id][1] = time()
+        jobs = []
+        for chat_id in chats:
+            msg, buttons = rendered[chat_id]
+            if msg is None or not (data := status_reply_dict.get(chat_id)) or msg == data[0].text:
+                continue
+            jobs.append((chat_id, data[0], msg, buttons))
+            status_editing.add(chat_id)
+    try:
+        results = await gather(*(editMessage(message, msg, buttons, 'IMAGES') for _, message, msg, buttons in jobs))
+    finally:
+        status_editing.difference_update(job[0] for job in jobs)
+    async with status_reply_dict_lock:
+        for (chat_id, message, msg, _), rmsg in zip(jobs, results):
+            if not (data := status_reply_dict.get(chat_id)) or data[0] is not message:
+                continue
+            if isinstance(rmsg, str) and rmsg.startswith('Telegram says: [400'):
+                del status_reply_dict[chat_id]
+                continue
+            message.text = msg
+            data[1] = time()
 
 
 async def sendStatusMessage(msg):
     async with download_dict_lock:
-        progress, buttons = await sync_to_async(get_readable_message)
+        progress, buttons = await sync_to_async(get_readable_message, msg.chat.id)
     if progress is None:
         return
     async with status_reply_dict_lock:
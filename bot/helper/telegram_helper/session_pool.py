@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+from time import time
+from hashlib import sha256
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from asyncio import Event, Lock
+from pyrogram import Client
+
+from bot import LOGGER
+from bot.helper.ext_utils.bot_utils import setInterval
+
+USESS_POOL_SIZE = 20
+USESS_IDLE_TIMEOUT = 600
+
+
+class PooledSession:
+    def __init__(self, client, digest):
+        self.client = client
+        self.digest = digest
+        self.refs = 0
+        self.detached = False
+        self.last_used = time()
+
+
+class UserSessionPool:
+    def __init__(self, max_size=USESS_POOL_SIZE, idle_timeout=USESS_IDLE_TIMEOUT):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.__sessions = OrderedDict()
+        self.__in_use = {}
+        self.__starting = {}
+        self.__lock = Lock()
+        self.__reaper = None
+
+    @staticmethod
+    async def __stop(pooled):
+        try:
+            await pooled.client.stop()
+        except Exception as e:
+            LOGGER.error(f"User Session Stop Error: {e}")
+
+    def __detach(self, user_id):
+        # Replaced or invalidated, holders keep using it and the last release stops it
+        pooled = self.__sessions.pop(user_id)
+        if pooled.refs == 0:
+            self.__in_use.pop(pooled.client, None)
+            return [pooled]
+        pooled.detached = True
+        return []
+
+    async def acquire(self, user_id, session_string):
+        digest = sha256(session_string.encode()).hexdigest()
+        while True:
+            to_stop = []
+            async with self.__lock:
+                if self.__reaper is None:
+                    self.__reaper = setInterval(60, self.__evict_idle)
+                pooled = self.__sessions.get(user_id)
+                if pooled and (pooled.digest != digest or not pooled.client.is_connected):
+                    to_stop = self.__detach(user_id)
+                    pooled = None
+                if pooled is not None:
+                    pooled.refs += 1
+                    pooled.last_used = time()
+                    self.__sessions.move_to_end(user_id)
+                    return pooled.client
+                starting = self.__starting.get(user_id)
+                if starting is None:
+                    self.__starting[user_id] = Event()
+            for old in to_stop:
+                await self.__stop(old)
+            if starting is not None:
+                # Another task is logging this user in, use its client once it is up
+                await starting.wait()
+                continue
+            break
+        # Login outside the lock, a slow one must not hold up other users
+        client = Client(str(user_id), session_string=session_string, in_memory=True, no_updates=True,
+                        max_concurrent_transmissions=1000)
+        try:
+            await client.start()
+        except Exception:
+            async with self.__lock:
+                self.__starting.pop(user_id).set()
+            raise
+        async with self.__lock:
+            pooled = PooledSession(client, digest)
+            pooled.refs = 1
+            self.__sessions[user_id] = pooled
+            self.__in_use[client] = pooled
+            self.__starting.pop(user_id).set()
+            to_stop = self.__evict_overflow()
+        for old in to_stop:
+            await self.__stop(old)
+        return client
+
+    async def release(self, user_id, client):
+        async with self.__lock:
+            if (pooled := self.__in_use.get(client)) is None:
+                return
+            pooled.refs -= 1
+            pooled.last_used = time()
+            if not pooled.detached or pooled.refs > 0:
+                return
+            del self.__in_use[client]
+        await self.__stop(pooled)
+
+    @asynccontextmanager
+    async def session(self, user_id, session_string):
+        client = await self.acquire(user_id, session_string)
+        try:
+            yield client
+        finally:
+            await self.release(user_id, client)
+
+    async def invalidate(self, user_id):
+        async with self.__lock:
+            to_stop = self.__detach(user_id) if user_id in self.__sessions else []
+        for pooled in to_stop:
+            await self.__stop(pooled)
+
+    def __evict_overflow(self):
+        to_stop = []
+        for user_id in list(self.__sessions):
+            if len(self.__sessions) <= self.max_size:
+                break
+            if (pooled := self.__sessions[user_id]).refs == 0:
+                del self.__sessions[user_id]
+                self.__in_use.pop(pooled.client, None)
+                to_stop.append(pooled)
+        return to_stop
+
+    async def __evict_idle(self):
+        to_stop = []
+        async with self.__lock:
+            for user_id, pooled in list(self.__sessions.items()):
+                if pooled.refs == 0 and time() - pooled.last_used > self.idle_timeout:
+                    del self.__sessions[user_id]
+                    self.__in_use.pop(pooled.client, None)
+                    to_stop.append(pooled)
+        for pooled in to_stop:
+            await self.__stop(pooled)
+
+
+user_sessions = UserSessionPool()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 from os import listdir
+from functools import lru_cache
 from importlib import import_module
 from random import choice as rchoice
 from bot import config_dict, LOGGER
@@ -10,20 +11,39 @@ for theme in listdir('bot/helper/themes'):
     if theme.startswith('wzml_') and theme.endswith('.py'):
         AVL_THEMES[theme[5:-3]] = import_module(f'bot.helper.themes.{theme[:-3]}')
 
-def BotTheme(var_name, **format_vars):
-    text = None
-    theme_ = config_dict['BOT_THEME']
 
-    if theme_ in AVL_THEMES:
-        text = getattr(AVL_THEMES[theme_].WZMLStyle(), var_name, None)
-        if text is None:
-            LOGGER.error(f"{var_name} not Found in {theme_}. Please recheck with Official Repo")
+def compile_theme(module):
+    return {k: v for k, v in vars(module.WZMLStyle).items() if not k.startswith('__') and isinstance(v, str)}
+
+
+MINIMAL_VARS = compile_theme(wzml_minimal)
+COMPILED_THEMES = {}
+for name, module in AVL_THEMES.items():
+    style = compile_theme(module)
+    if missing := MINIMAL_VARS.keys() - style.keys():
+        LOGGER.error(f"{', '.join(sorted(missing))} not Found in {name}. Please recheck with Official Repo")
+    COMPILED_THEMES[name] = {**MINIMAL_VARS, **style}
+
+
+def get_theme_vars():
+    theme_ = config_dict['BOT_THEME']
+    if theme_ in COMPILED_THEMES:
+        return theme_, COMPILED_THEMES[theme_]
     elif theme_ == 'random':
-        rantheme = rchoice(list(AVL_THEMES.values()))
+        rantheme = rchoice(list(COMPILED_THEMES))
         LOGGER.info(f"Random Theme Chosen: {rantheme}")
-        text = getattr(rantheme.WZMLStyle(), var_name, None)
-        
-    if text is None:
-        text = getattr(wzml_minimal.WZMLStyle(), var_name)
+        return rantheme, COMPILED_THEMES[rantheme]
+    return 'minimal', MINIMAL_VARS
+
+
+def BotTheme(var_name, **format_vars):
+    return get_theme_vars()[1][var_name].format_map(format_vars)
+
+
+@lru_cache(maxsize=256)
+def compile_block(theme_, parts):
+    return ''.join(COMPILED_THEMES.get(theme_, MINIMAL_VARS)[part] for part in parts)
+
 
-    return text.format_map(format_vars)
+def BotBlock(parts, **format_vars):
+    return compile_block(get_theme_vars()[0], parts).format_map(format_vars)
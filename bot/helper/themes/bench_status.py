@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# Times one progress task block, per-part BotTheme calls against one BotBlock format:
+# python3 bot/helper/themes/bench_status.py [loops]
+from importlib.util import spec_from_file_location, module_from_spec
+from os import path as ospath
+from string import Formatter
+from sys import argv
+from timeit import timeit
+
+spec = spec_from_file_location('wzml_minimal', ospath.join(ospath.dirname(ospath.abspath(__file__)), 'wzml_minimal.py'))
+wzml_minimal = module_from_spec(spec)
+spec.loader.exec_module(wzml_minimal)
+
+# Same parts as PROGRESS_BLOCK + SEEDERS_BLOCK + USER_BLOCK + BTSEL_BLOCK + CANCEL_BLOCK in bot_utils.py
+PARTS = ('STATUS_NAME', 'BAR', 'PROCESSED', 'STATUS', 'ETA', 'SPEED', 'ELAPSED', 'ENGINE', 'STA_MODE',
+         'SEEDERS', 'LEECHERS', 'USER', 'ID', 'BTSEL', 'CANCEL')
+THEME = {k: v for k, v in vars(wzml_minimal.WZMLStyle).items() if not k.startswith('__') and isinstance(v, str)}
+FIELDS = {field for part in PARTS for _, field, _, _ in Formatter().parse(THEME[part]) if field}
+VARS = {field: f'<{field}>' for field in FIELDS}
+
+
+def theme_chain():
+    # BotTheme before precompiling: a WZMLStyle instance and a getattr per part
+    return ''.join(getattr(wzml_minimal.WZMLStyle(), part).format_map(VARS) for part in PARTS)
+
+
+BLOCK = ''.join(THEME[part] for part in PARTS)
+
+
+def bot_block():
+    return BLOCK.format_map(VARS)
+
+
+def main(loops=100000):
+    assert theme_chain() == bot_block()
+    for name, func in (('BotTheme chain', theme_chain), ('BotBlock', bot_block)):
+        print(f'{name}: {timeit(func, number=loops) / loops * 1e6:.1f} us per task')
+
+
+if __name__ == '__main__':
+    main(int(argv[1]) if len(argv) > 1 else 100000)
@@ -114,6 +114,14 @@ class WZMLStyle:
 ┠ <b>TimeZone:</b> {timz}
 ┖ <b>Version:</b> {version}'''
     RESTARTED = '''⌬ <b><i>Bot Restarted!</i></b>'''
+    UPLOAD_INTERRUPTED = '''⌬ <b><i>Upload Interrupted by Restart!</i></b>
+
+┎ <b>Name:</b> <code>{name}</code>
+┖ <b>Task For:</b> {tag}
+
+<i>Downloaded data was kept, resume the upload from where it stopped?</i>'''
+    RESUME_BT = 'Resume'
+    DISCARD_BT = 'Discard'
     # ---------------------
 
     # async def ping(client, message): ---> __main__.py
@@ -226,6 +234,11 @@ class WZMLStyle:
     STOP_DUPLICATE = 'File/Folder is already available in Drive.\nHere are {content} list results:'
     # ---------------------
 
+    # async def start_from_queued(): ---> task_manager.py
+    QUEUE_HELD_DISK = '<b>Task Held:</b> Not enough free disk for <code>{size}</code>, it will start once space frees up or be cancelled after {timeout}.'
+    QUEUE_HOLD_TIMEOUT = 'Not enough free disk for <code>{size}</code> within {timeout}, task cancelled.'
+    # ---------------------
+
     # async def countNode(_, message): ----> gd_count.py
     COUNT_MSG = '<b>Counting:</b> <code>{LINK}</code>'
     COUNT_NAME = '<b><i>{COUNT_NAME}</i></b>\n┃\n'
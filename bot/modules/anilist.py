@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-from requests import post as rpost
 from markdown import markdown
 from random import choice
 from datetime import datetime
@@ -13,6 +12,7 @@ from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.message_utils import sendMessage, editMessage
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.ext_utils.bot_utils import get_readable_time
+from bot.helper.ext_utils.meta_lookup import meta_lookup
 from pyrogram.handlers import MessageHandler, CallbackQueryHandler
 from pyrogram.filters import command, regex
 
@@ -196,6 +196,12 @@ query ($id: Int,$search: String) {
 url = 'https://graphql.anilist.co'
 sptext = ""
 
+
+async def anilist_query(query, variables, field, name):
+    key = f"anilist:{name}:" + '&'.join(f"{k}={v}" for k, v in sorted(variables.items()))
+    if resp := await meta_lookup.post_json(url, {'query': query, 'variables': variables}, key):
+        return (resp.get('data') or {}).get(field)
+
 async def anilist(_, msg, aniid=None, u_id=None):
     if not aniid:
         user_id = msg.from_user.id
@@ -207,13 +213,7 @@ async def anilist(_, msg, aniid=None, u_id=None):
     else:
         user_id = int(u_id)
         vars = {'id' : aniid}
-    if (
-        animeResp := rpost(
-            url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': vars}
-        )
-        .json()['data']
-        .get('Media', None)
-    ):
+    if animeResp := await anilist_query(ANIME_GRAPHQL_QUERY, vars, 'Media', 'anime'):
         ro_title = animeResp['title']['romaji']
         na_title = animeResp['title']['native']
         en_title = animeResp['title']['english']
@@ -305,32 +305,32 @@ async def setAnimeButtons(client, query):
         return
     await query.answer()
     if data[2] == "tags":
-        aniTag = rpost(url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': {'id' : siteid}}).json()['data'].get('Media', None)
+        aniTag = await anilist_query(ANIME_GRAPHQL_QUERY, {'id' : siteid}, 'Media', 'anime')
         msg = "<b>Tags :</b>\n\n" + "\n".join(
             f"""<a href="https://anilist.co/search/anime?genres={q(x['name'])}">{x['name']}</a> {x['rank']}%"""
             for x in aniTag['tags']
         )
     elif data[2] == "sts":
-        links = rpost(url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': {'id' : siteid}}).json()['data'].get('Media', None)
+        links = await anilist_query(ANIME_GRAPHQL_QUERY, {'id' : siteid}, 'Media', 'anime')
         msg = "<b>External & Streaming Links :</b>\n\n" + "\n".join(
             f"""<a href="{x['url']}">{x['site']}</a>"""
             for x in links['externalLinks']
         )
     elif data[2] == "rev":
-        animeResp = rpost(url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': {'id' : siteid}}).json()['data'].get('Media', None)
+        animeResp = await anilist_query(ANIME_GRAPHQL_QUERY, {'id' : siteid}, 'Media', 'anime')
         reList = animeResp['reviews']['nodes']
         msg = "<b>Reviews :</b>\n\n" + "\n\n".join(
             f"""<a href="{x['siteUrl']}">{x['summary']}</a>\n<b>Score :</b> <code>{x['score']} / 100</code>\n<i>By {x['user']['name']}</i>"""
             for x in reList[:8]
         )
     elif data[2] == "rel":
-        animeResp = rpost(url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': {'id' : siteid}}).json()['data'].get('Media', None)
+        animeResp = await anilist_query(ANIME_GRAPHQL_QUERY, {'id' : siteid}, 'Media', 'anime')
         msg = "<b>Relations :</b>\n\n" + "\n\n".join(
             f"""<a href="{x['node']['siteUrl']}">{x['node']['title']['english']}</a> ({x['node']['title']['romaji']})\n<b>Format</b>: <code>{x['node']['format'].capitalize()}</code>\n<b>Status</b>: <code>{x['node']['status'].capitalize()}</code>\n<b>Average Score</b>: <code>{x['node']['averageScore']}%</code>\n<b>Source</b>: <code>{x['node']['source'].capitalize()}</code>\n<b>Relation Type</b>: <code>{x.get('relationType', 'N/A').capitalize()}</code>"""
             for x in animeResp['relations']['edges']
         )
     elif data[2] == "cha":
-        animeResp = rpost(url, json={'query': ANIME_GRAPHQL_QUERY, 'variables': {'id' : siteid}}).json()['data'].get('Media', None)
+        animeResp = await anilist_query(ANIME_GRAPHQL_QUERY, {'id' : siteid}, 'Media', 'anime')
         msg = "<b>List of Characters :</b>\n\n" + "\n\n".join(
             f"""• <a href="{x['node']['siteUrl']}">{x['node']['name']['full']}</a> ({x['node']['name']['native']})\n<b>Role :</b> {x['role'].capitalize()}"""
             for x in (animeResp['characters']['edges'])[:8]
@@ -356,11 +356,7 @@ async def character(_, message, aniid=None, u_id=None):
     else:
         vars = {'id': aniid}
         user_id = int(u_id)
-    if (
-        json := rpost(url, json={'query': character_query, 'variables': vars})
-        .json()['data']
-        .get('Character', None)
-    ):
+    if json := await anilist_query(character_query, vars, 'Character', 'character'):
         msg = f"<b>{json.get('name').get('full')}</b> (<code>{json.get('name').get('native')}</code>)\n\n"
         description = json['description']
         site_url = json.get('siteUrl')
@@ -413,7 +409,7 @@ async def manga(_, message):
         return
     search = search[1]
     variables = {'search': search}
-    json = rpost(url, json={'query': manga_query, 'variables': variables}).json()['data'].get('Media', None)
+    json = await anilist_query(manga_query, variables, 'Media', 'manga')
     msg = ''
     if json:
         title, title_native = json['title'].get('romaji', False), json['title'].get('native', False)
@@ -25,6 +25,7 @@ from bot.helper.ext_utils.task_manager import start_from_queued
 from bot.helper.ext_utils.help_messages import default_desp
 from bot.helper.mirror_utils.rclone_utils.serve import rclone_serve_booter
 from bot.modules.torrent_search import initiate_search_tools
+from web.wserver import serve_selector
 from bot.modules.rss import addJob
 from bot.helper.themes import AVL_THEMES
 
@@ -49,7 +50,7 @@ default_values = {'AUTO_DELETE_MESSAGE_DURATION': 30,
                   }
 bool_vars = ['AS_DOCUMENT', 'BOT_PM', 'STOP_DUPLICATE', 'SET_COMMANDS', 'SAVE_MSG', 'SHOW_MEDIAINFO', 'SOURCE_LINK', 'SAFE_MODE', 'SHOW_EXTRA_CMDS',
              'IS_TEAM_DRIVE', 'USE_SERVICE_ACCOUNTS', 'WEB_PINCODE', 'EQUAL_SPLITS', 'DISABLE_DRIVE_LINK', 'DELETE_LINKS', 'CLEAN_LOG_MSG', 'USER_TD_MODE', 
-             'INCOMPLETE_TASK_NOTIFIER', 'UPGRADE_PACKAGES', 'SCREENSHOTS_MODE']
+             'INCOMPLETE_TASK_NOTIFIER', 'UPGRADE_PACKAGES', 'SCREENSHOTS_MODE', 'QUEUE_DOWNLOAD_BURST']
 
 
 async def load_config():
@@ -275,6 +276,9 @@ async def load_config():
     QUEUE_DOWNLOAD = environ.get('QUEUE_DOWNLOAD', '')
     QUEUE_DOWNLOAD = '' if len(QUEUE_DOWNLOAD) == 0 else int(QUEUE_DOWNLOAD)
 
+    QUEUE_DOWNLOAD_BURST = environ.get('QUEUE_DOWNLOAD_BURST', '')
+    QUEUE_DOWNLOAD_BURST = QUEUE_DOWNLOAD_BURST.lower() == 'true'
+
     QUEUE_UPLOAD = environ.get('QUEUE_UPLOAD', '')
     QUEUE_UPLOAD = '' if len(QUEUE_UPLOAD) == 0 else int(QUEUE_UPLOAD)
 
@@ -341,12 +345,10 @@ async def load_config():
     if len(RCLONE_SERVE_PASS) == 0:
         RCLONE_SERVE_PASS = ''
 
-    await (await create_subprocess_exec("pkill", "-9", "-f", "gunicorn")).wait()
     BASE_URL = environ.get('BASE_URL', '').rstrip("/")
     if len(BASE_URL) == 0:
         BASE_URL = ''
-    else:
-        await create_subprocess_shell(f"gunicorn web.wserver:app --bind 0.0.0.0:{BASE_URL_PORT} --worker-class gevent")
+    await serve_selector(BASE_URL_PORT if BASE_URL else None)
 
     UPSTREAM_REPO = environ.get('UPSTREAM_REPO', '')
     if len(UPSTREAM_REPO) == 0:
@@ -659,6 +661,7 @@ async def load_config():
                         'OWNER_ID': OWNER_ID,
                         'QUEUE_ALL': QUEUE_ALL,
                         'QUEUE_DOWNLOAD': QUEUE_DOWNLOAD,
+                        'QUEUE_DOWNLOAD_BURST': QUEUE_DOWNLOAD_BURST,
                         'QUEUE_UPLOAD': QUEUE_UPLOAD,
                         'RCLONE_FLAGS': RCLONE_FLAGS,
                         'RCLONE_PATH': RCLONE_PATH,
@@ -844,11 +847,13 @@ async def edit_variable(_, message, pre_message, key):
         value = value.strip().lower()
         if value not in ['b', 'i', 'u', 's', 'spoiler', 'code']:
             value = 'code'
+    elif key == 'BASE_URL':
+        value = value.rstrip('/')
+        await serve_selector(config_dict['BASE_URL_PORT'])
     elif key == 'BASE_URL_PORT':
         value = int(value)
         if config_dict['BASE_URL']:
-            await (await create_subprocess_exec("pkill", "-9", "-f", "gunicorn")).wait()
-            await create_subprocess_shell(f"gunicorn web.wserver:app --bind 0.0.0.0:{value} --worker-class gevent")
+            await serve_selector(value)
     elif key == 'EXTENSION_FILTER':
         fx = value.split()
         GLOBAL_EXTENSION_FILTER.clear()
@@ -1103,12 +1108,11 @@ async def edit_bot_settings(client, query):
             if DATABASE_URL:
                 await DbManger().update_aria2('bt-stop-timeout', '0')
         elif data[2] == 'BASE_URL':
-            await (await create_subprocess_exec("pkill", "-9", "-f", "gunicorn")).wait()
+            await serve_selector()
         elif data[2] == 'BASE_URL_PORT':
             value = 80
             if config_dict['BASE_URL']:
-                await (await create_subprocess_exec("pkill", "-9", "-f", "gunicorn")).wait()
-                await create_subprocess_shell("gunicorn web.wserver:app --bind 0.0.0.0:80 --worker-class gevent")
+                await serve_selector(80)
         elif data[2] == 'GDRIVE_ID':
             if 'Main' in list_drives_dict:
                 del list_drives_dict['Main']
@@ -1,10 +1,9 @@
 #!/usr/bin/env python3
 from time import time
 from uuid import uuid4
-from asyncio import sleep
 from pyrogram.handlers import MessageHandler
 from pyrogram.filters import command
-from pyrogram.errors import FloodWait, UserIsBlocked, InputUserDeactivated
+from pyrogram.types import InputMediaPhoto, InputMediaVideo, InputMediaDocument, InputMediaAudio, InputMediaAnimation
 
 from bot import bot, LOGGER, DATABASE_URL
 from bot.helper.ext_utils.db_handler import DbManger
@@ -12,21 +11,29 @@ from bot.helper.telegram_helper.message_utils import sendMessage, editMessage
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.button_build import ButtonMaker
+from bot.helper.telegram_helper.broadcast_utils import Broadcaster, pack_msg_ids, unpack_msg_ids
 from bot.helper.ext_utils.bot_utils import new_task, get_readable_time
 
-bc_cache = {}
+INPUT_MEDIA = {'photo': InputMediaPhoto, 'video': InputMediaVideo, 'document': InputMediaDocument,
+               'audio': InputMediaAudio, 'animation': InputMediaAnimation}
 
 @new_task
 async def broadcast(_, message):
-    bc_id, forwarded, quietly, deleted, edited = '', False, False, False, False
+    bc_id, forwarded, quietly, deleted, edited, resumed = '', False, False, False, False, False
+    checkpoint = None
     if not DATABASE_URL:
         return await sendMessage(message, 'DATABASE_URL not provided!')
     rply = message.reply_to_message
     if len(message.command) > 1:
         if not message.command[1].startswith('-'):
-            bc_id = message.command[1] if bc_cache.get(message.command[1], False) else ''
-            if not bc_id:
-                return await sendMessage(message, "<i>Broadcast ID not found! After Restart, you can't edit or delete broadcasted messages...</i>")
+            checkpoint = await DbManger().get_bc_checkpoint(message.command[1])
+            if not checkpoint:
+                return await sendMessage(message, "<i>Broadcast ID not found!</i>")
+            bc_id = message.command[1]
+            if {'-r', '-resume'} & set(message.command):
+                if checkpoint.get('done'):
+                    return await sendMessage(message, "<i>Broadcast already Completed, can't Resume !</i>")
+                resumed = True
         for arg in message.command:
             if arg in ['-f', '-forward'] and rply:
                 forwarded = True
@@ -38,7 +45,7 @@ async def broadcast(_, message):
                 edited = True
     if not bc_id and not rply:
         return await sendMessage(message, '''<b>By replying to msg to Broadcast:</b>
-/broadcast bc_id -d -e -f -q
+/broadcast bc_id -d -e -f -q -r
 
 <b>Forward Broadcast with Tag:</b> -f or -forward
 /cmd [reply_msg] -f
@@ -52,48 +59,53 @@ async def broadcast(_, message):
 <b>Delete Broadcast msg:</b> -d or -delete
 /bc broadcast_id -d
 
+<b>Resume Interrupted Broadcast:</b> -r or -resume
+/bc broadcast_id -r
+
 <b>Notes:</b>
-1. Broadcast msgs can be only edited or deleted until restart.
+1. Broadcast msgs are stored in Database, so they can be edited or deleted even after restart.
 2. Forwarded msgs can't be Edited''')
     t, s, b, d, u = 0, 0, 0, 0, 0
-    if deleted:
-        temp_wait = await sendMessage(message, '<i>Deleting the Broadcasted Message! Please Wait ...</i>')
-        for msg in (msgs:=bc_cache[bc_id]):
-            try:
-                await msg.delete()
-                await sleep(0.5)
-                msgs.pop(msgs.index(msg))
-                s += 1
-            except:
-                u += 1
-            t += 1
-        return await editMessage(temp_wait, f'''⌬  <b><i>Broadcast Deleted Stats :</i></b>
-┠ <b>Total Users:</b> <code>{t}</code>
-┠ <b>Success:</b> <code>{s}</code>
-┖ <b>Unsuccess Attempt:</b> <code>{u}</code>
+    if deleted or edited:
+        if edited and checkpoint.get('forwarded'):
+            return await sendMessage(message, "<i>Forwarded Messages can't be Edited, Only can be Deleted !</i>")
+        temp_wait = await sendMessage(message, f"<i>{'Deleting' if deleted else 'Editing'} the Broadcasted Message! Please Wait ...</i>")
 
-<b>Broadcast ID:</b> <code>{bc_id}</code>''')
-    elif edited:
-        temp_wait = await sendMessage(message, '<i>Editing the Broadcasted Message! Please Wait ...</i>')
-        for msg in bc_cache[bc_id]:
-            if hasattr(msg, "forward_from"):
-                return await editMessage(temp_wait, "<i>Forwarded Messages can't be Edited, Only can be Deleted !</i>")
-            try:
-                await msg.edit(text=rply.text, entities=rply.entities, reply_markup=rply.reply_markup)
-                await sleep(0.5)
-                s += 1
-            except FloodWait as e:
-                await sleep(e.value)
-                await msg.edit(text=rply.text, entities=rply.entities, reply_markup=rply.reply_markup)
-            except Exception:
-                u += 1
-            t += 1
-        return await editMessage(temp_wait, f'''⌬  <b><i>Broadcast Edited Stats :</i></b>
-┠ <b>Total Users:</b> <code>{t}</code>
-┠ <b>Success:</b> <code>{s}</code>
-┖ <b>Unsuccess Attempt:</b> <code>{u}</code>
+        async def del_bc(ids):
+            return await bot.delete_messages(*ids)
+
+        async def edit_bc(ids):
+            if not rply.media:
+                return await bot.edit_message_text(*ids, text=rply.text, entities=rply.entities, reply_markup=rply.reply_markup)
+            if (media_type := rply.media.value) in INPUT_MEDIA:
+                media = INPUT_MEDIA[media_type](getattr(rply, media_type).file_id, caption=rply.caption or '', caption_entities=rply.caption_entities)
+                return await bot.edit_message_media(*ids, media=media, reply_markup=rply.reply_markup)
+            return await bot.edit_message_caption(*ids, caption=rply.caption or '', caption_entities=rply.caption_entities, reply_markup=rply.reply_markup)
+
+        engine = Broadcaster(del_bc if deleted else edit_bc)
+        async for chat_ids, msg_ids in DbManger().iter_bc_msgs(bc_id):
+            await engine.run(unpack_msg_ids(chat_ids, msg_ids))
+        if deleted:
+            await DbManger().rm_bc_checkpoint(bc_id)
+        return await editMessage(temp_wait, f'''⌬  <b><i>Broadcast {'Deleted' if deleted else 'Edited'} Stats :</i></b>
+┠ <b>Total Users:</b> <code>{engine.stats.total}</code>
+┠ <b>Success:</b> <code>{engine.stats.success}</code>
+┖ <b>Unsuccess Attempt:</b> <code>{engine.stats.unsuccess + engine.stats.blocked + engine.stats.deleted}</code>
 
 <b>Broadcast ID:</b> <code>{bc_id}</code>''')
+    if resumed:
+        bc_hash = bc_id
+        rply = await bot.get_messages(checkpoint['chat_id'], checkpoint['msg_id'])
+        if not rply or rply.empty:
+            return await sendMessage(message, "<i>Original Broadcast message not found, can't Resume !</i>")
+        forwarded, quietly = checkpoint['forwarded'], checkpoint['quietly']
+        t, s, b, d, u = checkpoint['stats']
+        uids = await DbManger().get_pm_uids(checkpoint['last_uid'])
+    else:
+        bc_hash = str(uuid4())
+        uids = await DbManger().get_pm_uids()
+        await DbManger().save_bc_checkpoint(bc_hash, {'chat_id': rply.chat.id, 'msg_id': rply.id, 'forwarded': forwarded,
+                                                      'quietly': quietly, 'last_uid': None, 'stats': [t, s, b, d, u], 'done': False})
     start_time = time()
     status = '''⌬  <b><i>Broadcast Stats :</i></b>
 ┠ <b>Total Users:</b> <code>{t}</code>
@@ -102,41 +114,39 @@ async def broadcast(_, message):
 ┠ <b>Deleted Accounts:</b> <code>{d}</code>
 ┖ <b>Unsuccess Attempt:</b> <code>{u}</code>'''
     updater = time()
-    bc_hash, bc_msgs = str(uuid4()), []
+    base = (t, s, b, d, u)
     pls_wait = await sendMessage(message, status.format(**locals()))
-    for uid in (await DbManger().get_pm_uids()):
-        try:
-            if forwarded:
-                bc_msg = await rply.forward(uid, disable_notification=quietly)
-            else:
-                bc_msg = await rply.copy(uid, disable_notification=quietly)
-            s += 1
-        except FloodWait as e:
-            await sleep(e.value)
-            if forwarded:
-                bc_msg = await rply.forward(uid, disable_notification=quietly)
-            else:
-                bc_msg = await rply.copy(uid, disable_notification=quietly)
-            s += 1
-        except UserIsBlocked:
-            await DbManger().rm_pm_user(uid)
-            b += 1
-        except InputUserDeactivated:
-            await DbManger().rm_pm_user(uid)
-            d += 1
-        except Exception:
-            u += 1
-        if bc_msg:
-            bc_msgs.append(bc_msg)
-        t += 1
+
+    async def send_bc(uid):
+        if forwarded:
+            return await rply.forward(uid, disable_notification=quietly)
+        return await rply.copy(uid, disable_notification=quietly)
+
+    def bc_stats(engine):
+        st = engine.stats
+        return base[0] + st.total, base[1] + st.success, base[2] + st.blocked, base[3] + st.deleted, base[4] + st.unsuccess
+
+    async def on_chunk(last_uid, engine):
+        nonlocal updater
+        if engine.results:
+            await DbManger().add_bc_msgs(bc_hash, *pack_msg_ids((msg.chat.id, msg.id) for msg in engine.results))
+        if engine.dead_uids:
+            await DbManger().rm_pm_users(engine.dead_uids)
+            engine.dead_uids.clear()
+        await DbManger().save_bc_checkpoint(bc_hash, {'last_uid': last_uid, 'stats': list(bc_stats(engine))})
         if (time() - updater) > 10:
-            await editMessage(pls_wait, status.format(**locals()))
+            t, s, b, d, u = bc_stats(engine)
+            await editMessage(pls_wait, status.format(t=t, s=s, b=b, d=d, u=u))
             updater = time()
-    bc_cache[bc_hash] = bc_msgs
+
+    engine = Broadcaster(send_bc)
+    await engine.run(uids, on_chunk)
+    await DbManger().save_bc_checkpoint(bc_hash, {'done': True})
+    t, s, b, d, u = bc_stats(engine)
     await editMessage(
         pls_wait,
         f"{status.format(**locals())}\n\n<b>Elapsed Time:</b> <code>{get_readable_time(time() - start_time)}</code>\n<b>Broadcast ID:</b> <code>{bc_hash}</code>",
     )
-        
-        
+
+
 bot.add_handler(MessageHandler(broadcast, filters=command(BotCommands.BroadcastCommand) & CustomFilters.sudo))
\ No newline at end of file
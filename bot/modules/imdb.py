@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 from contextlib import suppress
+from functools import partial
 from re import findall, IGNORECASE
 from imdb import Cinemagoer
 from pycountry import countries as conn
@@ -13,7 +14,8 @@ from bot import bot, LOGGER, user_data, config_dict
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.message_utils import sendMessage, editMessage
-from bot.helper.ext_utils.bot_utils import get_readable_time
+from bot.helper.ext_utils.bot_utils import get_readable_time, sync_to_async
+from bot.helper.ext_utils.meta_lookup import meta_lookup
 from bot.helper.telegram_helper.button_build import ButtonMaker
 
 imdb = Cinemagoer()
@@ -29,23 +31,28 @@ async def imdb_search(_, message):
         buttons = ButtonMaker()
         if title.lower().startswith("https://www.imdb.com/title/tt"):
             movieid = title.replace("https://www.imdb.com/title/tt", "")
-            if movie := imdb.get_movie(movieid):
+            if movie := await get_poster(movieid, id=True):
                 buttons.ibutton(f"🎬 {movie.get('title')} ({movie.get('year')})", f"imdb {user_id} movie {movieid}")
             else:
                 return await editMessage(k, "<i>No Results Found</i>")
         else:
-            movies = get_poster(title, bulk=True)
+            movies = await get_poster(title, bulk=True)
             if not movies:
-                return editMessage("<i>No Results Found</i>, Try Again or Use <b>Title ID</b>", k)
+                return await editMessage(k, "<i>No Results Found</i>, Try Again or Use <b>Title ID</b>")
             for movie in movies: # Refurbished Soon !!
-                buttons.ibutton(f"🎬 {movie.get('title')} ({movie.get('year')})", f"imdb {user_id} movie {movie.movieID}")
+                buttons.ibutton(f"🎬 {movie.get('title')} ({movie.get('year')})", f"imdb {user_id} movie {movie['movieID']}")
         buttons.ibutton("🚫 Close 🚫", f"imdb {user_id} close")
         await editMessage(k, '<b><i>Here What I found on IMDb.com</i></b>', buttons.build_menu(1))
     else:
         await sendMessage(message, '<i>Send Movie / TV Series Name along with /imdb Command or send IMDB URL</i>')
 
 
-def get_poster(query, bulk=False, id=False, file=None):
+def search_imdb(title):
+    return [{'title': m.get('title'), 'year': m.get('year'), 'kind': m.get('kind'), 'movieID': m.movieID}
+            for m in imdb.search_movie(title, results=10)]
+
+
+async def get_poster(query, bulk=False, id=False, file=None):
     if not id:
         query = (query.strip()).lower()
         title = query
@@ -59,7 +66,7 @@ def get_poster(query, bulk=False, id=False, file=None):
                 year = list_to_str(year[:1]) 
         else:
             year = None
-        movieid = imdb.search_movie(title.lower(), results=10)
+        movieid = await meta_lookup.get(f"imdb:search:{title.lower()}", partial(sync_to_async, search_imdb, title.lower()))
         if not movieid:
             return None
         if year:
@@ -69,10 +76,15 @@ def get_poster(query, bulk=False, id=False, file=None):
         movieid = list(filter(lambda k: k.get('kind') in ['movie', 'tv series'], filtered)) or filtered
         if bulk:
             return movieid
-        movieid = movieid[0].movieID
+        movieid = movieid[0]['movieID']
     else:
         movieid = query
-    movie = imdb.get_movie(movieid)
+    return await meta_lookup.get(f"imdb:movie:{movieid}", partial(sync_to_async, fetch_imdb_movie, movieid))
+
+
+def fetch_imdb_movie(movieid):
+    if not (movie := imdb.get_movie(movieid)):
+        return None
     if movie.get("original air date"):
         date = movie["original air date"]
     elif movie.get("year"):
@@ -171,9 +183,9 @@ async def imdb_callback(_, query):
         await query.answer("Not Yours!", show_alert=True)
     elif data[2] == "movie":
         await query.answer()
-        imdb = get_poster(query=data[3], id=True)
+        imdb = dict(await get_poster(query=data[3], id=True) or {})
         buttons = []
-        if imdb['trailer']:
+        if imdb.get('trailer'):
             if isinstance(imdb['trailer'], list):
                 buttons.append([InlineKeyboardButton("▶️ IMDb Trailer ", url=str(imdb['trailer'][-1]))])
                 imdb['trailer'] = list_to_str(imdb['trailer'])
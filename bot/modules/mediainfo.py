@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 from aiohttp import ClientSession
 from re import search as re_search
-from shlex import split as ssplit
+from uuid import uuid4
+from collections import OrderedDict
 from aiofiles import open as aiopen
-from aiofiles.os import remove as aioremove, path as aiopath, mkdir
-from os import path as ospath, getcwd
+from aiofiles.os import remove as aioremove, path as aiopath, makedirs
+from os import path as ospath
 
 from pyrogram.handlers import MessageHandler 
 from pyrogram.filters import command
@@ -17,40 +18,91 @@ from bot.helper.ext_utils.bot_utils import cmd_exec
 from bot.helper.ext_utils.telegraph_helper import telegraph
 
 
+MI_HEAD_SIZE = 10 * 1024 * 1024
+MI_TAIL_SIZE = 2 * 1024 * 1024
+MI_TG_CHUNK = 1024 * 1024
+MI_CACHE_SIZE = 200
+MI_HEADERS = {"user-agent": "Mozilla/5.0 (Linux; Android 12; 2201116PI) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Mobile Safari/537.36"}
+mi_cache = OrderedDict()
+
+
+def needs_trailer(head, total):
+    # MP4/MOV keep the moov atom at the end unless faststarted
+    return total > len(head) and head[4:8] == b'ftyp' and b'moov' not in head
+
+
+async def fetch_link_parts(link):
+    async with ClientSession() as session:
+        async with session.get(link, headers={**MI_HEADERS, 'Range': f'bytes=0-{MI_HEAD_SIZE - 1}'}) as response:
+            head = b''
+            async for chunk in response.content.iter_chunked(MI_HEAD_SIZE):
+                head += chunk
+                if len(head) >= MI_HEAD_SIZE:
+                    break
+            head = head[:MI_HEAD_SIZE]
+            if response.status != 206 or not (crange := response.headers.get('Content-Range')):
+                return head, b'', len(head)
+            total = int(crange.rsplit('/', 1)[-1])
+        tail = b''
+        if needs_trailer(head, total):
+            async with session.get(link, headers={**MI_HEADERS, 'Range': f'bytes=-{MI_TAIL_SIZE}'}) as response:
+                if response.status == 206:
+                    tail = await response.read()
+    return head, tail, total
+
+
+async def fetch_media_parts(media):
+    head = b''
+    async for chunk in bot.stream_media(media, limit=MI_HEAD_SIZE // MI_TG_CHUNK):
+        head += chunk
+    tail = b''
+    if needs_trailer(head, media.file_size):
+        async for chunk in bot.stream_media(media, offset=-(MI_TAIL_SIZE // MI_TG_CHUNK)):
+            tail += chunk
+    return head, tail, media.file_size
+
+
 async def gen_mediainfo(message, link=None, media=None, mmsg=None):
     temp_send = await sendMessage(message, '<i>Generating MediaInfo...</i>')
+    cache_key = link or media.file_unique_id
+    if link_id := mi_cache.get(cache_key):
+        mi_cache.move_to_end(cache_key)
+        return await temp_send.edit(f"<b>MediaInfo:</b>\n\n➲ <b>Link :</b> https://graph.org/{link_id}", disable_web_page_preview=False)
+    des_path, tc = None, ''
     try:
-        path = "Mediainfo/"
+        # Sparse head + trailer copy on tmpfs, so nothing but the probed bytes is fetched or written to disk
+        path = "/dev/shm/Mediainfo/" if await aiopath.isdir("/dev/shm") else "Mediainfo/"
         if not await aiopath.isdir(path):
-            await mkdir(path)
+            await makedirs(path, exist_ok=True)
         if link:
             filename = re_search(".+/(.+)", link).group(1)
-            des_path = ospath.join(path, filename)
-            headers = {"user-agent":"Mozilla/5.0 (Linux; Android 12; 2201116PI) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Mobile Safari/537.36"}
-            async with ClientSession() as session:
-                async with session.get(link, headers=headers) as response:
-                    async with aiopen(des_path, "wb") as f:
-                        async for chunk in response.content.iter_chunked(10000000):
-                            await f.write(chunk)
-                            break
+            head, tail, total = await fetch_link_parts(link)
         elif media:
-            des_path = ospath.join(path, media.file_name)
-            if media.file_size <= 50000000:
-                await mmsg.download(ospath.join(getcwd(), des_path))
-            else:
-                async for chunk in bot.stream_media(media, limit=5):
-                    async with aiopen(des_path, "ab") as f:
-                        await f.write(chunk)
-        stdout, _, _ = await cmd_exec(ssplit(f'mediainfo "{des_path}"'))
-        tc = f"<h4>📌 {ospath.basename(des_path)}</h4><br><br>"
+            filename = media.file_name or media.file_unique_id
+            head, tail, total = await fetch_media_parts(media)
+        des_path = ospath.join(path, f"{uuid4().hex[:8]}_{ospath.basename(filename)}")
+        async with aiopen(des_path, "wb") as f:
+            await f.write(head)
+            if tail:
+                await f.seek(total - len(tail))
+                await f.write(tail)
+            await f.truncate(max(total, len(head)))
+        stdout, _, _ = await cmd_exec(['mediainfo', des_path])
+        tc = f"<h4>📌 {filename}</h4><br><br>"
         if len(stdout) != 0:
-            tc += parseinfo(stdout)
+            tc += parseinfo(stdout.replace(des_path, filename))
     except Exception as e:
         LOGGER.error(e)
         await editMessage(temp_send, f"MediaInfo Stopped due to {str(e)}")
     finally:
-        await aioremove(des_path)
+        if des_path and await aiopath.exists(des_path):
+            await aioremove(des_path)
+    if not tc:
+        return
     link_id = (await telegraph.create_page(title='MediaInfo X', content=tc))["path"]
+    mi_cache[cache_key] = link_id
+    if len(mi_cache) > MI_CACHE_SIZE:
+        mi_cache.popitem(last=False)
     await temp_send.edit(f"<b>MediaInfo:</b>\n\n➲ <b>Link :</b> https://graph.org/{link_id}", disable_web_page_preview=False)
 
 
@@ -9,29 +9,42 @@ from aiofiles import open as aiopen
 from aiofiles.os import path as aiopath
 from cloudscraper import create_scraper
 
-from bot import bot, DOWNLOAD_DIR, LOGGER, config_dict, bot_name, categories_dict, user_data
+from bot import bot, DOWNLOAD_DIR, LOGGER, config_dict, bot_name, categories_dict, user_data, download_dict, download_dict_lock
 from bot.helper.mirror_utils.download_utils.direct_downloader import add_direct_download
 from bot.helper.ext_utils.bot_utils import is_url, is_magnet, is_mega_link, is_gdrive_link, get_content_type, new_task, sync_to_async, is_rclone_path, is_telegram_link, arg_parser, fetch_user_tds, fetch_user_dumps, get_stats
 from bot.helper.ext_utils.exceptions import DirectDownloadLinkException
 from bot.helper.ext_utils.task_manager import task_utils
+from bot.helper.ext_utils.db_handler import DbManger
+from bot.helper.ext_utils.fs_utils import clean_download
+from bot.helper.ext_utils.upload_checkpoint import ckpt_dirs
 from bot.helper.mirror_utils.download_utils.aria2_download import add_aria2c_download
 from bot.helper.mirror_utils.download_utils.gd_download import add_gd_download
 from bot.helper.mirror_utils.download_utils.qbit_download import add_qb_torrent
 from bot.helper.mirror_utils.download_utils.mega_download import add_mega_download
 from bot.helper.mirror_utils.download_utils.rclone_download import add_rclone_download
+from bot.helper.mirror_utils.download_utils.stream_download import add_stream_download
+from bot.helper.mirror_utils.upload_utils.streamEngine import HttpSource, RcloneSource
 from bot.helper.mirror_utils.rclone_utils.list import RcloneList
 from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
 from bot.helper.mirror_utils.download_utils.direct_link_generator import direct_link_generator
-from bot.helper.mirror_utils.download_utils.telegram_download import TelegramDownloadHelper
+from bot.helper.mirror_utils.download_utils.telegram_download import TelegramDownloadHelper, GLOBAL_GID, global_lock
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.button_build import ButtonMaker
-from bot.helper.telegram_helper.message_utils import sendMessage, editMessage, editReplyMarkup, deleteMessage, get_tg_link_content, delete_links, auto_delete_message, open_category_btns, open_dump_btns
+from bot.helper.telegram_helper.message_utils import sendMessage, editMessage, editReplyMarkup, deleteMessage, get_tg_link_content, get_tg_link_range_content, is_tg_link_range, delete_links, auto_delete_message, open_category_btns, open_dump_btns
 from bot.helper.listeners.tasks_listener import MirrorLeechListener
 from bot.helper.ext_utils.help_messages import MIRROR_HELP_MESSAGE, CLONE_HELP_MESSAGE, YT_HELP_MESSAGE, help_string
 from bot.helper.ext_utils.bulk_links import extract_bulk_links
 from bot.modules.gen_pyro_sess import get_decrypt_key
 
+tg_range_cache = {}
+
+
+def clear_range_cache(links):
+    for link in links:
+        tg_range_cache.pop(link, None)
+
+
 @new_task
 async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=None, bulk=[]):
     text = message.text.split('\n')
@@ -59,6 +72,7 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
                 '-h': '', '-headers': '',
                 '-ss': '0', '-screenshots': '',
                 '-t': '', '-thumb': '',
+                '-st': False, '-stream': False,
     }
 
     args = arg_parser(input_list[1:], arg_base)
@@ -67,6 +81,8 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
     multi = int(args['-i']) if args['-i'].isdigit() else 0
     
     link          = args['link']
+    # Taken as soon as the item runs, so no early return can leave it behind
+    range_cached  = tg_range_cache.pop(link, None) if bulk and link else None
     folder_name   = args['-m'] or args['-sd'] or args['-samedir']
     seed          = args['-d'] or args['-seed']
     join          = args['-j'] or args['-join']
@@ -86,6 +102,7 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
     pssw          = args['-p'] or args['-pass']
     thumb         = args['-t'] or args['-thumb']
     sshots        = int(ss) if (ss := (args['-ss'] or args['-screenshots'])).isdigit() else 0
+    stream        = args['-st'] or args['-stream']
     bulk_start    = 0
     bulk_end      = 0
     ratio         = None
@@ -120,6 +137,51 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
             sameDir = {'total': multi, 'tasks': set(), 'name': folder_name}
         sameDir['tasks'].add(message.id)
 
+    if not isBulk and not bulk and link and is_tg_link_range(link):
+        decrypter = None
+        try:
+            tg_msgs, session = await get_tg_link_range_content(link, message.from_user.id)
+            if not tg_msgs and session == "":
+                decrypter, is_cancelled = await wrap_future(get_decrypt_key(client, message))
+                if is_cancelled:
+                    return
+                tg_msgs, session = await get_tg_link_range_content(link, message.from_user.id, decrypter)
+        except Exception as e:
+            LOGGER.info(format_exc())
+            await sendMessage(message, f'<b>ERROR:</b> <i>{e}</i>')
+            await delete_links(message)
+            return
+        bulk, seen = [], set()
+        async with global_lock:
+            for tg_link, tg_msg in tg_msgs:
+                media = getattr(tg_msg, tg_msg.media.value, None)
+                if (file_uid := getattr(media, 'file_unique_id', None)) is None or file_uid in GLOBAL_GID or file_uid in seen:
+                    continue
+                seen.add(file_uid)
+                tg_range_cache[tg_link] = (tg_msg, session, decrypter)
+                bulk.append(tg_link)
+        if not bulk:
+            await sendMessage(message, '<i>No new Media found in the given Message Range!</i>')
+            await delete_links(message)
+            return
+        b_msg = input_list[:1] + [bulk[0], '-i', str(len(bulk))]
+        skip_next = False
+        for item in input_list[1:]:
+            if skip_next or item.strip() == link:
+                skip_next = False
+                continue
+            if item.strip() == '-i':
+                skip_next = True
+                continue
+            b_msg.append(item)
+        if not folder_name:
+            b_msg.extend(['-m', link.rstrip('/').rsplit('/', 2)[-2] + '_' + link.rstrip('/').rsplit('/', 1)[-1]])
+        nextmsg = await sendMessage(message, " ".join(b_msg))
+        nextmsg = await client.get_messages(chat_id=message.chat.id, message_ids=nextmsg.id)
+        nextmsg.from_user = message.from_user
+        _mirror_leech(client, nextmsg, isQbit, isLeech, None, bulk)
+        return
+
     if isBulk:
         try:
             bulk = await extract_bulk_links(message, bulk_start, bulk_end)
@@ -142,19 +204,31 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
     @new_task
     async def __run_multi():
         if multi <= 1:
+            clear_range_cache(bulk)
             return
         await sleep(5)
-        if len(bulk) != 0:
-            msg = input_list[:1]
-            msg.append(f'{bulk[0]} -i {multi - 1}')
-            nextmsg = await sendMessage(message, " ".join(msg))
-        else:
-            msg = [s.strip() for s in input_list]
-            index = msg.index('-i')
-            msg[index+1] = f"{multi - 1}"
-            nextmsg = await client.get_messages(chat_id=message.chat.id, message_ids=message.reply_to_message_id + 1)
-            nextmsg = await sendMessage(nextmsg, " ".join(msg))
-        nextmsg = await client.get_messages(chat_id=message.chat.id, message_ids=nextmsg.id)
+        try:
+            if len(bulk) != 0 and bulk[0] in tg_range_cache:
+                # Messages generated from a range carry the link first, keep the rest of their args
+                msg = [s.strip() for s in input_list]
+                msg[1] = bulk[0]
+                msg[msg.index('-i') + 1] = f"{multi - 1}"
+                nextmsg = await sendMessage(message, " ".join(msg))
+            elif len(bulk) != 0:
+                msg = input_list[:1]
+                msg.append(f'{bulk[0]} -i {multi - 1}')
+                nextmsg = await sendMessage(message, " ".join(msg))
+            else:
+                msg = [s.strip() for s in input_list]
+                index = msg.index('-i')
+                msg[index+1] = f"{multi - 1}"
+                nextmsg = await client.get_messages(chat_id=message.chat.id, message_ids=message.reply_to_message_id + 1)
+                nextmsg = await sendMessage(nextmsg, " ".join(msg))
+            nextmsg = await client.get_messages(chat_id=message.chat.id, message_ids=nextmsg.id)
+        except Exception:
+            # The bulk stops here, drop the messages cached for the items that will never run
+            clear_range_cache(bulk)
+            raise
         if folder_name:
             sameDir['tasks'].add(nextmsg.id)
         nextmsg.from_user = message.from_user
@@ -185,7 +259,10 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
             link = reply_to.text.split('\n', 1)[0].strip()
     if link and is_telegram_link(link):
         try:
-            reply_to, session = await get_tg_link_content(link, message.from_user.id)
+            if range_cached:
+                reply_to, session, decrypter = range_cached
+            else:
+                reply_to, session = await get_tg_link_content(link, message.from_user.id)
             if reply_to is None and session == "":
                 decrypter, is_cancelled = await wrap_future(get_decrypt_key(client, message))
                 if is_cancelled:
@@ -333,9 +410,14 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
             await delete_links(message)
             return
 
+    if stream and (isLeech or isQbit or compress or extract or select or seed or join or sameDir or up == 'ddl' or file_ is not None
+                   or not isinstance(link, str) or not (is_rclone_path(link) or is_url(link) and not (is_gdrive_link(link) or is_mega_link(link) or is_telegram_link(link)))):
+        LOGGER.info(f"Stream mode not possible for this task, using normal download: {link}")
+        stream = False
+
     listener = MirrorLeechListener(message, compress, extract, isQbit, isLeech, tag, select, seed, 
                                     sameDir, rcf, up, join, drive_id=drive_id, index_link=index_link, 
-                                    source_url=org_link or link, leech_utils={'screenshots': sshots, 'thumb': thumb})
+                                    source_url=org_link or link, leech_utils={'screenshots': sshots, 'thumb': thumb}, isStream=stream)
 
     if file_ is not None:
         await delete_links(message)
@@ -352,7 +434,10 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
             await sendMessage(message, f"<b>RClone Config:</b> {config_path} not Exists!")
             await delete_links(message)
             return
-        await add_rclone_download(link, config_path, f'{path}/', name, listener)
+        if stream:
+            await add_stream_download(RcloneSource(link, config_path, name), listener)
+        else:
+            await add_rclone_download(link, config_path, f'{path}/', name, listener)
     elif is_gdrive_link(link):
         await delete_links(message)
         await add_gd_download(link, path, listener, name, org_link)
@@ -365,10 +450,49 @@ async def _mirror_leech(client, message, isQbit=False, isLeech=False, sameDir=No
         if ussr or pssw:
             auth = f"{ussr}:{pssw}"
             headers += f" authorization: Basic {b64encode(auth.encode()).decode('ascii')}"
-        await add_aria2c_download(link, path, listener, name, headers, ratio, seed_time)
+        if stream:
+            await add_stream_download(HttpSource(link, headers, name), listener)
+        else:
+            await add_aria2c_download(link, path, listener, name, headers, ratio, seed_time)
     await delete_links(message)
 
 
+@new_task
+async def resume_upload(client, query):
+    message = query.message
+    data = query.data.split()
+    if query.from_user.id != int(data[1]) and not await CustomFilters.sudo(client, query):
+        return await query.answer(text="Not Yours!", show_alert=True)
+    await query.answer()
+    await editReplyMarkup(message, None)
+    if (doc := await DbManger().get_upload_ckpt(data[2])) is None:
+        return await editMessage(message, "<i>This upload is no longer resumable!</i>")
+    if data[3] == 'go':
+        try:
+            task_msg = await bot.get_messages(doc['cid'], doc['mid'])
+        except Exception as e:
+            LOGGER.error(f"Resume Upload: {e}")
+            task_msg = None
+        if task_msg is not None and not task_msg.empty and task_msg.from_user:
+            async with download_dict_lock:
+                running = task_msg.id in download_dict
+            if running:
+                return await editMessage(message, "<i>This task is already running!</i>")
+            opts = doc['opts']
+            listener = MirrorLeechListener(task_msg, opts['compress'], opts['extract'], opts['isQbit'], opts['isLeech'], doc['tag'],
+                                           upPath=opts['upPath'], drive_id=opts['drive_id'], index_link=opts['index_link'],
+                                           isYtdlp=opts['isYtdlp'], source_url=opts['source_url'], leech_utils=opts['leech_utils'])
+            await deleteMessage(message)
+            await listener.resumeUpload(doc)
+            return
+        await editMessage(message, "<i>Task message not found, discarding the upload!</i>")
+    else:
+        await editMessage(message, "<i>Interrupted upload discarded!</i>")
+    ckpt_dirs.discard(doc['uid'])
+    await DbManger().rm_upload_ckpt(data[2])
+    await clean_download(f"{DOWNLOAD_DIR}{doc['uid']}")
+
+
 @new_task
 async def wzmlxcb(_, query):
     message = query.message
@@ -490,3 +614,4 @@ bot.add_handler(MessageHandler(leech, filters=command(
 bot.add_handler(MessageHandler(qb_leech, filters=command(
     BotCommands.QbLeechCommand) & CustomFilters.authorized & ~CustomFilters.blacklisted))
 bot.add_handler(CallbackQueryHandler(wzmlxcb, filters=regex(r'^wzmlx')))
+bot.add_handler(CallbackQueryHandler(resume_upload, filters=regex(r'^resume ')))
@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 from contextlib import suppress
-from aiohttp import ClientSession
-from requests import get as rget
 from urllib.parse import quote as q
 from pycountry import countries as conn
 
@@ -14,6 +12,7 @@ from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.message_utils import sendMessage, editMessage
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.button_build import ButtonMaker
+from bot.helper.ext_utils.meta_lookup import meta_lookup
 
 LIST_ITEMS = 4
 IMDB_GENRE_EMOJI = {"Action": "🚀", "Adult": "🔞", "Adventure": "🌋", "Animation": "🎠", "Biography": "📜", "Comedy": "🪗", "Crime": "🔪", "Documentary": "🎞", "Drama": "🎭", "Family": "👨‍👩‍👧‍👦", "Fantasy": "🫧", "Film Noir": "🎯", "Game Show": "🎮", "History": "🏛", "Horror": "🧟", "Musical": "🎻", "Music": "🎸", "Mystery": "🧳", "News": "📰", "Reality-TV": "🖥", "Romance": "🥰", "Sci-Fi": "🌠", "Short": "📝", "Sport": "⛳", "Talk-Show": "👨‍🍳", "Thriller": "🗡", "War": "⚔", "Western": "🪩"}
@@ -25,11 +24,8 @@ async def mydramalist_search(_, message):
         title = message.text.split(' ', 1)[1]
         user_id = message.from_user.id
         buttons = ButtonMaker()
-        async with ClientSession() as sess:
-            async with sess.get(f'{MDL_API}/search/q/{q(title)}') as resp:
-                if resp.status != 200:
-                    return await editMessage(temp, "<i>No Results Found</i>, Try Again or Use <b>MyDramaList Link</b>")
-                mdl = await resp.json()
+        if not (mdl := await meta_lookup.get_json(f'{MDL_API}/search/q/{q(title)}', f'mdl:search:{title.lower()}')):
+            return await editMessage(temp, "<i>No Results Found</i>, Try Again or Use <b>MyDramaList Link</b>")
         for drama in mdl['results']['dramas']:
             buttons.ibutton(f"🎬 {drama.get('title')} ({drama.get('year')})", f"mdl {user_id} drama {drama.get('slug')}")
         buttons.ibutton("🚫 Close 🚫", f"mdl {user_id} close")
@@ -39,9 +35,8 @@ async def mydramalist_search(_, message):
 
 
 async def extract_MDL(slug):
-    async with ClientSession() as sess:
-        async with sess.get(f'{MDL_API}/id/{slug}') as resp:
-            mdl = (await resp.json())["data"]
+    if not (mdl := await meta_lookup.get_json(f'{MDL_API}/id/{slug}', f'mdl:id:{slug}')) or not (mdl := mdl.get("data")):
+        return None
     plot = mdl.get('synopsis')
     if plot and len(plot) > 300:
         plot = f"{plot[:300]}..."
@@ -137,7 +132,7 @@ async def mdl_callback(_, query):
             cap = template.format(**mdl)
         else:
             cap = "<i>No Data Received</i>"
-        if mdl.get('poster'):
+        if mdl and mdl.get('poster'):
             try: #Invoke Raw Functions
                 await message.reply_to_message.reply_photo(mdl["poster"], caption=cap, reply_markup=buttons.build_menu(1))
             except (MediaEmpty, PhotoInvalidDimensions, WebpageMediaEmpty):
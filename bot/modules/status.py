@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from pyrogram.handlers import MessageHandler, CallbackQueryHandler
 from pyrogram.filters import command, regex
-from psutil import cpu_percent, virtual_memory, disk_usage
 from time import time
 from asyncio import sleep
 
@@ -10,6 +9,7 @@ from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.message_utils import sendMessage, editMessage, deleteMessage, auto_delete_message, sendStatusMessage, user_info, update_all_messages, delete_all_messages
 from bot.helper.ext_utils.bot_utils import get_readable_file_size, get_readable_time, turn_page, setInterval, new_task
+from bot.helper.ext_utils.sys_stats import sys_stats
 from bot.helper.themes import BotTheme
 
 
@@ -19,9 +19,10 @@ async def mirror_status(_, message):
         count = len(download_dict)
     if count == 0:
         currentTime = get_readable_time(time() - botStartTime)
-        free = get_readable_file_size(disk_usage(config_dict['DOWNLOAD_DIR']).free)
-        msg = BotTheme('NO_ACTIVE_DL', cpu=cpu_percent(), free=free, free_p=round(100-disk_usage(config_dict['DOWNLOAD_DIR']).percent, 1),
-                       ram=virtual_memory().percent, uptime=currentTime)
+        stats = await sys_stats.get_latest()
+        free = get_readable_file_size(stats['dl_disk'].free)
+        msg = BotTheme('NO_ACTIVE_DL', cpu=stats['cpu'], free=free, free_p=round(100-stats['dl_disk'].percent, 1),
+                       ram=stats['ram'].percent, uptime=currentTime)
         reply_message = await sendMessage(message, msg)
         await auto_delete_message(message, reply_message)
     else:
@@ -48,7 +49,7 @@ async def status_pages(_, query):
         await sleep(1.5)
         await update_all_messages(True)
     elif data[1] in ['nex', 'pre']:
-        await turn_page(data)
+        await turn_page(data, query.message.chat.id)
         await update_all_messages(True)
     elif data[1] == 'close':
         await delete_all_messages()
@@ -19,6 +19,7 @@ from bot.helper.telegram_helper.message_utils import sendMessage, sendCustomMsg,
 from bot.helper.telegram_helper.filters import CustomFilters
 from bot.helper.telegram_helper.bot_commands import BotCommands
 from bot.helper.telegram_helper.button_build import ButtonMaker
+from bot.helper.telegram_helper.session_pool import user_sessions
 from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
 from bot.helper.ext_utils.db_handler import DbManger
 from bot.helper.ext_utils.bot_utils import getdailytasks, update_user_ldata, get_readable_file_size, sync_to_async, new_thread, is_gdrive_link
@@ -513,6 +514,8 @@ async def edit_user_settings(client, query):
     elif data[2] in ['dyt_opt', 'dusess']:
         handler_dict[user_id] = False
         await query.answer()
+        if data[2] == 'dusess':
+            await user_sessions.invalidate(user_id)
         update_user_ldata(user_id, data[2][1:], '')
         await update_user_settings(query, data[2][1:], 'universal')
         if DATABASE_URL:
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# Times make_tree on synthetic qBittorrent file lists: python3 -m web.bench_nodes [runs]
+from sys import argv
+from time import perf_counter
+
+from web.nodes import make_tree
+
+
+def qb_files(shape):
+    files = []
+    for path in shape:
+        files.append({'name': path, 'size': 1048576 + len(files), 'priority': len(files) % 2,
+                      'index': len(files), 'progress': (len(files) % 100) / 100})
+    return files
+
+
+def nested(dirs=50, subdirs=100, per_dir=10):
+    return (f'Torrent/dir{d}/sub{s}/file{f}.mkv' for d in range(dirs) for s in range(subdirs) for f in range(per_dir))
+
+
+def flat(folders=5, per_folder=10000):
+    return (f'Torrent/folder{d}/file{f}.mkv' for d in range(folders) for f in range(per_folder))
+
+
+SHAPES = {'50 dirs x 100 subdirs x 10 files': nested, '5 folders x 10,000 files': flat}
+
+
+def main(runs=5):
+    for name, shape in SHAPES.items():
+        files = qb_files(shape())
+        best, size = None, 0
+        for _ in range(runs):
+            start = perf_counter()
+            size = len(make_tree(files))
+            elapsed = perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(f'{name} ({len(files)} files, {size / 1048576:.1f} MB of HTML): best of {runs} {best:.3f} s')
+
+
+if __name__ == '__main__':
+    main(int(argv[1]) if len(argv) > 1 else 5)
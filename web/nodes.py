@@ -1,4 +1,3 @@
-from anytree import NodeMixin
 from re import findall as re_findall
 from os import environ
 
@@ -9,23 +8,60 @@ elif not DOWNLOAD_DIR.endswith("/"):
     DOWNLOAD_DIR += '/'
 
 
-class TorNode(NodeMixin):
-    def __init__(self, name, is_folder=False, is_file=False, parent=None, size=None, priority=None, file_id=None, progress=None):
-        super().__init__()
-        self.name = name
-        self.is_folder = is_folder
-        self.is_file = is_file
+class TorTree:
+    # Files live in flat arrays, folders keep a name -> index dict of sub folders so every
+    # path component is one lookup. Folder children are file indexes or ~folder indexes
+    def __init__(self):
+        self.names = []
+        self.sizes = []
+        self.priorities = []
+        self.file_ids = []
+        self.progress = []
+        self.folders = [("Torrent", {}, [])]
+        self.__folder_no = 0
 
-        if parent is not None:
-            self.parent = parent
-        if size is not None:
-            self.size = size
-        if priority is not None:
-            self.priority = priority
-        if file_id is not None:
-            self.file_id = file_id
-        if progress is not None:
-            self.progress = progress
+    def add_file(self, folders, size, priority, file_id, progress):
+        node = 0
+        for folder in folders[:-1]:
+            sub_folders = self.folders[node][1]
+            if (child := sub_folders.get(folder)) is None:
+                child = sub_folders[folder] = len(self.folders)
+                self.folders.append((folder, {}, []))
+                self.folders[node][2].append(~child)
+            node = child
+        self.folders[node][2].append(len(self.names))
+        self.names.append(folders[-1])
+        self.sizes.append(size)
+        self.priorities.append(priority)
+        self.file_ids.append(file_id)
+        self.progress.append(progress)
+
+    def render(self):
+        parts = []
+        self.__folder_no = 0
+        self.__render(0, parts)
+        return ''.join(parts)
+
+    def __render(self, folder, parts):
+        name, _, children = self.folders[folder]
+        if name != ".unwanted":
+            parts.append('<ul>')
+        for child in children:
+            if child < 0:
+                sub_name = self.folders[~child][0]
+                parts.append("<li>")
+                if sub_name != ".unwanted":
+                    parts.append(f'<input type="checkbox" name="foldernode_{self.__folder_no}"> <label for="{sub_name}">{sub_name}</label>')
+                self.__render(~child, parts)
+                parts.append("</li>")
+                self.__folder_no += 1
+            else:
+                file_id, size = self.file_ids[child], self.sizes[child]
+                checked = '' if self.priorities[child] == 0 else ' checked'
+                parts.append(f'<li><input type="checkbox"{checked} name="filenode_{file_id}" data-size="{size}"> <label data-size="{size}" for="filenode_{file_id}">{self.names[child]}</label> / {self.progress[child]}%'
+                             f'<input type="hidden" value="off" name="filenode_{file_id}"></li>')
+        if name != ".unwanted":
+            parts.append("</ul>")
 
 
 def qb_get_folders(path):
@@ -36,71 +72,13 @@ def get_folders(path):
     return fs.split('/')
 
 def make_tree(res, aria2=False):
-    parent = TorNode("Torrent")
-    if not aria2:
-        for i in res:
-            folders = qb_get_folders(i.name)
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders)-1):
-                    current_node = next((k for k in previous_node.children if k.name == folders[j]), None)
-                    if current_node is None:
-                        previous_node = TorNode(folders[j], parent=previous_node, is_folder=True)
-                    else:
-                        previous_node = current_node
-                TorNode(folders[-1], is_file=True, parent=previous_node, size=i.size, priority=i.priority, \
-                        file_id=i.id, progress=round(i.progress*100, 5))
-            else:
-                TorNode(folders[-1], is_file=True, parent=parent, size=i.size, priority=i.priority, \
-                        file_id=i.id, progress=round(i.progress*100, 5))
-    else:
-        for i in res:
-            folders = get_folders(i['path'])
-            priority = 1
-            if i['selected'] == 'false':
-                priority = 0
-            if len(folders) > 1:
-                previous_node = parent
-                for j in range(len(folders)-1):
-                    current_node = next((k for k in previous_node.children if k.name == folders[j]), None)
-                    if current_node is None:
-                        previous_node = TorNode(folders[j], parent=previous_node, is_folder=True)
-                    else:
-                        previous_node = current_node
-                TorNode(folders[-1], is_file=True, parent=previous_node, size=i['length'], priority=priority, \
-                        file_id=i['index'], progress=round((int(i['completedLength'])/int(i['length']))*100, 5))
-            else:
-                TorNode(folders[-1], is_file=True, parent=parent, size=i['length'], priority=priority, \
-                        file_id=i['index'], progress=round((int(i['completedLength'])/int(i['length']))*100, 5))
-    return create_list(parent, ["", 0])
-
-"""
-def print_tree(parent):
-    for pre, _, node in RenderTree(parent):
-        treestr = u"%s%s" % (pre, node.name)
-        print(treestr.ljust(8), node.is_folder, node.is_file)
-"""
-
-def create_list(par, msg):
-    if par.name != ".unwanted":
-        msg[0] += '<ul>'
-    for i in par.children:
-        if i.is_folder:
-            msg[0] += "<li>"
-            if i.name != ".unwanted":
-                msg[0] += f'<input type="checkbox" name="foldernode_{msg[1]}"> <label for="{i.name}">{i.name}</label>'
-            create_list(i, msg)
-            msg[0] += "</li>"
-            msg[1] += 1
+    tree = TorTree()
+    for n, i in enumerate(res):
+        if not aria2:
+            tree.add_file(qb_get_folders(i['name']), i['size'], i['priority'], i.get('index', n),
+                          round(i['progress']*100, 5))
         else:
-            msg[0] += '<li>'
-            if i.priority == 0:
-                msg[0] += f'<input type="checkbox" name="filenode_{i.file_id}" data-size="{i.size}"> <label data-size="{i.size}" for="filenode_{i.file_id}">{i.name}</label> / {i.progress}%'
-            else:
-                msg[0] += f'<input type="checkbox" checked name="filenode_{i.file_id}" data-size="{i.size}"> <label data-size="{i.size}" for="filenode_{i.file_id}">{i.name}</label> / {i.progress}%'
-            msg[0] += f'<input type="hidden" value="off" name="filenode_{i.file_id}">'
-            msg[0] += "</li>"
-
-    if par.name != ".unwanted":
-        msg[0] += "</ul>"
-    return msg
+            priority = 0 if i['selected'] == 'false' else 1
+            tree.add_file(get_folders(i['path']), i['length'], priority, i['index'],
+                          round((int(i['completedLength'])/int(i['length']))*100, 5))
+    return tree.render()
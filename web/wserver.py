@@ -1,21 +1,18 @@
-from logging import getLogger, FileHandler, StreamHandler, INFO, basicConfig
-from time import sleep
-from qbittorrentapi import NotFound404Error, Client as qbClient
-from aria2p import API as ariaAPI, Client as ariaClient
-from flask import Flask, request
+from asyncio import gather, sleep
+from aiohttp import ClientSession, ClientTimeout, web
 
+from bot import aria2, LOGGER
+from bot.helper.ext_utils.bot_utils import sync_to_async
 from web.nodes import make_tree
 
-app = Flask(__name__)
+HEALTH_PORT = 8080
+STREAM_CHUNK = 64 * 1024
+VERIFY_RETRIES = 3
 
-aria2 = ariaAPI(ariaClient(host="http://localhost", port=6800, secret=""))
-
-basicConfig(format="[%(asctime)s] [%(levelname)s] - %(message)s",
-            datefmt="%d-%b-%y %I:%M:%S %p",
-            handlers=[FileHandler('log.txt'), StreamHandler()],
-            level=INFO)
-
-LOGGER = getLogger(__name__)
+routes = web.RouteTableDef()
+runner = None
+sites = {}
+selector_port = None
 
 page = """
 <html lang="en">
@@ -650,138 +647,107 @@ section span{
 """
 
 
-def re_verfiy(paused, resumed, client, hash_id):
-
-    paused = paused.strip()
-    resumed = resumed.strip()
-    if paused:
-        paused = paused.split("|")
-    if resumed:
-        resumed = resumed.split("|")
-
-    k = 0
-    while True:
-        res = client.torrents_files(torrent_hash=hash_id)
-        verify = True
-        for i in res:
-            if str(i.id) in paused and i.priority != 0:
-                verify = False
-                break
-            if str(i.id) in resumed and i.priority == 0:
-                verify = False
-                break
-        if verify:
-            break
-        LOGGER.info("Reverification Failed! Correcting stuff...")
-        client.auth_log_out()
-        sleep(1)
-        client = qbClient(host="localhost", port="8090")
-        try:
-            client.torrents_file_priority(
-                torrent_hash=hash_id, file_ids=paused, priority=0)
-        except NotFound404Error as e:
-            raise NotFound404Error from e
-        except Exception as e:
-            LOGGER.error(f"{e} Errored in reverification paused!")
-        try:
-            client.torrents_file_priority(
-                torrent_hash=hash_id, file_ids=resumed, priority=1)
-        except NotFound404Error as e:
-            raise NotFound404Error from e
-        except Exception as e:
-            LOGGER.error(f"{e} Errored in reverification resumed!")
-        k += 1
-        if k > 5:
-            return False
-    LOGGER.info(f"Verified! Hash: {hash_id}")
-    return True
-
-
-@app.route('/app/files/<string:id_>', methods=['GET'])
-def list_torrent_contents(id_):
-
-    if "pin_code" not in request.args.keys():
-        return code_page.replace("{form_url}", f"/app/files/{id_}")
-
-    pincode = ""
-    for nbr in id_:
-        if nbr.isdigit():
-            pincode += str(nbr)
-        if len(pincode) == 4:
-            break
-    if request.args["pin_code"] != pincode:
-        return "<h1>Incorrect pin code</h1>"
+page_head, page_tail = page.split('{My_content}')
 
-    if len(id_) > 20:
-        client = qbClient(host="localhost", port="8090")
-        res = client.torrents_files(torrent_hash=id_)
-        cont = make_tree(res)
-        client.auth_log_out()
-    else:
-        res = aria2.client.get_files(id_)
-        cont = make_tree(res, True)
-    return page.replace("{My_content}", cont[0]).replace("{form_url}", f"/app/files/{id_}?pin_code={pincode}")
 
+class QbSession:
+    # One keep-alive connection pool to the local WebUI, instead of a client and a login per request
+    def __init__(self, host='http://localhost:8090'):
+        self.__host = host
+        self.__session = None
 
-@app.route('/app/files/<string:id_>', methods=['POST'])
-def set_priority(id_):
+    async def __request(self, method, path, **kwargs):
+        if self.__session is None or self.__session.closed:
+            self.__session = ClientSession(timeout=ClientTimeout(total=60))
+        async with self.__session.request(method, f'{self.__host}/api/v2/{path}', **kwargs) as resp:
+            if resp.status == 404:
+                raise Exception('Torrent not found!')
+            resp.raise_for_status()
+            return await resp.json() if resp.content_type == 'application/json' else await resp.text()
 
-    data = dict(request.form)
-    resume = ""
-    if len(id_) > 20:
-        pause = ""
-
-        for i, value in data.items():
-            if "filenode" in i:
-                node_no = i.split("_")[-1]
-
-                if value == "on":
-                    resume += f"{node_no}|"
-                else:
-                    pause += f"{node_no}|"
-
-        pause = pause.strip("|")
-        resume = resume.strip("|")
-
-        client = qbClient(host="localhost", port="8090")
-
-        try:
-            client.torrents_file_priority(
-                torrent_hash=id_, file_ids=pause, priority=0)
-        except NotFound404Error as e:
-            raise NotFound404Error from e
-        except Exception as e:
-            LOGGER.error(f"{e} Errored in paused")
-        try:
-            client.torrents_file_priority(
-                torrent_hash=id_, file_ids=resume, priority=1)
-        except NotFound404Error as e:
-            raise NotFound404Error from e
-        except Exception as e:
-            LOGGER.error(f"{e} Errored in resumed")
-        sleep(1)
-        if not re_verfiy(pause, resume, client, id_):
-            LOGGER.error(f"Verification Failed! Hash: {id_}")
-        client.auth_log_out()
-    else:
-        for i, value in data.items():
-            if "filenode" in i and value == "on":
-                node_no = i.split("_")[-1]
-                resume += f'{node_no},'
+    async def files(self, hash_):
+        return await self.__request('GET', 'torrents/files', params={'hash': hash_})
+
+    async def set_priority(self, hash_, file_ids, priority):
+        if file_ids:
+            await self.__request('POST', 'torrents/filePrio', data={'hash': hash_, 'id': '|'.join(map(str, file_ids)),
+                                                                    'priority': priority})
+
+    async def close(self):
+        if self.__session is not None:
+            await self.__session.close()
+        self.__session = None
+
+
+qb_session = QbSession()
+
+
+def get_pincode(id_):
+    return ''.join(nbr for nbr in id_ if nbr.isdigit())[:4]
+
+
+async def qb_set_priority(hash_id, selected):
+    # Only the files whose priority changes are sent, one filePrio call per direction
+    for _ in range(VERIFY_RETRIES):
+        current = {file_.get('index', n): file_['priority'] for n, file_ in enumerate(await qb_session.files(hash_id))}
+        pause = [file_id for file_id, on in selected.items() if not on and current.get(file_id, 0) != 0]
+        resume = [file_id for file_id, on in selected.items() if on and current.get(file_id) == 0]
+        if not pause and not resume:
+            LOGGER.info(f"Verified! Hash: {hash_id}")
+            return True
+        await gather(qb_session.set_priority(hash_id, pause, 0), qb_session.set_priority(hash_id, resume, 1))
+        await sleep(0.2)
+    LOGGER.error(f"Verification Failed! Hash: {hash_id}")
+    return False
+
+
+@routes.get('/app/files/{id_}')
+async def list_torrent_contents(request):
+    id_ = request.match_info['id_']
+    if "pin_code" not in request.query:
+        return web.Response(text=code_page.replace("{form_url}", f"/app/files/{id_}"), content_type='text/html')
 
-        resume = resume.strip(",")
+    pincode = get_pincode(id_)
+    if request.query["pin_code"] != pincode:
+        return web.Response(text="<h1>Incorrect pin code</h1>", content_type='text/html')
 
-        res = aria2.client.change_option(id_, {'select-file': resume})
+    if len(id_) > 20:
+        cont = make_tree(await qb_session.files(id_))
+    else:
+        cont = make_tree(await sync_to_async(aria2.client.get_files, id_), True)
+
+    response = web.StreamResponse(headers={'Content-Type': 'text/html; charset=utf-8'})
+    await response.prepare(request)
+    await response.write(page_head.replace("{form_url}", f"/app/files/{id_}?pin_code={pincode}").encode())
+    body = cont.encode()
+    for start in range(0, len(body), STREAM_CHUNK):
+        await response.write(body[start:start + STREAM_CHUNK])
+    await response.write(page_tail.encode())
+    await response.write_eof()
+    return response
+
+
+@routes.post('/app/files/{id_}')
+async def set_priority(request):
+    id_ = request.match_info['id_']
+    data = await request.post()
+    # A checked box posts "on" ahead of its hidden "off" input, the first value wins
+    selected = {int(key.split("_")[-1]): data.get(key) == "on" for key in set(data.keys()) if "filenode" in key}
+    if len(id_) > 20:
+        await qb_set_priority(id_, selected)
+    else:
+        resume = ','.join(str(file_id) for file_id, on in selected.items() if on)
+        res = await sync_to_async(aria2.client.change_option, id_, {'select-file': resume})
         if res == "OK":
             LOGGER.info(f"Verified! GID: {id_}")
         else:
             LOGGER.info(f"Verification Failed! Report! GID: {id_}")
-    return list_torrent_contents(id_)
+    return await list_torrent_contents(request)
 
 
-@app.route('/')
-def homepage():
-    return """
+@routes.get('/')
+async def homepage(request):
+    return web.Response(text="""
 <html lang="en">
   <head>
     <meta charset="UTF-8" />
@@ -844,13 +810,58 @@ def homepage():
     </div>
 </body>
 </html>
-"""
+""", content_type='text/html')
+
+
+@web.middleware
+async def selector_gate(request, handler):
+    # Only /health answers on every port, the selector only on BASE_URL_PORT while BASE_URL is set
+    if request.path != '/health':
+        sockname = request.transport.get_extra_info('sockname') if request.transport is not None else None
+        if selector_port is None or not sockname or sockname[1] != selector_port:
+            raise web.HTTPNotFound()
+    return await handler(request)
+
+
+@web.middleware
+async def error_page(request, handler):
+    try:
+        return await handler(request)
+    except Exception as e:
+        return web.Response(text=f"<h1>404: Torrent not found! Mostly wrong input. <br><br>Error: {e}</h2>", status=404,
+                            content_type='text/html')
+
+
+async def close_session(app):
+    await qb_session.close()
+
+
+app = web.Application(middlewares=[selector_gate, error_page])
+app.add_routes(routes)
+app.on_cleanup.append(close_session)
+
+
+async def start_site(port):
+    global runner
+    if runner is None:
+        runner = web.AppRunner(app)
+        await runner.setup()
+    if port not in sites:
+        sites[port] = web.TCPSite(runner, '0.0.0.0', port)
+        await sites[port].start()
 
 
-@app.errorhandler(Exception)
-def page_not_found(e):
-    return f"<h1>404: Torrent not found! Mostly wrong input. <br><br>Error: {e}</h2>", 404
+async def stop_site(port):
+    if port != HEALTH_PORT and (site := sites.pop(port, None)) is not None:
+        await site.stop()
 
 
-if __name__ == "__main__":
-    app.run()
+async def serve_selector(port=None):
+    # The selector shares the health check app, BASE_URL_PORT decides the one port it is served on
+    global selector_port
+    selector_port = port or None
+    for old in list(sites):
+        if old != port:
+            await stop_site(old)
+    if port:
+        await start_site(port)